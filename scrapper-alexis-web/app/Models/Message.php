@@ -22,6 +22,8 @@ class Message extends Model
         'avatar_url',
         'image_generated',
         'image_path',
+        'encoded_image_path',
+        'thumbnail_path',
         'downloaded',
         'downloaded_at',
         'approved_for_posting',
@@ -70,6 +72,15 @@ public function getImageUrlAttribute()
         return null;
     }
 
+    // Feature: Small gallery thumbnail produced by the Python encoding stage (falls back to the full image)
+    public function getThumbnailUrlAttribute()
+    {
+        if ($this->thumbnail_path && file_exists(public_path('message_images/' . basename($this->thumbnail_path)))) {
+            return asset('message_images/' . basename($this->thumbnail_path));
+        }
+        return $this->image_url;
+    }
+
     public function scopeWithImages($query)
     {
         return $query->where('image_generated', true);
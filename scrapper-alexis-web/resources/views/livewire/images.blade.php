@@ -316,8 +316,9 @@ class="absolute top-3 right-3 z-10 bg-blue-500 text-white rounded-full p-2 shado
                 <div class="group">
                     @if ($message->image_url)
                         <div class="relative overflow-hidden rounded-t-xl bg-accent h-48 min-h-48 flex items-center justify-center">
-                            <img src="{{ $message->image_url }}"
+                            <img src="{{ $message->thumbnail_url }}"
                                 alt="Message image"
+                                loading="lazy"
                                 class="w-full h-full object-contain transition-transform duration-200">
                         </div>
                     @else
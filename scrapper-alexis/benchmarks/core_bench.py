@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the core data paths.
+
+Covers:
+
+- dedup.normalize / dedup.hash:  MessageDeduplicator.normalize_message_text
+                                 and generate_message_hash
+- dedup.is_duplicate_cold/warm:  is_duplicate with an empty hash cache (every
+                                 call reaches the database) and a filled one
+- db.message_exists:             hits and misses against the database
+- db.add_message / db.add_messages_batch
+- quality.filter:                MessageQualityFilter.filter_quality_messages
+
+Database benchmarks run against synthetic databases of 10k, 100k and 1M
+messages (--sizes). They are built once with the real schema and cached in
+--data-dir; rows inserted by the write benchmarks are removed afterwards, so
+the cached databases stay comparable between runs.
+
+Each benchmark runs --repeat rounds. Rounds shorter than --min-round
+seconds repeat the operations until they are long enough (benchmarks with
+per-round setup/teardown run once per round). Results (best, median and
+standard deviation per operation) are written as JSON (--json) and can be
+checked against an earlier result file:
+
+    python3 benchmarks/core_bench.py --json before.json
+    # ... change code ...
+    python3 benchmarks/core_bench.py --json after.json --baseline before.json --threshold 0.15
+
+With --baseline the exit code is 1 when a benchmark's best round is slower
+than the baseline's best by more than --threshold (fraction) AND by more
+than its noise margin: twice the larger round-to-round standard deviation
+of the two runs, or the benchmark's NOISE_FLOOR_US, whichever is larger.
+Medians are printed for reference only. Compare results from the same
+machine only.
+
+Usage:
+    python3 benchmarks/core_bench.py
+    python3 benchmarks/core_bench.py --sizes 10000 --repeat 3 --only dedup quality
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import logging
+import sqlite3
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_DATA_DIR = Path(tempfile.gettempdir()) / 'scrapper_core_bench'
+# Bump when the synthetic data changes so cached databases are rebuilt
+DATA_VERSION = 1
+INSERT_CHUNK = 50_000
+PROFILES = 5
+
+# Minimum slowdown (us/op) counted as a regression, by benchmark name prefix.
+# Database operations wait on the disk and vary by ~100us between identical runs.
+NOISE_FLOOR_US = {
+    'db.': 150.0,
+    'dedup.is_duplicate_cold': 150.0,
+    'dedup.is_duplicate_warm': 10.0,
+}
+DEFAULT_NOISE_FLOOR_US = 1.0
+
+DATABASE_BENCHMARKS = (
+    'db.message_exists.hit', 'db.message_exists.miss',
+    'dedup.is_duplicate_cold', 'dedup.is_duplicate_warm',
+    'db.add_message', 'db.add_messages_batch',
+)
+
+_WORDS = (
+    'cuando tu mejor amigo dice que ya viene pero sigue en su casa la vida es '
+    'demasiado corta para tomar café malo nadie me avisó que ser adulto era '
+    'pagar cosas todo el tiempo mi perro me mira como si yo fuera el problema '
+    'el lunes debería ser opcional la dieta empieza mañana otra vez cuando por '
+    'fin encuentras el control de la tele y ya no hay nada que ver'
+).split()
+
+_NOISE = ('Me gusta', 'Comentar', 'Compartir', 'Ver más', 'Jajaja', '👍', '...')
+
+
+def synthetic_message(seed: int, index: int) -> str:
+    """Deterministic message text (unique per index)."""
+    rng = random.Random(seed * 1_000_003 + index)
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 40))]
+    if rng.random() < 0.2:
+        # Scraped text often keeps line breaks and action labels
+        words.insert(rng.randrange(len(words)), '\n' + rng.choice(_NOISE) + '\n')
+    return ' '.join(words).capitalize() + f" #{index}"
+
+
+def quality_sample(seed: int, count: int) -> List[str]:
+    """Messages for the quality filter: mostly valid, plus UI noise and outliers."""
+    rng = random.Random(seed)
+    sample = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.70:
+            sample.append(synthetic_message(seed, 10_000_000 + i))
+        elif roll < 0.85:
+            sample.append(rng.choice(_NOISE))
+        elif roll < 0.92:
+            sample.append('!!! ' + '#$%&*' * rng.randint(5, 20) + ' ok ok ok ok ok')
+        elif roll < 0.97:
+            sample.append(' '.join(rng.choice(_WORDS) for _ in range(600)))
+        else:
+            sample.append('Me gusta esto mucho jaja jaja')
+    return sample
+
+
+class Bench:
+    """Runs timed rounds and collects results keyed by benchmark name."""
+
+    def __init__(self, repeat: int, only: Optional[List[str]] = None, min_round: float = 0.0):
+        self.repeat = repeat
+        self.only = only
+        self.min_round = min_round
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def wanted(self, name: str) -> bool:
+        return not self.only or any(part in name for part in self.only)
+
+    def run(self, name: str, ops: int, round_fn: Callable[[], None],
+            setup: Optional[Callable[[], None]] = None, teardown: Optional[Callable[[], None]] = None):
+        """
+        Time round_fn (which performs `ops` operations) over --repeat rounds.
+
+        setup/teardown run before/after every round and are not timed. Without
+        them, round_fn is called enough times per round to last min_round seconds.
+        """
+        if not self.wanted(name):
+            return
+        loops = 1
+        if not setup and not teardown and self.min_round:
+            # Warm-up call doubles as calibration
+            start = time.perf_counter()
+            round_fn()
+            elapsed = time.perf_counter() - start
+            loops = max(1, math.ceil(self.min_round / elapsed)) if elapsed else 1
+        times = []
+        for _ in range(self.repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            for _ in range(loops):
+                round_fn()
+            times.append(time.perf_counter() - start)
+            if teardown:
+                teardown()
+        ops *= loops
+        per_op = [t / ops * 1e6 for t in times]
+        median = statistics.median(per_op)
+        self.results[name] = {
+            'ops': ops,
+            'rounds': len(times),
+            'median_us': round(median, 3),
+            'best_us': round(min(per_op), 3),
+            'stdev_us': round(statistics.stdev(per_op), 3) if len(per_op) > 1 else 0.0,
+            'ops_per_s': round(1e6 / median, 1) if median else 0.0,
+        }
+        print(f"  {name:<40} {median:>12.2f} us/op  {1e6 / median if median else 0:>12.0f} ops/s")
+
+
+def build_database(path: Path, size: int, seed: int):
+    """Create a database with `size` synthetic messages using the real schema."""
+    from core.database import DatabaseManager
+    from core.message_deduplicator import MessageDeduplicator
+
+    tmp_path = path.with_suffix('.building')
+    if tmp_path.exists():
+        tmp_path.unlink()
+    DatabaseManager(str(tmp_path))
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    conn = sqlite3.connect(tmp_path)
+    try:
+        for i in range(PROFILES):
+            conn.execute('INSERT INTO profiles (username, url) VALUES (?, ?)',
+                         (f"bench_{i}", f"https://example.com/bench_{i}"))
+
+        for chunk_start in range(0, size, INSERT_CHUNK):
+            rows = []
+            for index in range(chunk_start, min(chunk_start + INSERT_CHUNK, size)):
+                text = synthetic_message(seed, index)
+                scraped = now - timedelta(minutes=size - index)
+                roll = rng.random()
+                # Mix of review states so message_exists exercises every branch
+                if roll < 0.6:
+                    approved, approved_at = None, None
+                elif roll < 0.8:
+                    approved, approved_at = 0, None
+                else:
+                    approved = 1
+                    approved_at = (scraped + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S')
+                rows.append((index % PROFILES + 1, text, MessageDeduplicator.generate_message_hash(text),
+                             scraped.strftime('%Y-%m-%d %H:%M:%S'), approved, approved_at))
+            conn.executemany(
+                '''INSERT INTO messages (profile_id, message_text, message_hash, scraped_at,
+                                         approved_for_posting, approved_at)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                rows
+            )
+            conn.commit()
+            print(f"    {min(chunk_start + INSERT_CHUNK, size):,}/{size:,} messages", end='\r')
+        conn.execute('ANALYZE')
+        conn.commit()
+    finally:
+        conn.close()
+    tmp_path.rename(path)
+    print(f"    built {path.name} in {time.perf_counter() - start:.1f}s" + ' ' * 20)
+
+
+def size_label(size: int) -> str:
+    return f"{size // 1000}k" if size < 1_000_000 else f"{size // 1_000_000}M"
+
+
+def get_database_file(data_dir: Path, size: int, seed: int) -> Path:
+    """Cached synthetic database for this size and seed (built on first use)."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    path = data_dir / f"messages_{size}_seed{seed}_v{DATA_VERSION}.db"
+    if not path.exists():
+        print(f"  Building synthetic database with {size:,} messages...")
+        build_database(path, size, seed)
+    return path
+
+
+def bench_text(bench: Bench, seed: int, sample_size: int):
+    """Normalization, hashing and the quality filter (no database)."""
+    from core.message_deduplicator import MessageDeduplicator, MessageQualityFilter
+
+    texts = [synthetic_message(seed, 20_000_000 + i) for i in range(sample_size)]
+    bench.run('dedup.normalize', len(texts),
+              lambda: [MessageDeduplicator.normalize_message_text(t) for t in texts])
+    bench.run('dedup.hash', len(texts),
+              lambda: [MessageDeduplicator.generate_message_hash(t) for t in texts])
+
+    sample = quality_sample(seed, sample_size)
+    bench.run('quality.filter', len(sample),
+              lambda: MessageQualityFilter.filter_quality_messages(sample))
+
+
+def bench_database(bench: Bench, db_file: Path, size: int, seed: int, sample_size: int):
+    """Database-backed benchmarks against one synthetic database."""
+    from core.database import DatabaseManager
+    from core.message_deduplicator import MessageDeduplicator
+
+    label = size_label(size)
+    db = DatabaseManager(str(db_file))
+    rng = random.Random(seed + size)
+
+    hits = [synthetic_message(seed, rng.randrange(size)) for _ in range(sample_size)]
+    misses = [synthetic_message(seed, size + 1_000_000 + i) for i in range(sample_size)]
+    mixed = hits[:sample_size // 2] + misses[:sample_size - sample_size // 2]
+    rng.shuffle(mixed)
+
+    bench.run(f"db.message_exists.hit[{label}]", len(hits), lambda: [db.message_exists(t) for t in hits])
+    bench.run(f"db.message_exists.miss[{label}]", len(misses), lambda: [db.message_exists(t) for t in misses])
+
+    state = {}
+
+    def cold_setup():
+        state['dedup'] = MessageDeduplicator(db)
+
+    def warm_setup():
+        state['dedup'] = MessageDeduplicator(db)
+        for text in mixed:
+            state['dedup'].is_duplicate(text)
+
+    bench.run(f"dedup.is_duplicate_cold[{label}]", len(mixed),
+              lambda: [state['dedup'].is_duplicate(t) for t in mixed], setup=cold_setup)
+    bench.run(f"dedup.is_duplicate_warm[{label}]", len(mixed),
+              lambda: [state['dedup'].is_duplicate(t) for t in mixed], setup=warm_setup)
+
+    # Write paths: insert new messages, then delete them so the cached database is unchanged
+    with db.get_connection() as conn:
+        max_id = conn.execute('SELECT MAX(id) FROM messages').fetchone()[0] or 0
+
+    def restore():
+        with db.get_connection() as conn:
+            conn.execute('DELETE FROM messages WHERE id > ?', (max_id,))
+            conn.commit()
+
+    batch_size = 50
+    batches = [misses[i:i + batch_size] for i in range(0, len(misses), batch_size)]
+    bench.run(f"db.add_message[{label}]", len(misses),
+              lambda: [db.add_message(1, t) for t in misses], teardown=restore)
+    bench.run(f"db.add_messages_batch[{label}]", len(misses),
+              lambda: [db.add_messages_batch(1, batch) for batch in batches], teardown=restore)
+
+
+def noise_floor(name: str) -> float:
+    """Smallest slowdown (us/op) that counts as a regression for this benchmark."""
+    for prefix, floor in NOISE_FLOOR_US.items():
+        if name.startswith(prefix):
+            return floor
+    return DEFAULT_NOISE_FLOOR_US
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Print current vs baseline best rounds; returns the names that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline us':>12} {'current us':>12} {'change':>8} {'noise us':>9} {'median':>8}")
+    print('-' * 95)
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not base.get('best_us'):
+            print(f"{name:<40} {'-':>12} {result['best_us']:>12.2f} {'new':>8}")
+            continue
+        change = result['best_us'] / base['best_us'] - 1
+        slowdown = result['best_us'] - base['best_us']
+        noise = max(noise_floor(name), 2 * max(base.get('stdev_us', 0.0), result['stdev_us']))
+        median_change = result['median_us'] / base['median_us'] - 1 if base.get('median_us') else 0.0
+        flag = ''
+        if change > threshold and slowdown > noise:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<40} {base['best_us']:>12.2f} {result['best_us']:>12.2f} {change * 100:>+7.1f}% "
+              f"{noise:>9.2f} {median_change * 100:>+7.1f}%{flag}")
+    return regressions
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks for dedup, normalization, database and quality filter')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='Synthetic database sizes (messages)')
+    parser.add_argument('--sample', type=int, default=1000, help='Operations per round')
+    parser.add_argument('--repeat', type=int, default=7, help='Rounds per benchmark')
+    parser.add_argument('--min-round', type=float, default=0.2,
+                        help='Minimum seconds per round for benchmarks without setup (default 0.2)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--data-dir', type=Path, default=DEFAULT_DATA_DIR,
+                        help=f"Cache directory for synthetic databases (default {DEFAULT_DATA_DIR})")
+    parser.add_argument('--only', nargs='+', default=None,
+                        help='Run benchmarks whose name contains any of these strings')
+    parser.add_argument('--json', default=None, help='Write results to this JSON file')
+    parser.add_argument('--baseline', default=None, help='Earlier results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='Allowed slowdown vs baseline before failing (fraction, default 0.15)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    # config only needs a database path; every benchmark opens its own database
+    os.environ.setdefault('DATABASE_PATH', str(args.data_dir / 'unused.db'))
+
+    bench = Bench(args.repeat, args.only, args.min_round)
+    print('Text:')
+    bench_text(bench, args.seed, args.sample)
+    for size in args.sizes:
+        if not any(bench.wanted(f"{name}[{size_label(size)}]") for name in DATABASE_BENCHMARKS):
+            continue
+        print(f"Database ({size:,} messages):")
+        db_file = get_database_file(args.data_dir, size, args.seed)
+        bench_database(bench, db_file, size, args.seed, args.sample)
+
+    document = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'sizes': args.sizes,
+            'sample': args.sample,
+            'repeat': args.repeat,
+            'min_round': args.min_round,
+            'seed': args.seed,
+        },
+        'results': bench.results,
+    }
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(bench.results, baseline.get('results', {}), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than baseline by more than "
+                  f"{args.threshold * 100:.0f}% and their noise margin: {', '.join(regressions)}")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold * 100:.0f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
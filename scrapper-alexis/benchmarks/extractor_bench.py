@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Extractor benchmark against the offline feed simulator.
+
+Runs facebook_extractor._smart_scroll_and_extract_with_db in headless
+Firefox (with the scraper's FIREFOX_USER_PREFS, like relay_agent.py) against
+benchmarks/feed_simulator.py, once per scroll strategy, each with a fresh
+temporary database. --browser chromium compares against Chromium. The page is wrapped to record:
+
+- scrolls:   scroll gestures (scrollBy, mouse wheel, PageDown bursts)
+- wait:      wait_for_timeout time requested by the extractor (nominal) and
+             actually slept (nominal x --time-scale)
+- IPC bytes: bytes crossing the Playwright boundary for page.evaluate
+             (script + JSON result)
+
+posts/min is reported for the measured run and projected to production
+waits (measured time - actual waits + nominal waits).
+
+Usage:
+    python3 benchmarks/extractor_bench.py
+    python3 benchmarks/extractor_bench.py --strategies default --target 50 --latency 1500
+    python3 benchmarks/extractor_bench.py --known 20 --json results.json
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from feed_simulator import FeedSimulator, DEFAULT_FEED_OPTIONS, generate_posts
+
+STRATEGIES = ('default', 'mouse_wheel', 'page_down')
+
+
+class _InstrumentedInput:
+    """Counts mouse wheel / PageDown scroll gestures on the wrapped device."""
+
+    def __init__(self, device, page: 'InstrumentedPage'):
+        self._device = device
+        self._page = page
+
+    def wheel(self, delta_x: float, delta_y: float):
+        self._page.record_scroll('wheel')
+        return self._device.wheel(delta_x, delta_y)
+
+    def press(self, key: str, **kwargs):
+        if key == 'PageDown':
+            self._page.record_scroll('page_down')
+        return self._device.press(key, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._device, name)
+
+
+class InstrumentedPage:
+    """Playwright Page proxy recording scrolls, waits and evaluate traffic."""
+
+    def __init__(self, page, time_scale: float):
+        self._page = page
+        self._time_scale = time_scale
+        self._last_scroll = None
+        self.mouse = _InstrumentedInput(page.mouse, self)
+        self.keyboard = _InstrumentedInput(page.keyboard, self)
+        self.metrics = {
+            'scrolls': 0,
+            'evaluate_calls': 0,
+            'ipc_bytes': 0,
+            'nominal_wait_s': 0.0,
+            'actual_wait_s': 0.0,
+        }
+
+    def record_scroll(self, kind: str):
+        # Consecutive PageDown presses (separated only by waits) are one gesture
+        if kind == 'page_down' and self._last_scroll == 'page_down':
+            return
+        self._last_scroll = kind
+        self.metrics['scrolls'] += 1
+
+    def evaluate(self, expression: str, *args):
+        if 'scrollBy' in expression:
+            self.record_scroll('script')
+        else:
+            self._last_scroll = None
+        result = self._page.evaluate(expression, *args)
+        sent = len(expression.encode('utf-8')) + sum(len(json.dumps(arg).encode('utf-8')) for arg in args)
+        received = len(json.dumps(result, ensure_ascii=False).encode('utf-8'))
+        self.metrics['evaluate_calls'] += 1
+        self.metrics['ipc_bytes'] += sent + received
+        return result
+
+    def wait_for_timeout(self, timeout: float):
+        self.metrics['nominal_wait_s'] += timeout / 1000
+        start = time.perf_counter()
+        self._page.wait_for_timeout(timeout * self._time_scale)
+        self.metrics['actual_wait_s'] += time.perf_counter() - start
+
+    def __getattr__(self, name):
+        return getattr(self._page, name)
+
+
+def _fresh_database(tmp_dir: str, feed_options: Dict[str, int], known: int):
+    """Temporary database with one profile and optionally the first `known` feed posts."""
+    from core import database, message_deduplicator
+
+    db = database.initialize_database(os.path.join(tmp_dir, 'bench.db'))
+    message_deduplicator._deduplicator_instance = None
+    profile_id = db.add_profile('feed_simulator', f"simulator-{time.time_ns()}", 'bench')
+    for post in generate_posts(feed_options['seed'], 0, known, feed_options['total'], feed_options['comments']):
+        db.add_message(profile_id, post['text'])
+    return profile_id
+
+
+def run_strategy(browser, server: FeedSimulator, strategy: str, args, feed_options: Dict[str, int]) -> Dict[str, Any]:
+    """Run one extraction against a fresh feed page and database."""
+    from facebook.facebook_extractor import _smart_scroll_and_extract_with_db
+    from utils.selector_strategies import MESSAGE_SELECTORS
+
+    with tempfile.TemporaryDirectory(prefix='extractor_bench_') as tmp_dir:
+        profile_id = _fresh_database(tmp_dir, feed_options, args.known)
+
+        context = browser.new_context(viewport={'width': 1280, 'height': 900})
+        page = context.new_page()
+        try:
+            page.goto(server.feed_url(**feed_options), wait_until='domcontentloaded')
+            page.wait_for_selector('div[role="article"]')
+            server.reset_stats()
+
+            instrumented = InstrumentedPage(page, args.time_scale)
+            start = time.perf_counter()
+            messages, stats = _smart_scroll_and_extract_with_db(
+                instrumented, MESSAGE_SELECTORS[0], profile_id, args.target,
+                max_scrolls=args.max_scrolls, scroll_strategy=strategy
+            )
+            elapsed = time.perf_counter() - start
+            feed_stats = page.evaluate('window.__feedStats')
+        finally:
+            context.close()
+
+    metrics = instrumented.metrics
+    projected = elapsed - metrics['actual_wait_s'] + metrics['nominal_wait_s']
+    return {
+        'strategy': strategy,
+        'messages': len(messages),
+        'new_messages': stats['new_messages'],
+        'duplicates_found': stats['duplicates_found'],
+        'stopped_due_to_duplicate': stats['stopped_due_to_duplicate'],
+        'elapsed_s': round(elapsed, 3),
+        'projected_s': round(projected, 3),
+        'posts_per_min': round(len(messages) / elapsed * 60, 1) if elapsed else 0,
+        'projected_posts_per_min': round(len(messages) / projected * 60, 1) if projected else 0,
+        'scrolls': metrics['scrolls'],
+        'evaluate_calls': metrics['evaluate_calls'],
+        'ipc_bytes': metrics['ipc_bytes'],
+        'nominal_wait_s': round(metrics['nominal_wait_s'], 2),
+        'actual_wait_s': round(metrics['actual_wait_s'], 2),
+        'lazy_load_requests': server.stats()['requests'],
+        'dom_removed': feed_stats['removed'],
+    }
+
+
+def print_report(results):
+    header = (f"{'strategy':<12} {'msgs':>5} {'posts/min':>10} {'proj/min':>9} {'scrolls':>8} "
+              f"{'wait s':>8} {'nominal s':>10} {'IPC KB':>8} {'loads':>6}")
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(f"{r['strategy']:<12} {r['messages']:>5} {r['posts_per_min']:>10} {r['projected_posts_per_min']:>9} "
+              f"{r['scrolls']:>8} {r['actual_wait_s']:>8} {r['nominal_wait_s']:>10} "
+              f"{r['ipc_bytes'] / 1024:>8.1f} {r['lazy_load_requests']:>6}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Extractor benchmark against the offline feed simulator')
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=STRATEGIES)
+    parser.add_argument('--target', type=int, default=40, help='Messages to extract per run')
+    parser.add_argument('--max-scrolls', type=int, default=20)
+    parser.add_argument('--known', type=int, default=0, help='Feed posts already in the database')
+    parser.add_argument('--time-scale', type=float, default=0.05,
+                        help='Fraction of each extractor wait actually slept (1 = production timing)')
+    for key, value in DEFAULT_FEED_OPTIONS.items():
+        parser.add_argument(f"--{key}", type=int, default=value, help=f"Feed option (default {value})")
+    parser.add_argument('--browser', default='firefox', choices=('firefox', 'chromium'),
+                        help='Browser engine (the scraper runs Firefox)')
+    parser.add_argument('--headed', action='store_true', help='Show the browser')
+    parser.add_argument('--verbose', action='store_true', help='Show extractor logs')
+    parser.add_argument('--json', default=None, help='Also write results to this JSON file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from playwright.sync_api import sync_playwright
+
+    feed_options = {key: getattr(args, key) for key in DEFAULT_FEED_OPTIONS}
+    server = FeedSimulator().start()
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix='extractor_bench_cfg_') as cfg_dir:
+            # config only needs a database path; each run initializes its own database
+            os.environ.setdefault('DATABASE_PATH', os.path.join(cfg_dir, 'unused.db'))
+            with sync_playwright() as p:
+                if args.browser == 'firefox':
+                    from utils.browser_config import FIREFOX_USER_PREFS
+                    browser = p.firefox.launch(headless=not args.headed, firefox_user_prefs=FIREFOX_USER_PREFS)
+                else:
+                    browser = p.chromium.launch(headless=not args.headed)
+                try:
+                    for strategy in args.strategies:
+                        results.append(run_strategy(browser, server, strategy, args, feed_options))
+                finally:
+                    browser.close()
+    finally:
+        server.stop()
+
+    print(f"Browser: {args.browser}, feed: {feed_options}, target {args.target}, time scale {args.time_scale}\n")
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'browser': args.browser, 'feed': feed_options, 'target': args.target, 'time_scale': args.time_scale,
+                       'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
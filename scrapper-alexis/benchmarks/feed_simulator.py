@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Offline Facebook feed simulator for extractor benchmarks.
+
+Serves a synthetic infinite-scroll feed that reproduces the DOM shapes
+facebook_extractor targets:
+
+- posts:     div[role="article"] > div.xdj266r.x14z9mp.xat24cr.x1lziwak.x1vvkbs
+- comments:  div.xwib8y2 containers holding the same post classes (must be skipped)
+- UI noise:  banner/navigation text and short action labels (must be filtered)
+
+New posts are fetched from /api/posts when the viewport nears the bottom, with
+a configurable server-side latency. Like Facebook, the feed is virtualized:
+once more than `window` articles are in the DOM, the oldest are removed and
+replaced by a spacer so the scroll position stays stable.
+
+The feed is deterministic for a given seed, so runs are reproducible and
+benchmarks can pre-seed the database with posts "scraped before".
+
+Usage:
+    python3 benchmarks/feed_simulator.py --port 8765
+    # then open http://127.0.0.1:8765/feed?latency=800&batch=10&window=30&total=300
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List
+
+DEFAULT_FEED_OPTIONS = {
+    'seed': 1,          # Feed content seed
+    'total': 300,       # Posts before the feed ends
+    'batch': 10,        # Posts per lazy-load request
+    'latency': 800,     # Server-side lazy-load latency (ms)
+    'window': 30,       # Articles kept in the DOM (virtualization)
+    'comments': 2,      # Max comments rendered under a post
+}
+
+_WORDS = (
+    'cuando tu mejor amigo dice que ya viene pero sigue en su casa la vida es '
+    'demasiado corta para tomar café malo nadie me avisó que ser adulto era '
+    'pagar cosas todo el tiempo mi perro me mira como si yo fuera el problema '
+    'el lunes debería ser opcional la dieta empieza mañana otra vez cuando por '
+    'fin encuentras el control de la tele y ya no hay nada que ver'
+).split()
+
+_COMMENTS = (
+    'Jajaja literal yo todos los días',
+    'Etiqueta a ese amigo que siempre llega tarde',
+    'Esto me pasó ayer y no me pude reír',
+    'No puedo con esto, demasiado real',
+)
+
+
+def generate_posts(seed: int, offset: int, count: int, total: int, max_comments: int = 2) -> List[Dict]:
+    """
+    Deterministic feed slice.
+
+    Args:
+        seed: Feed content seed
+        offset: Index of the first post
+        count: Number of posts requested
+        total: Posts before the feed ends
+        max_comments: Max comments per post
+
+    Returns:
+        List of {'index', 'text', 'comments'} dictionaries
+    """
+    posts = []
+    for index in range(offset, min(offset + count, total)):
+        rng = random.Random(seed * 1_000_003 + index)
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(6, 30))]
+        text = ' '.join(words).capitalize() + f" #{index}"
+        # Some posts are too short to keep (the extractor drops < 20 chars)
+        if rng.random() < 0.05:
+            text = rng.choice(('Buenos días', 'Jajaja', 'Ver más'))
+        comments = [rng.choice(_COMMENTS) for _ in range(rng.randint(0, max_comments))]
+        posts.append({'index': index, 'text': text, 'comments': comments})
+    return posts
+
+
+FEED_PAGE = '''<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Feed simulator</title>
+<style>
+  body { margin: 0; font-family: sans-serif; background: #f0f2f5; }
+  [role="banner"] { position: sticky; top: 0; height: 56px; background: #fff; z-index: 1; }
+  #feed { width: 680px; margin: 0 auto; }
+  [role="article"] { background: #fff; margin: 16px 0; padding: 12px; min-height: 320px; border-radius: 8px; }
+  .xwib8y2 { margin-top: 12px; padding: 8px; background: #f0f2f5; border-radius: 16px; }
+  .actions { display: flex; gap: 24px; margin-top: 12px; }
+</style>
+</head>
+<body>
+<div role="banner">
+  <div role="navigation"><div class="xdj266r x1vvkbs">Activa las notificaciones push están desactivadas</div></div>
+</div>
+<div id="feed"><div id="spacer"></div></div>
+<div id="end" hidden>No hay más publicaciones</div>
+<script>
+(() => {
+  const params = new URLSearchParams(location.search);
+  const opts = %(options)s;
+  for (const key of Object.keys(opts)) {
+    if (params.has(key)) opts[key] = Number(params.get(key));
+  }
+  const feed = document.getElementById('feed');
+  const spacer = document.getElementById('spacer');
+  let offset = 0, loading = false, done = false, removedHeight = 0;
+  window.__feedStats = {requests: 0, rendered: 0, removed: 0};
+
+  function postDiv(text, extraClass) {
+    const div = document.createElement('div');
+    div.className = 'xdj266r x14z9mp xat24cr x1lziwak x1vvkbs' + (extraClass || '');
+    const inner = document.createElement('div');
+    inner.dir = 'auto';
+    inner.textContent = text;
+    div.appendChild(inner);
+    return div;
+  }
+
+  function render(post) {
+    const article = document.createElement('div');
+    article.setAttribute('role', 'article');
+    article.dataset.index = post.index;
+    article.appendChild(postDiv(post.text));
+    for (const comment of post.comments) {
+      const container = document.createElement('div');
+      container.className = 'xwib8y2 x1y1aw1k';
+      container.appendChild(postDiv(comment));
+      article.appendChild(container);
+    }
+    const actions = document.createElement('div');
+    actions.className = 'actions';
+    for (const label of ['Me gusta', 'Comentar', 'Compartir']) {
+      const button = document.createElement('div');
+      button.setAttribute('role', 'button');
+      button.textContent = label;
+      actions.appendChild(button);
+    }
+    article.appendChild(actions);
+    return article;
+  }
+
+  function virtualize() {
+    // Facebook drops off-screen articles; keep the page height with a spacer
+    while (feed.children.length - 1 > opts.window) {
+      const first = spacer.nextElementSibling;
+      const style = getComputedStyle(first);
+      removedHeight += first.offsetHeight + parseFloat(style.marginTop) + parseFloat(style.marginBottom);
+      first.remove();
+      window.__feedStats.removed++;
+    }
+    spacer.style.height = removedHeight + 'px';
+  }
+
+  async function loadMore() {
+    if (loading || done) return;
+    loading = true;
+    window.__feedStats.requests++;
+    const query = `offset=${offset}&count=${opts.batch}&seed=${opts.seed}&total=${opts.total}` +
+                  `&latency=${opts.latency}&comments=${opts.comments}`;
+    try {
+      const posts = await (await fetch('/api/posts?' + query)).json();
+      if (!posts.length) {
+        done = true;
+        document.getElementById('end').hidden = false;
+      }
+      for (const post of posts) feed.appendChild(render(post));
+      offset += posts.length;
+      window.__feedStats.rendered += posts.length;
+      virtualize();
+    } finally {
+      loading = false;
+    }
+    checkBottom();
+  }
+
+  function checkBottom() {
+    if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 2 * window.innerHeight) {
+      loadMore();
+    }
+  }
+
+  window.addEventListener('scroll', checkBottom, {passive: true});
+  loadMore();
+})();
+</script>
+</body>
+</html>
+'''
+
+
+class FeedRequestHandler(BaseHTTPRequestHandler):
+    """Serves the feed page and the lazy-load API."""
+
+    server_version = 'FeedSimulator/1.0'
+
+    def _query(self) -> Dict[str, int]:
+        options = dict(DEFAULT_FEED_OPTIONS)
+        for key, values in parse_qs(urlparse(self.path).query).items():
+            if key in options or key in ('offset', 'count'):
+                try:
+                    options[key] = int(values[0])
+                except ValueError:
+                    pass
+        return options
+
+    def _send(self, status: int, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path in ('/', '/feed'):
+            page = FEED_PAGE % {'options': json.dumps(DEFAULT_FEED_OPTIONS)}
+            self._send(200, 'text/html; charset=utf-8', page.encode('utf-8'))
+        elif path == '/api/posts':
+            options = self._query()
+            time.sleep(max(0, options['latency']) / 1000)
+            posts = generate_posts(options['seed'], options.get('offset', 0), options.get('count', options['batch']),
+                                   options['total'], options['comments'])
+            self.server.record(len(posts))
+            self._send(200, 'application/json', json.dumps(posts, ensure_ascii=False).encode('utf-8'))
+        elif path == '/api/stats':
+            self._send(200, 'application/json', json.dumps(self.server.stats()).encode('utf-8'))
+        else:
+            self._send(404, 'text/plain', b'not found')
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+
+class FeedSimulator(ThreadingHTTPServer):
+    """Feed server running on a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        super().__init__((host, port), FeedRequestHandler)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._posts_served = 0
+        self._thread = None
+
+    def record(self, posts: int):
+        with self._lock:
+            self._requests += 1
+            self._posts_served += posts
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'requests': self._requests, 'posts_served': self._posts_served}
+
+    def reset_stats(self):
+        with self._lock:
+            self._requests = 0
+            self._posts_served = 0
+
+    def feed_url(self, **options) -> str:
+        """URL of the feed page with the given options (see DEFAULT_FEED_OPTIONS)."""
+        host, port = self.server_address[:2]
+        query = '&'.join(f"{key}={value}" for key, value in options.items())
+        return f"http://{host}:{port}/feed" + (f"?{query}" if query else '')
+
+    def start(self) -> 'FeedSimulator':
+        self._thread = threading.Thread(target=self.serve_forever, name='feed-simulator', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Offline Facebook feed simulator')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server = FeedSimulator(args.host, args.port)
+    print(f"Serving {server.feed_url()} (options: {', '.join(DEFAULT_FEED_OPTIONS)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
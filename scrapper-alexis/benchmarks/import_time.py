@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the entry points (python -X importtime).
+
+Imports each entry point module in a fresh interpreter, parses the
+-X importtime report and prints the cumulative import time of the module and
+of config. With --ref the same measurement runs against another git revision
+(checked out in a temporary worktree) for a before/after comparison.
+
+Usage:
+    python3 benchmarks/import_time.py                      # Current tree
+    python3 benchmarks/import_time.py --ref HEAD~1         # Compare with a revision
+    python3 benchmarks/import_time.py --repeat 10 --modules config core.database
+
+Set DATABASE_PATH when the Laravel database is not at its default location
+(a revision with import-time config loading exits without it).
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = [
+    'config',
+    'core.database',
+    'relay_agent',
+    'facebook_page_poster',
+    'generate_message_images',
+    'generate_posting_log',
+    'db_maintenance',
+    'twitter.twitter_post',
+]
+
+# "import time:       self [us] |  cumulative | imported package"
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure_import(module: str, project_dir: Path) -> Dict:
+    """
+    Import a module once in a fresh interpreter with -X importtime.
+
+    Returns:
+        Dictionary with total_us (cumulative time of the module), config_us
+        (cumulative time of config, if imported) or error
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(project_dir), env.get('PYTHONPATH')]))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=project_dir, env=env, capture_output=True, text=True
+    )
+
+    cumulative = {}
+    other_lines = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            # Keep the first (outermost) entry per module name
+            cumulative.setdefault(match.group(4), int(match.group(2)))
+        elif line.strip():
+            other_lines.append(line)
+
+    if proc.returncode != 0:
+        return {'error': other_lines[-1] if other_lines else f"exit code {proc.returncode}"}
+    return {
+        'total_us': cumulative.get(module),
+        'config_us': cumulative.get('config'),
+    }
+
+
+def measure_tree(project_dir: Path, modules: List[str], repeat: int) -> Dict[str, Dict]:
+    """Best-of-N import times for each module in a project directory."""
+    results = {}
+    for module in modules:
+        runs = [measure_import(module, project_dir) for _ in range(repeat)]
+        ok = [run for run in runs if 'error' not in run and run['total_us'] is not None]
+        if not ok:
+            results[module] = {'error': runs[-1].get('error', 'module not in importtime report')}
+            continue
+        results[module] = {
+            'total_us': min(run['total_us'] for run in ok),
+            'config_us': min((run['config_us'] for run in ok if run['config_us'] is not None), default=None),
+        }
+    return results
+
+
+def measure_ref(ref: str, modules: List[str], repeat: int) -> Dict[str, Dict]:
+    """Measure a git revision in a temporary worktree."""
+    repo_root = Path(subprocess.check_output(
+        ['git', 'rev-parse', '--show-toplevel'], cwd=PROJECT_DIR, text=True).strip())
+    prefix = subprocess.check_output(['git', 'rev-parse', '--show-prefix'], cwd=PROJECT_DIR, text=True).strip()
+    worktree = Path(tempfile.mkdtemp(prefix='import_time_'))
+    try:
+        subprocess.run(['git', 'worktree', 'add', '--detach', str(worktree), ref],
+                       cwd=repo_root, check=True, capture_output=True)
+        return measure_tree(worktree / prefix, modules, repeat)
+    finally:
+        subprocess.run(['git', 'worktree', 'remove', '--force', str(worktree)], cwd=repo_root, capture_output=True)
+        shutil.rmtree(worktree, ignore_errors=True)
+
+
+def _ms(value: Optional[int]) -> str:
+    return '-' if value is None else f"{value / 1000:.1f}"
+
+
+def print_report(current: Dict[str, Dict], baseline: Optional[Dict[str, Dict]] = None, ref: str = None):
+    """Print a per-module table (and the change against the baseline)."""
+    header = f"{'module':<28} {'import ms':>10} {'config ms':>10}"
+    if baseline is not None:
+        header += f" {ref + ' ms':>14} {'change':>8}"
+    print(header)
+    print('-' * len(header))
+
+    for module, result in current.items():
+        if 'error' in result:
+            print(f"{module:<28} error: {result['error']}")
+            continue
+        line = f"{module:<28} {_ms(result['total_us']):>10} {_ms(result['config_us']):>10}"
+        if baseline is not None:
+            base = baseline.get(module, {})
+            if 'error' in base or not base:
+                line += f" {'error':>14}"
+            else:
+                change = (result['total_us'] - base['total_us']) / base['total_us'] * 100
+                line += f" {_ms(base['total_us']):>14} {change:>+7.0f}%"
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Entry point import-time benchmark')
+    parser.add_argument('--modules', nargs='+', default=ENTRY_POINTS, help='Modules to import')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per module (best is reported)')
+    parser.add_argument('--ref', default=None, help='Git revision to compare against (e.g. HEAD~1)')
+    parser.add_argument('--json', default=None, help='Also write results to this JSON file')
+    args = parser.parse_args()
+
+    current = measure_tree(PROJECT_DIR, args.modules, args.repeat)
+    baseline = measure_ref(args.ref, args.modules, args.repeat) if args.ref else None
+    print_report(current, baseline, args.ref)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'current': current, 'baseline': baseline, 'ref': args.ref}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
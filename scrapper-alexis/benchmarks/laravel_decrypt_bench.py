@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test vectors and benchmark for utils.laravel_decrypt.
+
+First verifies every vector in data/laravel_crypt_vectors.json (single and
+batch decryption, MAC rejection, APP_PREVIOUS_KEYS). Then times:
+
+- uncached: key cache cleared before every value (the former behaviour,
+  .env located and parsed on each decrypt)
+- cached:   decrypt_laravel_value() with the cached key
+- batch:    decrypt_many() over the same values
+
+Usage:
+    python3 benchmarks/laravel_decrypt_bench.py
+    python3 benchmarks/laravel_decrypt_bench.py --iterations 5000 --vectors other.json
+
+Only vectors produced by Laravel itself prove compatibility, so verification
+fails unless the file's "generator" is laravel/framework (--allow-synthetic
+accepts others, e.g. to benchmark). Regenerate them with:
+    php scrapper-alexis/benchmarks/laravel_vectors.php > scrapper-alexis/benchmarks/data/laravel_crypt_vectors.json
+"""
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import laravel_decrypt
+from utils.laravel_decrypt import decrypt_laravel_value, decrypt_many, clear_key_cache, _decrypt_one, _decode_key
+
+DEFAULT_VECTORS = Path(__file__).resolve().parent / 'data' / 'laravel_crypt_vectors.json'
+
+
+def verify_vectors(doc: dict, allow_synthetic: bool = False) -> int:
+    """Check every vector; returns the number of failures."""
+    keys = [_decode_key(doc['app_key'])] + [_decode_key(key) for key in doc.get('previous_keys', [])]
+    failures = 0
+
+    generator = doc.get('generator', 'unknown')
+    if generator.startswith('laravel/framework'):
+        print(f"[OK] vectors generated by {generator}")
+    else:
+        failures += not allow_synthetic
+        print(f"[{'WARN' if allow_synthetic else 'FAIL'}] vectors not generated by Laravel ({generator})")
+
+    for vector in doc['vectors']:
+        try:
+            result = _decrypt_one(vector['payload'], keys)
+            outcome = 'ok' if result == vector['plaintext'] else f"wrong plaintext {result!r}"
+        except ValueError as e:
+            outcome = 'mac_invalid' if 'MAC' in str(e) else f"error: {e}"
+        passed = outcome == vector['expect']
+        failures += not passed
+        print(f"[{'OK' if passed else 'FAIL'}] {vector['name']}: {outcome}")
+
+    # Batch API must agree with the single-value API (undecryptable payloads come back as '')
+    payloads = [vector['payload'] for vector in doc['vectors']]
+    batch = decrypt_many(payloads, keys=keys)
+    single = [decrypt_laravel_value(payload, keys=keys) for payload in payloads]
+    if batch != single:
+        failures += 1
+        print("[FAIL] decrypt_many differs from decrypt_laravel_value")
+    else:
+        print(f"[OK] decrypt_many matches decrypt_laravel_value for {len(payloads)} payloads")
+    return failures
+
+
+def benchmark(doc: dict, iterations: int):
+    """Time uncached, cached and batch decryption of the valid vectors."""
+    values = [vector['payload'] for vector in doc['vectors'] if vector['expect'] == 'ok' and vector['key'] == 'current']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env_file = Path(tmp) / '.env'
+        env_file.write_text("APP_NAME=Laravel\nAPP_ENV=production\n" + "FILLER=x\n" * 40 +
+                            f"APP_KEY={doc['app_key']}\n")
+        # Point the key lookup at the temporary .env (benchmark only)
+        laravel_decrypt._get_laravel_env_path = lambda: str(env_file)
+
+        timings = {}
+        count = iterations * len(values)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for value in values:
+                clear_key_cache()
+                decrypt_laravel_value(value)
+        timings['uncached'] = time.perf_counter() - start
+
+        clear_key_cache()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for value in values:
+                decrypt_laravel_value(value)
+        timings['cached'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            decrypt_many(values)
+        timings['batch'] = time.perf_counter() - start
+
+    print(f"\n{count} decryptions ({len(values)} values x {iterations})")
+    for name, elapsed in timings.items():
+        speedup = timings['uncached'] / elapsed if elapsed else 0
+        print(f"  {name:<9} {elapsed * 1e6 / count:8.1f} us/value  ({speedup:.1f}x vs uncached)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Laravel decrypt test vectors and benchmark')
+    parser.add_argument('--vectors', type=Path, default=DEFAULT_VECTORS, help='Vector file')
+    parser.add_argument('--iterations', type=int, default=1000, help='Benchmark iterations')
+    parser.add_argument('--verify-only', action='store_true', help='Skip the benchmark')
+    parser.add_argument('--allow-synthetic', action='store_true',
+                        help='Accept vectors that were not generated by Laravel (warn only)')
+    args = parser.parse_args()
+
+    with open(args.vectors, 'r', encoding='utf-8') as f:
+        doc = json.load(f)
+
+    failures = verify_vectors(doc, args.allow_synthetic)
+    if failures:
+        print(f"\n{failures} vector check(s) failed")
+        return 1
+
+    if not args.verify_only:
+        benchmark(doc, args.iterations)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
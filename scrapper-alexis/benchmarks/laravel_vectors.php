@@ -0,0 +1,68 @@
+<?php
+/**
+ * Regenerate benchmarks/data/laravel_crypt_vectors.json with Laravel's own Encrypter.
+ *
+ * Usage (from the repository root, after composer install in scrapper-alexis-web):
+ *     php scrapper-alexis/benchmarks/laravel_vectors.php > scrapper-alexis/benchmarks/data/laravel_crypt_vectors.json
+ *
+ * Uses fixed test keys (never the application's APP_KEY). IVs are random, so
+ * payloads differ on every run; the plaintexts and expectations do not.
+ * The "generator" field records the Laravel version; laravel_decrypt_bench.py
+ * only accepts vectors whose generator is laravel/framework.
+ */
+
+require __DIR__ . '/../../scrapper-alexis-web/vendor/autoload.php';
+
+use Illuminate\Encryption\Encrypter;
+
+$key = hash('sha256', 'scrapper-alexis test key', true);
+$previousKey = hash('sha256', 'scrapper-alexis previous test key', true);
+$unknownKey = hash('sha256', 'other', true);
+
+$current = new Encrypter($key, 'aes-256-cbc');
+$previous = new Encrypter($previousKey, 'aes-256-cbc');
+$unknown = new Encrypter($unknownKey, 'aes-256-cbc');
+
+$vectors = [];
+$add = function (string $name, Encrypter $encrypter, string $keyName, string $plaintext, bool $serialize = false, string $expect = 'ok') use (&$vectors) {
+    $vectors[] = [
+        'name' => $name,
+        'method' => $serialize ? 'encrypt' : 'encryptString',
+        'key' => $keyName,
+        'payload' => $serialize ? $encrypter->encrypt($plaintext) : $encrypter->encryptString($plaintext),
+        'plaintext' => $expect === 'ok' ? $plaintext : null,
+        'expect' => $expect,
+    ];
+};
+
+$add('ascii_password', $current, 'current', '0In6TAX309');
+$add('proxy_password', $current, 'current', 'p@ss:w0rd/with=symbols');
+$add('utf8', $current, 'current', 'contraseña ñandú 🔒');
+$add('empty', $current, 'current', '');
+$add('block_aligned', $current, 'current', '0123456789abcdef');
+$add('long', $current, 'current', str_repeat('x', 1000));
+$add('serialized_ascii', $current, 'current', '0In6TAX309', true);
+$add('serialized_utf8', $current, 'current', 'contraseña ñandú', true);
+$add('previous_key', $previous, 'previous', 'rotated secret');
+
+// Tampered MAC
+$payload = json_decode(base64_decode($current->encryptString('tampered')), true);
+$payload['mac'] = str_repeat('0', 64);
+$vectors[] = [
+    'name' => 'invalid_mac',
+    'method' => 'encryptString',
+    'key' => 'current',
+    'payload' => base64_encode(json_encode($payload, JSON_UNESCAPED_SLASHES)),
+    'plaintext' => null,
+    'expect' => 'mac_invalid',
+];
+
+$add('unknown_key', $unknown, 'unknown', 'secret', false, 'mac_invalid');
+
+echo json_encode([
+    'generator' => 'laravel/framework ' . \Composer\InstalledVersions::getPrettyVersion('laravel/framework'),
+    'cipher' => 'AES-256-CBC',
+    'app_key' => 'base64:' . base64_encode($key),
+    'previous_keys' => ['base64:' . base64_encode($previousKey)],
+    'vectors' => $vectors,
+], JSON_PRETTY_PRINT | JSON_UNESCAPED_SLASHES | JSON_UNESCAPED_UNICODE) . "\n";
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Equivalence check and benchmark for MessageQualityFilter.evaluate_batch.
+
+First checks that evaluate_batch gives the same verdict as the scalar
+is_valid_message for:
+
+- boundary cases (length 4/5, 49/50, 2000/2001, exactly 4 words, exactly
+  30% special characters, Unicode whitespace, case-changing characters)
+- --cases random strings drawn from alphabets mixing ASCII, Spanish
+  accents, emoji, punctuation, Unicode whitespace and UI labels
+- a property-based search with hypothesis (pip install -r requirements-dev.txt)
+
+Then times filtering the same batch with the scalar loop and the batch API.
+Exits 1 on any mismatch, or when hypothesis is missing (unless
+--skip-hypothesis is given).
+
+Usage:
+    python3 benchmarks/quality_filter_bench.py
+    python3 benchmarks/quality_filter_bench.py --cases 200000 --batch 5000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    from hypothesis import given, settings, strategies as st
+    HYPOTHESIS_AVAILABLE = True
+except ImportError:
+    HYPOTHESIS_AVAILABLE = False
+
+_ALPHABETS = (
+    'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789',
+    'áéíóúñÁÉÍÓÚÑüÜ¿¡',
+    '😂👍🔥❤\ufe0f🙏',
+    '!"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~…“”',
+    ' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f\x85\xa0\u1680\u2000\u2003\u2028\u2029\u202f\u3000',
+    'İıſKÅ²³½ⅫΣς\u0301\u200b\ufeff',
+)
+
+_UI_LABELS = ('Me gusta', 'Comentar', 'COMPARTIR', 'Ver más', 'see more', 'Loading', 'reaccionar', 'like')
+
+
+def boundary_cases() -> List:
+    words = ['uno', 'dos', 'tres', 'cuatro', 'cinco']
+    cases = [
+        None, '', '    ', 0, 123, ['lista'], b'bytes de texto con cinco palabras',
+        'abcd', 'abcde', '  abcd  ', ' abcde ',
+        ' '.join(words[:4]), ' '.join(words), '\xa0'.join(words), '\x1c'.join(words), '\u200b'.join(words),
+        'a' * 2000, 'a' * 2001, ('uno dos tres cuatro ' * 100)[:2000], ('uno dos tres cuatro ' * 101)[:2001],
+        'x' * 44 + ' like', 'x' * 45 + ' like', 'x' * 43 + ' like y', 'y ' * 25 + 'share',
+        'Me gusta esto mucho jaja jaja', 'ME GUSTA esto mucho de verdad ' + 'x' * 30,
+        'İİİİ share uno dos tres', 'ßßß comentar uno dos tres',
+        # Special characters around the 30% limit (11 chars: 3 special passes, 4 fails)
+        'ab cd ef!!!', 'ab cd e!!!!', 'a b c d e ! ! !', '😂 😂 uno dos tres', '!!! ??? ... uno dos',
+    ]
+    for special in range(0, 21):
+        text = 'hola como estas mi amigo ' + '!' * special
+        cases.append(text[:40])
+        cases.append(text)
+    return cases
+
+
+def random_text(rng: random.Random) -> str:
+    alphabet = ''.join(rng.sample(_ALPHABETS, rng.randint(1, len(_ALPHABETS))))
+    length = rng.choice((rng.randint(0, 12), rng.randint(0, 60), rng.randint(0, 300), rng.randint(1990, 2010)))
+    chars = [rng.choice(alphabet) for _ in range(length)]
+    for _ in range(rng.randint(0, 2)):
+        chars.insert(rng.randint(0, len(chars)), rng.choice(_UI_LABELS))
+    if rng.random() < 0.5:
+        # Word-like text so the word count and special character checks are reached
+        words = [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 8))) for _ in range(rng.randint(1, 12))]
+        return ' '.join(words) + ''.join(chars[:rng.randint(0, 20)])
+    return ''.join(chars)
+
+
+def check(texts: List, label: str) -> int:
+    from core.message_deduplicator import MessageQualityFilter
+
+    verdicts = MessageQualityFilter.evaluate_batch(texts)
+    mismatches = 0
+    for text, verdict in zip(texts, verdicts):
+        expected = MessageQualityFilter.is_valid_message(text)
+        if verdict.valid != expected or (verdict.reason == 'ok') != expected:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"  [FAIL] {text!r:.80}: scalar={expected} batch={verdict}")
+    print(f"[{'OK' if not mismatches else 'FAIL'}] {label}: {len(texts) - mismatches}/{len(texts)} identical")
+    return mismatches
+
+
+def hypothesis_check(examples: int) -> int:
+    from core.message_deduplicator import MessageQualityFilter
+
+    failures = []
+
+    @settings(max_examples=examples, deadline=None)
+    @given(st.lists(st.one_of(st.text(max_size=80), st.text(min_size=1990, max_size=2010),
+                              st.lists(st.sampled_from(_UI_LABELS + ('uno', 'dos', '!!', '😂')))
+                              .map(' '.join)), max_size=20))
+    def property_batch_matches_scalar(texts):
+        verdicts = MessageQualityFilter.evaluate_batch(texts)
+        expected = [MessageQualityFilter.is_valid_message(t) for t in texts]
+        assert [v.valid for v in verdicts] == expected
+        assert [v.reason == 'ok' for v in verdicts] == expected
+
+    try:
+        property_batch_matches_scalar()
+    except AssertionError as e:
+        failures.append(e)
+        print(f"  [FAIL] hypothesis counterexample: {e}")
+    print(f"[{'OK' if not failures else 'FAIL'}] hypothesis property ({examples} examples)")
+    return len(failures)
+
+
+def benchmark(batch: List[str], repeat: int):
+    from core.message_deduplicator import MessageQualityFilter
+
+    def scalar():
+        return [text for text in batch if MessageQualityFilter.is_valid_message(text)]
+
+    def batched():
+        verdicts = MessageQualityFilter.evaluate_batch(batch)
+        return [text for text, verdict in zip(batch, verdicts) if verdict.valid]
+
+    assert scalar() == batched()
+    results = {}
+    for name, fn in (('scalar', scalar), ('batch', batched)):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        results[name] = min(times)
+        print(f"  {name:<8} {min(times) * 1000:>9.2f} ms  ({min(times) / len(batch) * 1e6:.2f} us/message)")
+    print(f"  speedup  {results['scalar'] / results['batch']:.1f}x")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Batch quality filter equivalence check and benchmark')
+    parser.add_argument('--cases', type=int, default=50000, help='Random strings to compare')
+    parser.add_argument('--examples', type=int, default=2000, help='hypothesis examples (if installed)')
+    parser.add_argument('--batch', type=int, default=2000, help='Messages per benchmark batch')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--skip-hypothesis', action='store_true',
+                        help='Run without the property-based search when hypothesis is not installed')
+    args = parser.parse_args()
+
+    # config only needs a database path; nothing here touches the database
+    os.environ.setdefault('DATABASE_PATH', os.devnull)
+
+    rng = random.Random(args.seed)
+    failures = check(boundary_cases(), 'boundary cases')
+    failures += check([random_text(rng) for _ in range(args.cases)], f"{args.cases} random strings")
+    if HYPOTHESIS_AVAILABLE:
+        failures += hypothesis_check(args.examples)
+    elif args.skip_hypothesis:
+        print("[SKIP] hypothesis not installed (--skip-hypothesis)")
+    else:
+        print("[FAIL] hypothesis not installed: pip install -r requirements-dev.txt (or pass --skip-hypothesis)")
+        failures += 1
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from core_bench import quality_sample
+    print(f"\nBenchmark ({args.batch} messages, best of {args.repeat}):")
+    benchmark(quality_sample(args.seed, args.batch), args.repeat)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
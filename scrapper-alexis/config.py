@@ -3,24 +3,22 @@
 All dynamic settings (credentials, intervals, proxy) are stored in the database.
 No .env fallback - database is the single source of truth.
 Configure settings via web interface: http://YOUR_SERVER_IP/settings
+
+Importing this module has no side effects beyond reading .env: the database
+path, the database-backed settings and the Laravel decryption are resolved
+lazily on first access (see _LazySettings / __getattr__ below), so entry
+points and tools that never touch a dynamic setting do not pay for them.
 """
 import os
-import sqlite3
+import sys
+import logging
+from functools import cached_property
 from pathlib import Path
 from dotenv import load_dotenv
 
 # Load environment variables (ONLY for static config - not credentials/intervals)
 load_dotenv()
 
-# Import Laravel decryption utility
-try:
-    from utils.laravel_decrypt import decrypt_laravel_value, is_encrypted
-    LARAVEL_DECRYPT_AVAILABLE = True
-except ImportError:
-    LARAVEL_DECRYPT_AVAILABLE = False
-    import logging
-    logging.warning("Laravel decrypt utility not available - encrypted passwords will not work")
-
 # Database path for dynamic settings (single source of truth)
 # DYNAMIC PATH DETECTION - No hardcoded paths!
 def _get_database_path():
@@ -47,23 +45,21 @@ def _get_database_path():
         f"The database must exist before running any scripts."
     )
 
-DATABASE_PATH = os.getenv('DATABASE_PATH') or _get_database_path()
-
 def get_settings_from_db():
     """
     Load dynamic settings from database.
     This allows live updates from the web interface without restarting scripts.
+    Reads go through the cached settings provider, which only re-reads the
+    table after another connection (e.g. the web UI) committed a change.
     
     DYNAMIC PATH DETECTION - Uses DATABASE_PATH constant (auto-detected, no hardcoded paths).
     
     Raises:
         Exception: If database is not accessible or settings are not configured.
     """
-    import logging
-    
     try:
         # Use the dynamically detected DATABASE_PATH
-        db_path = DATABASE_PATH
+        db_path = settings.DATABASE_PATH
         
         if not db_path or not os.path.exists(db_path):
             raise FileNotFoundError(
@@ -72,85 +68,179 @@ def get_settings_from_db():
                 f"Configure settings via web interface."
             )
         
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.execute("SELECT * FROM scraper_settings LIMIT 1")
-        row = cursor.fetchone()
-        conn.close()
-        
-        if not row:
-            raise ValueError(
-                "No settings found in database. "
-                "Please configure settings via web interface Settings page."
-            )
-        
-        return dict(row)
+        from core.settings_provider import get_settings_provider
+        return get_settings_provider().get_scraper_settings()
         
     except Exception as e:
         logging.error(f"CRITICAL: Failed to load settings from database: {e}")
-        logging.error(f"Database path attempted: {DATABASE_PATH}")
+        logging.error(f"Database path attempted: {settings.__dict__.get('DATABASE_PATH', 'not resolved')}")
         logging.error("Settings MUST be configured in the database via the web interface.")
         logging.error("No .env fallback - database is the single source of truth.")
         raise
 
-# Load settings from database (no .env fallback)
-try:
-    _db_settings = get_settings_from_db()
-    
-    # Decrypt passwords if they're Laravel encrypted
-    def _decrypt_if_needed(value: str) -> str:
-        """Decrypt value if it's Laravel encrypted, otherwise return as-is."""
-        if not value or not LARAVEL_DECRYPT_AVAILABLE:
+class _LazySettings:
+    """
+    Database-backed settings resolved on first access.
+    
+    Each setting is a cached property, so the database is read and values are
+    decrypted at most once per process (the same snapshot semantics as the
+    former import-time constants). Failures surface on first access instead
+    of at import time.
+    """
+    
+    @cached_property
+    def DATABASE_PATH(self) -> str:
+        return os.getenv('DATABASE_PATH') or _get_database_path()
+    
+    @cached_property
+    def LARAVEL_DECRYPT_AVAILABLE(self) -> bool:
+        try:
+            import utils.laravel_decrypt  # noqa: F401
+            return True
+        except ImportError:
+            logging.warning("Laravel decrypt utility not available - encrypted passwords will not work")
+            return False
+    
+    @cached_property
+    def _db_settings(self) -> dict:
+        # Load settings from database (no .env fallback)
+        try:
+            return get_settings_from_db()
+        except Exception as e:
+            logging.critical("="*70)
+            logging.critical("CONFIGURATION ERROR: Cannot load settings from database")
+            logging.critical("="*70)
+            logging.critical(f"Error: {e}")
+            logging.critical("Action required: Configure settings at http://YOUR_SERVER_IP/settings")
+            logging.critical("="*70)
+            # Re-raise to prevent script from running with invalid config
+            raise SystemExit("Configuration error: Settings must be configured in database. No .env fallback available.")
+    
+    def _decrypt_if_needed(self, value: str) -> str:
+        """Decrypt value if it's Laravel encrypted, otherwise return as-is (memoized)."""
+        if not value or not self.LARAVEL_DECRYPT_AVAILABLE:
             return value or ''
-        if is_encrypted(value):
-            return decrypt_laravel_value(value)
-        return value
+        from core.settings_provider import get_settings_provider
+        return get_settings_provider().decrypt(value)
     
     # Use database settings (decrypt passwords if they're encrypted)
-    FACEBOOK_EMAIL = _db_settings.get('facebook_email') or ''
-    FACEBOOK_PASSWORD = _decrypt_if_needed(_db_settings.get('facebook_password'))
-    X_EMAIL = _db_settings.get('twitter_email') or ''
-    X_PASSWORD = _decrypt_if_needed(_db_settings.get('twitter_password'))
-    X_DISPLAY_NAME = _db_settings.get('display_name') or _db_settings.get('twitter_display_name') or 'Twitter User'
-    X_USERNAME = _db_settings.get('username') or _db_settings.get('twitter_username') or '@username'
-    X_AVATAR_URL = _db_settings.get('avatar_url') or _db_settings.get('twitter_avatar_url') or ''
-    X_VERIFIED = bool(_db_settings.get('verified', _db_settings.get('twitter_verified', False)))
-    TWEET_TEMPLATE_PADDING_ENABLED = bool(_db_settings.get('tweet_template_padding_enabled', True))
-    
-    # Handle facebook_profiles (can be None or empty string)
-    profiles_str = _db_settings.get('facebook_profiles') or ''
-    FACEBOOK_PROFILES = [p.strip() for p in profiles_str.split(',') if p.strip()] if profiles_str else []
-    
-    PROXY_SERVER = _db_settings.get('proxy_server') or ''
-    PROXY_USERNAME = _db_settings.get('proxy_username') or ''
-    PROXY_PASSWORD = _decrypt_if_needed(_db_settings.get('proxy_password'))
-    FACEBOOK_INTERVAL_MIN = int(_db_settings.get('facebook_interval_min', 45))
-    FACEBOOK_INTERVAL_MAX = int(_db_settings.get('facebook_interval_max', 80))
-    TWITTER_INTERVAL_MIN = int(_db_settings.get('twitter_interval_min', 8))
-    TWITTER_INTERVAL_MAX = int(_db_settings.get('twitter_interval_max', 60))
-    
-    # Debug output settings (per script type)
-    FACEBOOK_DEBUG_ENABLED = bool(_db_settings.get('facebook_debug_enabled', False))
-    TWITTER_DEBUG_ENABLED = bool(_db_settings.get('twitter_debug_enabled', False))
-    PAGE_POSTING_DEBUG_ENABLED = bool(_db_settings.get('page_posting_debug_enabled', False))
-    
-    # Log decryption status (for debugging)
-    import logging
-    logger = logging.getLogger(__name__)
-    logger.info(f"Bugfix: Laravel decryption {'enabled' if LARAVEL_DECRYPT_AVAILABLE else 'disabled'}")
-    if LARAVEL_DECRYPT_AVAILABLE and PROXY_PASSWORD:
-        logger.info(f"Bugfix: Proxy password decrypted successfully (length: {len(PROXY_PASSWORD)})")
-    
-except Exception as e:
-    import logging
-    logging.critical("="*70)
-    logging.critical("CONFIGURATION ERROR: Cannot load settings from database")
-    logging.critical("="*70)
-    logging.critical(f"Error: {e}")
-    logging.critical("Action required: Configure settings at http://YOUR_SERVER_IP/settings")
-    logging.critical("="*70)
-    # Re-raise to prevent script from running with invalid config
-    raise SystemExit("Configuration error: Settings must be configured in database. No .env fallback available.")
+    @cached_property
+    def FACEBOOK_EMAIL(self) -> str:
+        return self._db_settings.get('facebook_email') or ''
+    
+    @cached_property
+    def FACEBOOK_PASSWORD(self) -> str:
+        return self._decrypt_if_needed(self._db_settings.get('facebook_password'))
+    
+    @cached_property
+    def X_EMAIL(self) -> str:
+        return self._db_settings.get('twitter_email') or ''
+    
+    @cached_property
+    def X_PASSWORD(self) -> str:
+        return self._decrypt_if_needed(self._db_settings.get('twitter_password'))
+    
+    @cached_property
+    def X_DISPLAY_NAME(self) -> str:
+        return self._db_settings.get('display_name') or self._db_settings.get('twitter_display_name') or 'Twitter User'
+    
+    @cached_property
+    def X_USERNAME(self) -> str:
+        return self._db_settings.get('username') or self._db_settings.get('twitter_username') or '@username'
+    
+    @cached_property
+    def X_AVATAR_URL(self) -> str:
+        return self._db_settings.get('avatar_url') or self._db_settings.get('twitter_avatar_url') or ''
+    
+    @cached_property
+    def X_VERIFIED(self) -> bool:
+        return bool(self._db_settings.get('verified', self._db_settings.get('twitter_verified', False)))
+    
+    @cached_property
+    def TWEET_TEMPLATE_PADDING_ENABLED(self) -> bool:
+        return bool(self._db_settings.get('tweet_template_padding_enabled', True))
+    
+    @cached_property
+    def FACEBOOK_PROFILES(self) -> list:
+        # Handle facebook_profiles (can be None or empty string)
+        profiles_str = self._db_settings.get('facebook_profiles') or ''
+        return [p.strip() for p in profiles_str.split(',') if p.strip()] if profiles_str else []
+    
+    @cached_property
+    def PROXY_SERVER(self) -> str:
+        return self._db_settings.get('proxy_server') or ''
+    
+    @cached_property
+    def PROXY_USERNAME(self) -> str:
+        return self._db_settings.get('proxy_username') or ''
+    
+    @cached_property
+    def PROXY_PASSWORD(self) -> str:
+        password = self._decrypt_if_needed(self._db_settings.get('proxy_password'))
+        if self.LARAVEL_DECRYPT_AVAILABLE and password:
+            logging.getLogger(__name__).info(f"Bugfix: Proxy password decrypted successfully (length: {len(password)})")
+        return password
+    
+    @cached_property
+    def FACEBOOK_INTERVAL_MIN(self) -> int:
+        return int(self._db_settings.get('facebook_interval_min', 45))
+    
+    @cached_property
+    def FACEBOOK_INTERVAL_MAX(self) -> int:
+        return int(self._db_settings.get('facebook_interval_max', 80))
+    
+    @cached_property
+    def TWITTER_INTERVAL_MIN(self) -> int:
+        return int(self._db_settings.get('twitter_interval_min', 8))
+    
+    @cached_property
+    def TWITTER_INTERVAL_MAX(self) -> int:
+        return int(self._db_settings.get('twitter_interval_max', 60))
+    
+    # Debug output settings (per script type) - snapshot; use get_debug_enabled() for live values
+    @cached_property
+    def FACEBOOK_DEBUG_ENABLED(self) -> bool:
+        return bool(self._db_settings.get('facebook_debug_enabled', False))
+    
+    @cached_property
+    def TWITTER_DEBUG_ENABLED(self) -> bool:
+        return bool(self._db_settings.get('twitter_debug_enabled', False))
+    
+    @cached_property
+    def PAGE_POSTING_DEBUG_ENABLED(self) -> bool:
+        return bool(self._db_settings.get('page_posting_debug_enabled', False))
+    
+    # Build proxy config dict
+    @cached_property
+    def PROXY_CONFIG(self):
+        return {
+            'server': self.PROXY_SERVER,
+            'username': self.PROXY_USERNAME,
+            'password': self.PROXY_PASSWORD
+        } if self.PROXY_SERVER else None
+
+
+settings = _LazySettings()
+
+# Module attributes served lazily by settings (PEP 562 module __getattr__)
+_LAZY_SETTINGS = frozenset(
+    name for name, value in vars(_LazySettings).items()
+    if isinstance(value, cached_property) and not name.startswith('_')
+)
+
+
+def __getattr__(name: str):
+    """Resolve a lazy setting on first access and cache it as a plain module attribute."""
+    if name in _LAZY_SETTINGS:
+        value = getattr(settings, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _LAZY_SETTINGS)
+
 
 # Target URL (still from .env - not a dynamic setting)
 FACEBOOK_MESSAGE_URL = os.getenv('FACEBOOK_MESSAGE_URL')
@@ -166,7 +256,7 @@ def get_debug_enabled(script_type: str = 'facebook') -> bool:
         bool: True if debug is enabled for this script type
     """
     try:
-        # Reload settings from database to get latest value
+        # Cached settings - refreshed only when the database changed
         settings = get_settings_from_db()
         
         if script_type == 'facebook':
@@ -178,7 +268,6 @@ def get_debug_enabled(script_type: str = 'facebook') -> bool:
         else:
             return False
     except Exception as e:
-        import logging
         logging.error(f"Failed to get debug setting for {script_type}: {e}")
         return False
 
@@ -211,22 +300,28 @@ TIMEZONE = os.getenv('TIMEZONE', 'America/New_York')
 SCREENSHOT_DIR = Path(os.getenv('SCREENSHOT_DIR', 'screenshots'))
 SCREENSHOT_QUALITY = int(os.getenv('SCREENSHOT_QUALITY', '100'))
 
+# Message image encoding (post-processing of generated message images)
+IMAGE_ENCODE_FORMAT = os.getenv('IMAGE_ENCODE_FORMAT', 'webp').lower()  # webp, jpeg or none
+IMAGE_ENCODE_QUALITY = int(os.getenv('IMAGE_ENCODE_QUALITY', '85'))
+IMAGE_MAX_BYTES = int(os.getenv('IMAGE_MAX_BYTES', '0'))  # 0 = no size target
+IMAGE_THUMBNAIL_WIDTH = int(os.getenv('IMAGE_THUMBNAIL_WIDTH', '320'))
+
 # Database Configuration
 DUPLICATE_CHECK_HOURS = int(os.getenv('DUPLICATE_CHECK_HOURS', '24'))
 AUTO_BACKUP = os.getenv('AUTO_BACKUP', 'true').lower() == 'true'
 BACKUP_RETENTION_DAYS = int(os.getenv('BACKUP_RETENTION_DAYS', '7'))
+# Route scraper writes through the group-committing writer thread (core/db_writer.py)
+DB_WRITER_ENABLED = os.getenv('DB_WRITER_ENABLED', 'true').lower() == 'true'
 
 # Multi-Profile Configuration
 MAX_PROFILES_PER_RUN = int(os.getenv('MAX_PROFILES_PER_RUN', '10'))
 PROFILE_SCRAPING_DELAY = int(os.getenv('PROFILE_SCRAPING_DELAY', '30'))  # seconds between profiles
 DUPLICATE_STOP_ENABLED = os.getenv('DUPLICATE_STOP_ENABLED', 'true').lower() == 'true'
 
-# Build proxy config dict
-PROXY_CONFIG = {
-    'server': PROXY_SERVER,
-    'username': PROXY_USERNAME,
-    'password': PROXY_PASSWORD
-} if PROXY_SERVER else None
+# Page Posting Batch Sessions (images posted per browser launch)
+POST_BATCH_SIZE = int(os.getenv('POST_BATCH_SIZE', '1'))
+POST_BATCH_GAP_MIN = int(os.getenv('POST_BATCH_GAP_MIN', '120'))  # seconds between posts
+POST_BATCH_GAP_MAX = int(os.getenv('POST_BATCH_GAP_MAX', '300'))
 
 # X/Twitter Constants
 X_CHAR_LIMIT = 280
@@ -241,17 +336,21 @@ def validate_config(phase: str = 'all'):
     """
     from exceptions import ConfigurationError
     
+    # Module lookup so lazy settings (and runtime overrides such as
+    # relay_agent assigning config.FACEBOOK_EMAIL) are honoured
+    current = sys.modules[__name__]
+    
     # Phase 1 requirements
     phase1_required = {
-        'FACEBOOK_EMAIL': FACEBOOK_EMAIL,
-        'FACEBOOK_PASSWORD': FACEBOOK_PASSWORD,
+        'FACEBOOK_EMAIL': current.FACEBOOK_EMAIL,
+        'FACEBOOK_PASSWORD': current.FACEBOOK_PASSWORD,
         'FACEBOOK_MESSAGE_URL': FACEBOOK_MESSAGE_URL
     }
     
     # Phase 2 requirements (in addition to Phase 1)
     phase2_required = {
-        'X_EMAIL': X_EMAIL,
-        'X_PASSWORD': X_PASSWORD
+        'X_EMAIL': current.X_EMAIL,
+        'X_PASSWORD': current.X_PASSWORD
     }
     
     # Determine what to validate
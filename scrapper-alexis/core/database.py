@@ -5,17 +5,385 @@ Handles SQLite database operations, schema management, and data persistence
 for profiles, messages, and scraping sessions.
 """
 
+import re
+import time
 import sqlite3
 import hashlib
 import logging
 from pathlib import Path
-from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Tuple, Any, Callable, Iterator
 from contextlib import contextmanager
+from concurrent.futures import Future
+from dataclasses import dataclass, asdict, fields
 import config
+from core.migrations import run_migrations
+from core.db_writer import get_writer
+from utils.run_trace import traced
 
 logger = logging.getLogger(__name__)
 
+# Feature: Partial/composite indexes backing the hot queue queries.
+# SQLite only uses a partial index when the query repeats its WHERE terms,
+# so the queue queries below spell out exactly the same predicates.
+# Each entry: index name -> (columns that must exist, CREATE statement)
+QUEUE_INDEXES = {
+    # Facebook page posting queue (get_next_page_image)
+    'idx_messages_page_queue': (
+        ('image_generated', 'approved_for_posting', 'auto_post_enabled', 'posted_to_page', 'post_priority', 'approved_at'),
+        '''CREATE INDEX IF NOT EXISTS idx_messages_page_queue
+           ON messages(post_priority DESC, approved_at)
+           WHERE image_generated = 1 AND approved_for_posting = 1 AND auto_post_enabled = 1
+             AND (posted_to_page = 0 OR posted_to_page IS NULL)'''
+    ),
+    # Image generation queue (get_approved_messages_without_images)
+    'idx_messages_image_queue': (
+        ('approved_for_posting', 'image_generated', 'approved_at'),
+        '''CREATE INDEX IF NOT EXISTS idx_messages_image_queue
+           ON messages(approved_at)
+           WHERE approved_for_posting = 1 AND (image_generated = 0 OR image_generated IS NULL)'''
+    ),
+    # Posted messages still missing an image (get_posted_messages_without_images)
+    'idx_messages_posted_without_image': (
+        ('posted_to_twitter', 'image_generated', 'posted_at'),
+        '''CREATE INDEX IF NOT EXISTS idx_messages_posted_without_image
+           ON messages(posted_to_twitter, posted_at)
+           WHERE (image_generated = 0 OR image_generated IS NULL)'''
+    ),
+    # Unposted messages in scrape order (get_unposted_messages)
+    'idx_messages_unposted_scraped': (
+        ('posted_to_twitter', 'scraped_at'),
+        'CREATE INDEX IF NOT EXISTS idx_messages_unposted_scraped ON messages(posted_to_twitter, scraped_at)'
+    ),
+    # Covering index for the posting counters (get_posting_counters) so the
+    # aggregate reads this narrow index instead of the message_text pages.
+    # posted_to_twitter is deliberately not the leading column, otherwise the
+    # planner prefers this index for the ordered posted_to_twitter queues.
+    'idx_messages_posting_counters': (
+        ('posted_to_twitter', 'quality_checked', 'image_generated', 'post_url'),
+        '''CREATE INDEX IF NOT EXISTS idx_messages_posting_counters
+           ON messages(quality_checked, image_generated, posted_to_twitter, post_url)'''
+    ),
+}
+
+NEXT_PAGE_IMAGE_QUERY = '''
+    SELECT m.id, m.message_text, m.image_path, m.encoded_image_path
+    FROM messages m
+    WHERE m.image_generated = 1
+      AND m.approved_for_posting = 1
+      AND m.auto_post_enabled = 1
+      AND (m.posted_to_page = 0 OR m.posted_to_page IS NULL)
+    ORDER BY m.post_priority DESC, m.approved_at ASC
+    LIMIT 1
+'''
+
+POSTED_WITHOUT_IMAGES_QUERY = '''
+    SELECT m.id, m.message_text, m.post_url, m.avatar_url, m.posted_at,
+           p.username as profile_username
+    FROM messages m
+    JOIN profiles p ON m.profile_id = p.id
+    WHERE m.posted_to_twitter = 1 
+    AND (m.image_generated = 0 OR m.image_generated IS NULL)
+    AND m.post_url IS NOT NULL
+    AND m.post_url != 'SKIPPED_QUALITY_FILTER'
+    AND m.post_url != 'DUPLICATE_SKIPPED'
+    ORDER BY m.posted_at DESC
+    LIMIT ?
+'''
+
+UNPOSTED_MESSAGES_QUERY = '''
+    SELECT m.*, p.username as profile_username 
+    FROM messages m
+    JOIN profiles p ON m.profile_id = p.id
+    WHERE m.posted_to_twitter = 0
+    ORDER BY m.scraped_at ASC
+'''
+
+# Feature: Quality verdicts persisted in messages.quality_checked
+# (NULL = not checked yet, 1 = passed, 0 = rejected)
+QUALITY_PASSED = 1
+QUALITY_REJECTED = 0
+
+# All posting counters in one pass (see get_posting_counters)
+POSTING_COUNTERS_QUERY = '''
+    SELECT
+        COUNT(*) as total_messages,
+        COALESCE(SUM(posted_to_twitter = 1), 0) as posted,
+        COALESCE(SUM(posted_to_twitter = 0), 0) as unposted,
+        COALESCE(SUM(posted_to_twitter = 1 AND post_url IS NOT NULL
+                     AND post_url != 'SKIPPED_QUALITY_FILTER'), 0) as posted_with_url,
+        COALESCE(SUM(posted_to_twitter = 1 AND post_url != 'SKIPPED_QUALITY_FILTER'
+                     AND image_generated = 1), 0) as posted_with_images,
+        COALESCE(SUM(posted_to_twitter = 1 AND post_url != 'SKIPPED_QUALITY_FILTER'
+                     AND (image_generated = 0 OR image_generated IS NULL)), 0) as posted_missing_images,
+        COALESCE(SUM(post_url = 'SKIPPED_QUALITY_FILTER'), 0) as skipped_quality,
+        COALESCE(SUM(posted_to_twitter = 0 AND quality_checked = 1), 0) as quality_unposted,
+        COALESCE(SUM(posted_to_twitter = 0 AND quality_checked IS NULL), 0) as unchecked_unposted,
+        COALESCE(SUM(quality_checked = 0), 0) as quality_rejected
+    FROM messages
+'''
+
+# Feature: message_counters summary table maintained by triggers on messages.
+# One row per profile (profile_key = profile_id, -1 for messages without a
+# profile) plus a global row (profile_key = 0). Each counter is defined by a
+# predicate over a messages row; {row} is NEW/OLD in triggers, m in rebuilds.
+COUNTERS_GLOBAL_KEY = 0
+COUNTERS_NO_PROFILE_KEY = -1
+MESSAGE_COUNTERS = {
+    'total': '1',
+    'posted': '{row}.posted_to_twitter = 1',
+    'unposted': '{row}.posted_to_twitter = 0',
+    'posted_with_url': "{row}.posted_to_twitter = 1 AND {row}.post_url IS NOT NULL "
+                       "AND {row}.post_url != 'SKIPPED_QUALITY_FILTER'",
+    'images_generated': '{row}.image_generated = 1',
+    'posted_images_generated': '{row}.posted_to_twitter = 1 AND {row}.image_generated = 1',
+    'posted_images_pending': '{row}.posted_to_twitter = 1 '
+                             'AND ({row}.image_generated = 0 OR {row}.image_generated IS NULL)',
+    'approved': '{row}.approved_for_posting = 1',
+    'rejected': '{row}.approved_for_posting = 0',
+    'pending_review': '{row}.approved_for_posting IS NULL',
+}
+# Columns the counter predicates depend on (UPDATE OF list for the trigger)
+COUNTER_SOURCE_COLUMNS = ('profile_id', 'posted_to_twitter', 'post_url', 'image_generated', 'approved_for_posting')
+COUNTER_TRIGGERS = ('trg_message_counters_insert', 'trg_message_counters_delete', 'trg_message_counters_update')
+
+
+def _counter_values(row: str, sign: str = '') -> str:
+    """Comma-separated counter contributions of one messages row (e.g. NEW, -OLD)."""
+    return ', '.join(f"{sign}COALESCE(({predicate.format(row=row)}), 0)" for predicate in MESSAGE_COUNTERS.values())
+
+
+def _counter_upsert(key_sql: str, values_sql: str) -> str:
+    """Upsert that adds values_sql to the counters row for key_sql."""
+    columns = ', '.join(MESSAGE_COUNTERS)
+    updates = ', '.join(f"{name} = {name} + excluded.{name}" for name in MESSAGE_COUNTERS)
+    return (f"INSERT INTO message_counters (profile_key, {columns}) VALUES ({key_sql}, {values_sql}) "
+            f"ON CONFLICT(profile_key) DO UPDATE SET {updates};")
+
+
+def _counter_delta(new_row: str, old_row: str) -> str:
+    """Per-counter difference between two messages rows."""
+    return ', '.join(
+        f"COALESCE(({predicate.format(row=new_row)}), 0) - COALESCE(({predicate.format(row=old_row)}), 0)"
+        for predicate in MESSAGE_COUNTERS.values()
+    )
+
+
+def _counter_trigger_statements() -> List[str]:
+    """CREATE TRIGGER statements keeping message_counters in sync with messages."""
+    global_key = str(COUNTERS_GLOBAL_KEY)
+    new_key = f"COALESCE(NEW.profile_id, {COUNTERS_NO_PROFILE_KEY})"
+    old_key = f"COALESCE(OLD.profile_id, {COUNTERS_NO_PROFILE_KEY})"
+    return [
+        f'''CREATE TRIGGER IF NOT EXISTS trg_message_counters_insert AFTER INSERT ON messages
+            BEGIN
+                {_counter_upsert(global_key, _counter_values('NEW'))}
+                {_counter_upsert(new_key, _counter_values('NEW'))}
+            END''',
+        f'''CREATE TRIGGER IF NOT EXISTS trg_message_counters_delete AFTER DELETE ON messages
+            BEGIN
+                {_counter_upsert(global_key, _counter_values('OLD', '-'))}
+                {_counter_upsert(old_key, _counter_values('OLD', '-'))}
+            END''',
+        f'''CREATE TRIGGER IF NOT EXISTS trg_message_counters_update
+            AFTER UPDATE OF {', '.join(COUNTER_SOURCE_COLUMNS)} ON messages
+            BEGIN
+                {_counter_upsert(global_key, _counter_delta('NEW', 'OLD'))}
+                {_counter_upsert(old_key, _counter_values('OLD', '-'))}
+                {_counter_upsert(new_key, _counter_values('NEW'))}
+            END''',
+    ]
+
+
+def _counter_aggregate_query() -> str:
+    """Recompute message_counters rows from messages (global row first, then per profile)."""
+    sums = ', '.join(f"COALESCE(SUM(COALESCE(({predicate.format(row='m')}), 0)), 0) as {name}"
+                     for name, predicate in MESSAGE_COUNTERS.items())
+    return f'''
+        SELECT {COUNTERS_GLOBAL_KEY} as profile_key, {sums} FROM messages m
+        UNION ALL
+        SELECT COALESCE(m.profile_id, {COUNTERS_NO_PROFILE_KEY}) as profile_key, {sums}
+        FROM messages m GROUP BY COALESCE(m.profile_id, {COUNTERS_NO_PROFILE_KEY})
+    '''
+
+# Feature: Archive tier. Cold messages (rejected, or fully posted) older than
+# the cutoff are moved to messages_archive; their hash and review status stay
+# in message_hash_archive so message_exists() and the insert guard below keep
+# dedup semantics unchanged. Rows are moved in rowid windows, one short
+# transaction per window.
+DEFAULT_ARCHIVE_AFTER_DAYS = 90
+ARCHIVE_SCAN_ROWS = 2000
+# Messages waiting in the page queue (approved, not posted to the page) stay hot
+ARCHIVE_CANDIDATE_PREDICATE = '''
+    scraped_at < :cutoff
+    AND COALESCE(posted_to_page_at, posted_at, scraped_at) < :cutoff
+    AND (
+        approved_for_posting = 0
+        OR posted_to_page = 1
+        OR (posted_to_twitter = 1 AND approved_for_posting IS NOT 1)
+    )
+'''
+ARCHIVE_GUARD_TRIGGER = 'trg_messages_archived_hash'
+
+# Feature: Full-text search over messages.message_text (FTS5, external content).
+# Rows that existed when the index was created are indexed by
+# backfill_message_fts() in chunks; maintenance_state tracks the id range
+# (fts_backfill_done, fts_backfill_until] still waiting, and the delete/update
+# triggers skip rows in that range (they are not in the index yet).
+FTS_TRIGGERS = ('trg_messages_fts_insert', 'trg_messages_fts_delete', 'trg_messages_fts_update')
+FTS_BACKFILL_CHUNK = 5000
+_FTS_NOT_PENDING = '''NOT (
+    OLD.id > COALESCE((SELECT value FROM maintenance_state WHERE key = 'fts_backfill_done'), OLD.id)
+    AND OLD.id <= COALESCE((SELECT value FROM maintenance_state WHERE key = 'fts_backfill_until'), 0)
+)'''
+FTS_TRIGGER_STATEMENTS = (
+    '''CREATE TRIGGER IF NOT EXISTS trg_messages_fts_insert AFTER INSERT ON messages
+       BEGIN
+           INSERT INTO messages_fts (rowid, message_text) VALUES (NEW.id, NEW.message_text);
+       END''',
+    f'''CREATE TRIGGER IF NOT EXISTS trg_messages_fts_delete AFTER DELETE ON messages
+        WHEN {_FTS_NOT_PENDING}
+        BEGIN
+            INSERT INTO messages_fts (messages_fts, rowid, message_text) VALUES ('delete', OLD.id, OLD.message_text);
+        END''',
+    f'''CREATE TRIGGER IF NOT EXISTS trg_messages_fts_update AFTER UPDATE OF message_text ON messages
+        WHEN {_FTS_NOT_PENDING}
+        BEGIN
+            INSERT INTO messages_fts (messages_fts, rowid, message_text) VALUES ('delete', OLD.id, OLD.message_text);
+            INSERT INTO messages_fts (rowid, message_text) VALUES (NEW.id, NEW.message_text);
+        END''',
+)
+
+# Feature: Queue columns owned by the Laravel migrations (with the indexes
+# Laravel creates for them). When the database was created by the scraper
+# alone, the plan check runs against an in-memory copy of the schema with
+# these added, so the queries that use them are still checked.
+LARAVEL_MESSAGE_COLUMNS = {
+    'post_priority': ('INTEGER NOT NULL DEFAULT 0',
+                      ('CREATE INDEX IF NOT EXISTS idx_priority_queue ON messages(post_priority, approved_at)',)),
+}
+# Tables read by the queue queries (copied into the in-memory plan schema)
+QUEUE_QUERY_TABLES = ('messages', 'profiles')
+
+# EXPLAIN QUERY PLAN details that mean the whole messages table is read
+# (SQLite >= 3.36 prints "SCAN m", older versions "SCAN TABLE messages AS m")
+_FULL_SCAN_PATTERN = re.compile(r'^SCAN (TABLE )?(messages( AS m)?|m)$')
+_MISSING_COLUMN_PATTERN = re.compile(r'no such column: (?:\w+\.)?(\w+)')
+
+
+def _approved_without_images_query(approved_since: Optional[str] = None,
+                                   message_id: Optional[int] = None) -> Tuple[str, list]:
+    """Build the image generation queue query (shared with the query plan check)."""
+    query = '''
+        SELECT id, message_text, avatar_url, posted_at, approved_at
+        FROM messages
+        WHERE approved_for_posting = 1
+        AND (image_generated = 0 OR image_generated IS NULL)
+    '''
+    params = []
+    if message_id is not None:
+        query += ' AND id = ?'
+        params.append(message_id)
+    if approved_since is not None:
+        query += ' AND approved_at >= ?'
+        params.append(approved_since)
+    query += ' ORDER BY approved_at ASC'
+    return query, params
+
+
+def _unposted_page_query(after: Optional[Tuple[str, int]] = None,
+                         profile_filter: Optional[str] = None) -> Tuple[str, list]:
+    """
+    Build one keyset page of the posting queue (shared with the query plan check).
+    
+    Pages are ordered by (scraped_at, id) and continue strictly after the last
+    row of the previous page, so each page is an index range read instead of
+    an OFFSET or a large LIMIT. Rejected rows are excluded by their verdict.
+    """
+    query = '''
+        SELECT m.*, p.username as profile_username
+        FROM messages m
+        JOIN profiles p ON m.profile_id = p.id
+        WHERE m.posted_to_twitter = 0
+        AND (m.quality_checked IS NULL OR m.quality_checked = 1)
+    '''
+    params = []
+    if after is not None:
+        query += ' AND (m.scraped_at, m.id) > (?, ?)'
+        params.extend(after)
+    if profile_filter:
+        query += ' AND p.username = ?'
+        params.append(profile_filter)
+    query += ' ORDER BY m.scraped_at ASC, m.id ASC LIMIT ?'
+    return query, params
+
+
+@dataclass
+class MessageRecord:
+    """Typed view of a row in the messages table (see DatabaseManager.get_message)."""
+    id: int
+    message_text: str
+    profile_id: Optional[int] = None
+    message_hash: Optional[str] = None
+    scraped_at: Optional[str] = None
+    posted_to_twitter: bool = False
+    posted_at: Optional[str] = None
+    post_url: Optional[str] = None
+    avatar_url: Optional[str] = None
+    image_generated: bool = False
+    image_path: Optional[str] = None
+    encoded_image_path: Optional[str] = None
+    thumbnail_path: Optional[str] = None
+    auto_post_enabled: bool = True
+    approval_type: Optional[str] = None
+    approved_for_posting: Optional[bool] = None  # None = pending review
+    approved_at: Optional[str] = None
+    posted_to_page: bool = False
+    posted_to_page_at: Optional[str] = None
+    quality_checked: Optional[bool] = None  # None = not checked yet
+    post_priority: int = 0
+    profile_username: Optional[str] = None
+    
+    _BOOL_FIELDS = ('posted_to_twitter', 'image_generated', 'auto_post_enabled', 'posted_to_page')
+    
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> 'MessageRecord':
+        """
+        Build a record from a database row.
+        
+        Columns missing from the row (e.g. post_priority before the Laravel
+        migrations ran) keep their defaults; extra columns are ignored.
+        """
+        keys = set(row.keys())
+        values: Dict[str, Any] = {}
+        for field in fields(cls):
+            if field.name not in keys:
+                continue
+            value = row[field.name]
+            if field.name in cls._BOOL_FIELDS:
+                value = bool(value)
+            elif field.name in ('approved_for_posting', 'quality_checked') and value is not None:
+                value = bool(value)
+            elif field.name == 'post_priority':
+                value = int(value or 0)
+            values[field.name] = value
+        return cls(**values)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dictionary for code that still works with row dictionaries."""
+        return asdict(self)
+
+
+def _log_failed_write(command: Callable) -> Callable[[Future], None]:
+    """Done-callback that logs the error of a queued write nobody waits on."""
+    name = command.__qualname__.replace('.<locals>.command', '')
+
+    def callback(future: Future):
+        error = future.exception()
+        if error is not None:
+            logger.error(f"❌ Queued database write {name} failed: {error}")
+    return callback
+
 
 class DatabaseManager:
     """Manages SQLite database operations for the scraper."""
@@ -35,82 +403,17 @@ class DatabaseManager:
         with self.get_connection() as conn:
             self._create_tables(conn)
             self._migrate_database(conn)
+            self._create_queue_indexes(conn)
+            self._create_message_counters(conn)
+            self._create_message_archive(conn)
             logger.info(f"Database initialized at {self.db_path}")
     
     def _migrate_database(self, conn: sqlite3.Connection):
-        """Apply database migrations for schema updates."""
+        """Apply pending schema migrations (see core/migrations.py)."""
         try:
-            # Check if avatar_url column exists, if not add it
-            cursor = conn.execute("PRAGMA table_info(messages)")
-            columns = [row[1] for row in cursor.fetchall()]
-
-            if 'avatar_url' not in columns:
-                logger.info("Adding avatar_url column to messages table...")
-                conn.execute("ALTER TABLE messages ADD COLUMN avatar_url TEXT")
-                conn.commit()
-                logger.info("✅ Avatar URL column added successfully")
-            
-            if 'image_generated' not in columns:
-                logger.info("Adding image_generated column to messages table...")
-                conn.execute("ALTER TABLE messages ADD COLUMN image_generated BOOLEAN DEFAULT 0")
-                conn.commit()
-                logger.info("✅ Image generated column added successfully")
-            
-            if 'image_path' not in columns:
-                logger.info("Adding image_path column to messages table...")
-                conn.execute("ALTER TABLE messages ADD COLUMN image_path TEXT")
-                conn.commit()
-                logger.info("✅ Image path column added successfully")
-            
-            if 'auto_post_enabled' not in columns:
-                logger.info("Adding auto_post_enabled column to messages table...")
-                conn.execute("ALTER TABLE messages ADD COLUMN auto_post_enabled BOOLEAN DEFAULT 1")
-                conn.commit()
-                logger.info("✅ Auto post enabled column added successfully")
-            
-            if 'approval_type' not in columns:
-                logger.info("Adding approval_type column to messages table...")
-                conn.execute("ALTER TABLE messages ADD COLUMN approval_type TEXT")
-                conn.commit()
-                logger.info("✅ Approval type column added successfully")
-            
-            if 'approved_for_posting' not in columns:
-                logger.info("Adding approved_for_posting column to messages table...")
-                conn.execute("ALTER TABLE messages ADD COLUMN approved_for_posting BOOLEAN")
-                conn.commit()
-                logger.info("✅ Approved for posting column added successfully")
-            
-            if 'approved_at' not in columns:
-                logger.info("Adding approved_at column to messages table...")
-                conn.execute("ALTER TABLE messages ADD COLUMN approved_at TIMESTAMP")
-                conn.commit()
-                logger.info("✅ Approved at column added successfully")
-            
-            if 'posted_to_page' not in columns:
-                logger.info("Adding posted_to_page column to messages table...")
-                conn.execute("ALTER TABLE messages ADD COLUMN posted_to_page BOOLEAN DEFAULT 0")
-                conn.commit()
-                logger.info("✅ Posted to page column added successfully")
-            
-            if 'posted_to_page_at' not in columns:
-                logger.info("Adding posted_to_page_at column to messages table...")
-                conn.execute("ALTER TABLE messages ADD COLUMN posted_to_page_at TIMESTAMP")
-                conn.commit()
-                logger.info("✅ Posted to page at column added successfully")
-            
-            if 'downloaded' not in columns:
-                logger.info("Adding downloaded column to messages table...")
-                conn.execute("ALTER TABLE messages ADD COLUMN downloaded BOOLEAN DEFAULT 0")
-                conn.commit()
-                logger.info("✅ Downloaded column added successfully")
-            
-            if 'downloaded_at' not in columns:
-                logger.info("Adding downloaded_at column to messages table...")
-                conn.execute("ALTER TABLE messages ADD COLUMN downloaded_at TIMESTAMP")
-                conn.commit()
-                logger.info("✅ Downloaded at column added successfully")
-
+            run_migrations(conn)
         except Exception as e:
+            # Nothing was applied (one transaction); retried on the next startup
             logger.warning(f"Migration warning (non-critical): {e}")
     
     @contextmanager
@@ -125,7 +428,44 @@ class DatabaseManager:
             yield conn
         finally:
             conn.close()
-    
+
+    def _write(self, command: Callable[[sqlite3.Connection], Any], urgent: bool = False) -> Future:
+        """
+        Run a write command on the writer thread (group commit).
+
+        Args:
+            command: Function taking a connection; runs inside a transaction and must not commit
+            urgent: The caller blocks on the result, commit without waiting for more writes
+
+        Returns:
+            Future with the command's return value, resolved once committed.
+            With DB_WRITER_ENABLED=false the command runs (and commits) here
+            and the returned future is already done. Failures of non-urgent
+            (fire-and-forget) writes are logged, since nobody waits on them.
+        """
+        if config.DB_WRITER_ENABLED:
+            future = get_writer(self.db_path).submit(command, urgent)
+        else:
+            future = Future()
+            try:
+                with self.get_connection() as conn:
+                    result = command(conn)
+                    conn.commit()
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
+
+        if not urgent:
+            # Fire-and-forget callers never look at the future: log failures here
+            future.add_done_callback(_log_failed_write(command))
+        return future
+
+    def flush_writes(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued write is committed (no-op without the writer thread)."""
+        if not config.DB_WRITER_ENABLED:
+            return True
+        return get_writer(self.db_path).flush(timeout)
+
     def _create_tables(self, conn: sqlite3.Connection):
         """Create database tables."""
         
@@ -174,15 +514,337 @@ class DatabaseManager:
             )
         ''')
         
+        # Per-run timing aggregates (utils/run_trace.py), one row per span name
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS run_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL,
+                script TEXT NOT NULL,
+                span TEXT NOT NULL,
+                calls INTEGER NOT NULL DEFAULT 0,
+                total_ms REAL NOT NULL DEFAULT 0,
+                self_ms REAL NOT NULL DEFAULT 0,
+                max_ms REAL NOT NULL DEFAULT 0,
+                errors INTEGER NOT NULL DEFAULT 0,
+                started_at TIMESTAMP NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
         # Create indexes for performance
         conn.execute('CREATE INDEX IF NOT EXISTS idx_messages_hash ON messages(message_hash)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_messages_profile ON messages(profile_id)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_messages_posted ON messages(posted_to_twitter)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_sessions_profile ON scraping_sessions(profile_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_run_metrics_run ON run_metrics(run_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_run_metrics_span ON run_metrics(script, span, started_at)')
+        
+        # Progress of chunked maintenance jobs (e.g. the full-text backfill)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS maintenance_state (
+                key TEXT PRIMARY KEY,
+                value INTEGER,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
         
         conn.commit()
+        self._create_message_fts(conn)
         logger.debug("Database tables created successfully")
     
+    def _create_message_fts(self, conn: sqlite3.Connection):
+        """
+        Create the messages_fts index and its sync triggers (idempotent).
+        
+        When the index is new, or a trigger is missing (Laravel rebuilt the
+        messages table, so writes since then were not indexed), the index is
+        emptied and every existing row is queued for backfill_message_fts().
+        Skipped with a warning when SQLite has no FTS5.
+        """
+        existing = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'messages'"
+        ).fetchall()}
+        if all(name in existing for name in FTS_TRIGGERS):
+            return
+        
+        try:
+            conn.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+                    message_text,
+                    content='messages',
+                    content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2',
+                    prefix='2 3'
+                )
+            ''')
+            conn.execute("INSERT INTO messages_fts (messages_fts) VALUES ('delete-all')")
+            max_id = conn.execute('SELECT MAX(id) FROM messages').fetchone()[0] or 0
+            conn.executemany(
+                'INSERT OR REPLACE INTO maintenance_state (key, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)',
+                [('fts_backfill_done', 0), ('fts_backfill_until', max_id)]
+            )
+            for statement in FTS_TRIGGER_STATEMENTS:
+                conn.execute(statement)
+            conn.commit()
+            logger.info(f"✅ Full-text index initialized ({max_id} existing message ids queued for backfill)")
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.warning(f"Could not create full-text index (non-critical): {e}")
+    
+    def _create_queue_indexes(self, conn: sqlite3.Connection):
+        """
+        Create the queue indexes (idempotent).
+        
+        Runs after migrations because most queue columns are added there, and
+        post_priority only exists once the Laravel migrations have run.
+        """
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(messages)").fetchall()}
+        for index_name, (required_columns, create_sql) in QUEUE_INDEXES.items():
+            missing = [column for column in required_columns if column not in columns]
+            if missing:
+                logger.debug(f"Skipping {index_name} - missing columns: {', '.join(missing)}")
+                continue
+            try:
+                conn.execute(create_sql)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not create {index_name} (non-critical): {e}")
+        conn.commit()
+    
+    def _create_message_counters(self, conn: sqlite3.Connection):
+        """
+        Create the message_counters table and its triggers (idempotent).
+        
+        Laravel migrations that alter messages on SQLite rebuild the table, which
+        drops its triggers. Whenever a trigger has to be (re)created the counters
+        are rebuilt from scratch, since writes made without it were not counted.
+        """
+        columns = ', '.join(f"{name} INTEGER NOT NULL DEFAULT 0" for name in MESSAGE_COUNTERS)
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS message_counters (
+                profile_key INTEGER PRIMARY KEY,
+                {columns}
+            )
+        ''')
+        
+        existing = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'messages'"
+        ).fetchall()}
+        missing = [name for name in COUNTER_TRIGGERS if name not in existing]
+        if not missing:
+            return
+        
+        try:
+            for statement in _counter_trigger_statements():
+                conn.execute(statement)
+            self._rebuild_message_counters(conn)
+            logger.info(f"✅ Message counters initialized (created {', '.join(missing)})")
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.warning(f"Could not create message counters (non-critical): {e}")
+    
+    def _create_message_archive(self, conn: sqlite3.Connection):
+        """
+        Create the archived hash table and the insert guard trigger (idempotent).
+        
+        The trigger rejects inserts of an archived hash with the same
+        IntegrityError as the UNIQUE constraint on messages.message_hash, so
+        archiving never lets an old message be scraped again. Like the counter
+        triggers it is recreated here after Laravel rebuilds the messages table.
+        """
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS message_hash_archive (
+                    message_hash TEXT PRIMARY KEY,
+                    approved_for_posting BOOLEAN,
+                    approved_at TIMESTAMP,
+                    archived_at TIMESTAMP NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {ARCHIVE_GUARD_TRIGGER} BEFORE INSERT ON messages
+                WHEN EXISTS (SELECT 1 FROM message_hash_archive WHERE message_hash = NEW.message_hash)
+                BEGIN
+                    SELECT RAISE(ABORT, 'UNIQUE constraint failed: messages.message_hash (archived)');
+                END
+            ''')
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.warning(f"Could not create message archive tables (non-critical): {e}")
+    
+    @staticmethod
+    def _rebuild_message_counters(conn: sqlite3.Connection):
+        """Replace message_counters with fresh aggregates (commits)."""
+        columns = ', '.join(MESSAGE_COUNTERS)
+        conn.execute('DELETE FROM message_counters')
+        conn.execute(f'INSERT INTO message_counters (profile_key, {columns}) {_counter_aggregate_query()}')
+        conn.commit()
+    
+    def rebuild_message_counters(self):
+        """Rebuild message_counters from the messages table."""
+        with self.get_connection() as conn:
+            self._rebuild_message_counters(conn)
+            logger.info("Message counters rebuilt")
+    
+    def check_message_counters(self) -> Dict[int, Dict[str, Tuple[int, int]]]:
+        """
+        Compare message_counters with a fresh aggregate over messages.
+        
+        Returns:
+            Dictionary of profile_key -> {counter: (stored, actual)} for every
+            mismatch (empty when the counters are consistent)
+        """
+        with self.get_connection() as conn:
+            stored = {row['profile_key']: dict(row) for row in conn.execute('SELECT * FROM message_counters')}
+            actual = {row['profile_key']: dict(row) for row in conn.execute(_counter_aggregate_query())}
+        
+        mismatches = {}
+        for key in set(stored) | set(actual):
+            stored_row = stored.get(key, {})
+            actual_row = actual.get(key, {})
+            diff = {
+                name: (stored_row.get(name, 0), actual_row.get(name, 0))
+                for name in MESSAGE_COUNTERS
+                if stored_row.get(name, 0) != actual_row.get(name, 0)
+            }
+            if diff:
+                mismatches[key] = diff
+        return mismatches
+    
+    def get_message_counters(self, profile_id: Optional[int] = None) -> Dict[str, int]:
+        """
+        Read maintained counters (all messages, or one profile) in O(1).
+        
+        Args:
+            profile_id: Profile ID, or None for the global counters
+            
+        Returns:
+            Dictionary of counter name -> value (zeros if nothing was counted yet)
+        """
+        key = COUNTERS_GLOBAL_KEY if profile_id is None else profile_id
+        with self.get_connection() as conn:
+            row = conn.execute('SELECT * FROM message_counters WHERE profile_key = ?', (key,)).fetchone()
+        counters = {name: 0 for name in MESSAGE_COUNTERS}
+        if row:
+            counters.update({name: row[name] for name in MESSAGE_COUNTERS})
+        return counters
+    
+    def get_profile_message_counters(self) -> Dict[int, Dict[str, int]]:
+        """Maintained counters per profile (profile_id -> counters; -1 = no profile)."""
+        with self.get_connection() as conn:
+            rows = conn.execute('SELECT * FROM message_counters WHERE profile_key != ?',
+                                (COUNTERS_GLOBAL_KEY,)).fetchall()
+        return {row['profile_key']: {name: row[name] for name in MESSAGE_COUNTERS} for row in rows}
+    
+    def _queue_queries(self) -> Dict[str, Tuple[str, list]]:
+        """Hot queue queries with sample parameters, as executed by the callers."""
+        image_queue, image_params = _approved_without_images_query()
+        image_queue_since, image_since_params = _approved_without_images_query(approved_since='1970-01-01 00:00:00')
+        return {
+            'next_page_image': (NEXT_PAGE_IMAGE_QUERY, []),
+            'approved_without_images': (image_queue, image_params),
+            'approved_without_images_since': (image_queue_since, image_since_params),
+            'posted_without_images': (POSTED_WITHOUT_IMAGES_QUERY, [1]),
+            'unposted_messages': (UNPOSTED_MESSAGES_QUERY + ' LIMIT ?', [1]),
+            'posting_counters': (POSTING_COUNTERS_QUERY, []),
+            'unposted_quality_page': (_unposted_page_query()[0], [1]),
+            'unposted_quality_page_after': (_unposted_page_query(after=('1970-01-01 00:00:00', 0))[0],
+                                            ['1970-01-01 00:00:00', 0, 1]),
+        }
+    
+    def _plan_schema_copy(self, conn: sqlite3.Connection, missing_columns: List[str]) -> sqlite3.Connection:
+        """
+        In-memory copy of the queue tables, their indexes and planner statistics,
+        with the missing Laravel-owned columns (and their indexes) added.
+        """
+        placeholders = ', '.join('?' for _ in QUEUE_QUERY_TABLES)
+        schema = conn.execute(f'''
+            SELECT type, sql FROM sqlite_master
+            WHERE tbl_name IN ({placeholders}) AND type IN ('table', 'index') AND sql IS NOT NULL
+            ORDER BY type = 'index'
+        ''', QUEUE_QUERY_TABLES).fetchall()
+        copy = sqlite3.connect(':memory:')
+        for _, sql in schema:
+            copy.execute(sql)
+        for column in missing_columns:
+            declaration, index_statements = LARAVEL_MESSAGE_COLUMNS[column]
+            copy.execute(f'ALTER TABLE messages ADD COLUMN {column} {declaration}')
+            for statement in index_statements:
+                copy.execute(statement)
+        self._create_queue_indexes(copy)
+
+        # Same statistics as the real database, so the planner makes the same choices
+        has_stats = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+        if has_stats:
+            # ANALYZE sqlite_master creates sqlite_stat1 and, run again, reloads it
+            copy.execute('ANALYZE sqlite_master')
+            stats = conn.execute(f'SELECT tbl, idx, stat FROM sqlite_stat1 WHERE tbl IN ({placeholders})',
+                                 QUEUE_QUERY_TABLES).fetchall()
+            copy.executemany('INSERT INTO sqlite_stat1 (tbl, idx, stat) VALUES (?, ?, ?)', [tuple(row) for row in stats])
+            copy.commit()
+            copy.execute('ANALYZE sqlite_master')
+        return copy
+    
+    def explain_queue_queries(self) -> Dict[str, List[str]]:
+        """
+        Get EXPLAIN QUERY PLAN output for every queue query.
+        
+        When Laravel-owned queue columns (post_priority) are missing, the plans
+        come from an in-memory copy of the schema that has them.
+        
+        Returns:
+            Dictionary of query name -> list of plan details
+            (a single 'SKIP: ...' entry if the query needs a queue column that
+            cannot be added to the copy, or 'ERROR: ...' if it cannot run for
+            any other reason)
+        """
+        optional_columns = {column for required, _ in QUEUE_INDEXES.values() for column in required}
+        plans = {}
+        with self.get_connection() as conn:
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(messages)').fetchall()}
+            missing = [column for column in LARAVEL_MESSAGE_COLUMNS if column not in columns]
+            plan_conn = conn
+            if missing:
+                logger.info(f"Checking queue plans on an in-memory schema copy with {', '.join(missing)} added")
+                plan_conn = self._plan_schema_copy(conn, missing)
+            try:
+                for name, (query, params) in self._queue_queries().items():
+                    try:
+                        rows = plan_conn.execute('EXPLAIN QUERY PLAN ' + query, params).fetchall()
+                        plans[name] = [row[3] for row in rows]
+                    except sqlite3.Error as e:
+                        missing_column = _MISSING_COLUMN_PATTERN.search(str(e))
+                        if missing_column and missing_column.group(1) in optional_columns:
+                            # Same rule as _create_queue_indexes: skipped until the column exists
+                            plans[name] = [f"SKIP: missing column {missing_column.group(1)}"]
+                        else:
+                            plans[name] = [f"ERROR: {e}"]
+            finally:
+                if plan_conn is not conn:
+                    plan_conn.close()
+        return plans
+    
+    def check_queue_query_plans(self, plans: Optional[Dict[str, List[str]]] = None) -> Dict[str, List[str]]:
+        """
+        Regression check: find queue queries that fully scan messages or sort in a temp B-tree.
+        
+        Args:
+            plans: Output of explain_queue_queries() (computed when not given)
+        
+        Returns:
+            Dictionary of query name -> offending plan details (empty if all queries are indexed;
+            skipped queries are not reported)
+        """
+        problems = {}
+        for name, plan in (plans if plans is not None else self.explain_queue_queries()).items():
+            offending = [
+                detail for detail in plan
+                if _FULL_SCAN_PATTERN.match(detail) or 'USE TEMP B-TREE' in detail or detail.startswith('ERROR')
+            ]
+            if offending:
+                problems[name] = offending
+        return problems
+    
     # Profile Management
     def add_profile(self, username: str, url: str, credentials_reference: str = None) -> int:
         """
@@ -217,15 +879,16 @@ class DatabaseManager:
             logger.debug(f"Retrieved {len(profiles)} active profiles")
             return profiles
     
-    def update_profile_scraped_time(self, profile_id: int):
-        """Update the last scraped timestamp for a profile."""
-        with self.get_connection() as conn:
+    def update_profile_scraped_time(self, profile_id: int) -> Future:
+        """Update the last scraped timestamp for a profile (queued; returns the write's future)."""
+        def command(conn: sqlite3.Connection):
             conn.execute(
                 'UPDATE profiles SET last_scraped_at = CURRENT_TIMESTAMP WHERE id = ?',
                 (profile_id,)
             )
-            conn.commit()
             logger.debug(f"Updated scraped time for profile {profile_id}")
+
+        return self._write(command)
     
     def deactivate_profile(self, profile_id: int):
         """Deactivate a profile."""
@@ -236,7 +899,70 @@ class DatabaseManager:
             )
             conn.commit()
             logger.info(f"Deactivated profile {profile_id}")
-    
+
+    def sync_profiles(self, profiles: Dict[str, str], credentials_reference: str = None) -> List[Dict]:
+        """
+        Make exactly the given URLs the active profiles, in one transaction.
+
+        Missing URLs are inserted, inactive ones reactivated (ON CONFLICT(url)),
+        and every other active profile is deactivated with a single UPDATE.
+
+        Args:
+            profiles: Ordered mapping of profile URL -> username for new profiles
+            credentials_reference: Reference stored on newly created profiles
+
+        Returns:
+            List of profile dictionaries (id, username, url) in the order given
+        """
+        if not profiles:
+            return []
+
+        urls = list(profiles)
+        placeholders = ','.join('?' * len(urls))
+
+        with self.get_connection() as conn:
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                existing = {
+                    row['url']: row['is_active']
+                    for row in conn.execute('SELECT url, is_active FROM profiles')
+                }
+
+                conn.executemany(
+                    '''INSERT INTO profiles (username, url, credentials_reference)
+                       VALUES (?, ?, ?)
+                       ON CONFLICT(url) DO UPDATE SET is_active = 1''',
+                    # Already-active URLs are skipped: a conflicting insert still consumes an AUTOINCREMENT id
+                    [(username, url, credentials_reference) for url, username in profiles.items()
+                     if not existing.get(url)]
+                )
+                conn.execute(
+                    f'''UPDATE profiles SET is_active = 0
+                        WHERE is_active = 1 AND url NOT IN ({placeholders})''',
+                    urls
+                )
+
+                ids = {
+                    row['url']: row['id']
+                    for row in conn.execute(f'SELECT id, url FROM profiles WHERE url IN ({placeholders})', urls)
+                }
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        wanted = set(urls)
+        for url, is_active in existing.items():
+            if url not in wanted and is_active:
+                logger.info(f"Deactivated profile no longer configured: {url}")
+        for url in urls:
+            if url not in existing:
+                logger.info(f"Created new profile: {url}")
+            elif not existing[url]:
+                logger.info(f"Reactivated profile: {url}")
+
+        return [{'id': ids[url], 'username': profiles[url], 'url': url} for url in urls]
+
     # Message Management
     @staticmethod
     def generate_message_hash(message_text: str) -> str:
@@ -252,6 +978,7 @@ class DatabaseManager:
         normalized = MessageDeduplicator.normalize_message_text(message_text)
         return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
     
+    @traced('db.message_exists')
     def message_exists(self, message_text: str) -> bool:
         """
         Check if a message should be blocked from scraping.
@@ -261,6 +988,8 @@ class DatabaseManager:
         - Approved messages (approved_for_posting=true): Block for 15 days, then allow reuse
         - Pending/unreviewed messages (approved_for_posting=NULL): Block (duplicate)
         
+        Archived messages are looked up in message_hash_archive (same rules).
+        
         Returns:
             True if message should be blocked (duplicate)
             False if message can be scraped (new or approved 15+ days ago)
@@ -276,61 +1005,70 @@ class DatabaseManager:
             result = cursor.fetchone()
             
             if result is None:
-                # Message doesn't exist - allow scraping
-                logger.debug(f"Message is NEW - allow scraping")
-                return False
+                result = conn.execute(
+                    'SELECT approved_for_posting, approved_at FROM message_hash_archive WHERE message_hash = ?',
+                    (message_hash,)
+                ).fetchone()
+                if result is None:
+                    # Message doesn't exist - allow scraping
+                    logger.debug(f"Message is NEW - allow scraping")
+                    return False
+                logger.debug(f"Message found in archive")
             
-            approved_for_posting = result[0]
-            approved_at = result[1]
-            
-            # Message exists - check approval status
-            if approved_for_posting is None:
-                # Pending/unreviewed - block as duplicate
-                logger.debug(f"Message exists as PENDING - block duplicate")
-                return True
-            elif approved_for_posting == 0 or approved_for_posting == False:
-                # Rejected - always block
-                logger.debug(f"Message exists as REJECTED - block forever")
+            return self._blocks_rescrape(result[0], result[1])
+    
+    @staticmethod
+    def _blocks_rescrape(approved_for_posting, approved_at) -> bool:
+        """Review status rules of message_exists for a stored (or archived) message."""
+        # Message exists - check approval status
+        if approved_for_posting is None:
+            # Pending/unreviewed - block as duplicate
+            logger.debug(f"Message exists as PENDING - block duplicate")
+            return True
+        elif approved_for_posting == 0 or approved_for_posting == False:
+            # Rejected - always block
+            logger.debug(f"Message exists as REJECTED - block forever")
+            return True
+        elif approved_for_posting == 1 or approved_for_posting == True:
+            # Approved - check if 15+ days old
+            if approved_at is None:
+                # Approved but no timestamp - block as safety measure
+                logger.debug(f"Message APPROVED but no timestamp - block")
                 return True
-            elif approved_for_posting == 1 or approved_for_posting == True:
-                # Approved - check if 15+ days old
-                if approved_at is None:
-                    # Approved but no timestamp - block as safety measure
-                    logger.debug(f"Message APPROVED but no timestamp - block")
-                    return True
+            
+            # Calculate days since approval
+            from datetime import datetime, timezone
+            try:
+                # Parse the timestamp (handle both ISO format and datetime objects)
+                if isinstance(approved_at, str):
+                    approved_dt = datetime.fromisoformat(approved_at.replace('Z', '+00:00'))
+                else:
+                    approved_dt = approved_at
                 
-                # Calculate days since approval
-                from datetime import datetime, timezone
-                try:
-                    # Parse the timestamp (handle both ISO format and datetime objects)
-                    if isinstance(approved_at, str):
-                        approved_dt = datetime.fromisoformat(approved_at.replace('Z', '+00:00'))
-                    else:
-                        approved_dt = approved_at
-                    
-                    # Ensure timezone awareness
-                    if approved_dt.tzinfo is None:
-                        approved_dt = approved_dt.replace(tzinfo=timezone.utc)
-                    
-                    now = datetime.now(timezone.utc)
-                    days_since_approval = (now - approved_dt).days
-                    
-                    if days_since_approval >= 15:
-                        # Approved 15+ days ago - allow reuse
-                        logger.info(f"Message APPROVED {days_since_approval} days ago - ALLOW REUSE for re-scraping")
-                        return False
-                    else:
-                        # Approved but too recent - block
-                        logger.debug(f"Message APPROVED {days_since_approval} days ago - block (need 15+ days)")
-                        return True
-                except Exception as e:
-                    logger.warning(f"Error parsing approval date: {e} - blocking as safety measure")
+                # Ensure timezone awareness
+                if approved_dt.tzinfo is None:
+                    approved_dt = approved_dt.replace(tzinfo=timezone.utc)
+                
+                now = datetime.now(timezone.utc)
+                days_since_approval = (now - approved_dt).days
+                
+                if days_since_approval >= 15:
+                    # Approved 15+ days ago - allow reuse
+                    logger.info(f"Message APPROVED {days_since_approval} days ago - ALLOW REUSE for re-scraping")
+                    return False
+                else:
+                    # Approved but too recent - block
+                    logger.debug(f"Message APPROVED {days_since_approval} days ago - block (need 15+ days)")
                     return True
-            
-            # Default: block unknown states
-            logger.debug(f"Message in unknown state - block as safety measure")
-            return True
+            except Exception as e:
+                logger.warning(f"Error parsing approval date: {e} - blocking as safety measure")
+                return True
+        
+        # Default: block unknown states
+        logger.debug(f"Message in unknown state - block as safety measure")
+        return True
     
+    @traced('db.add_message')
     def add_message(self, profile_id: int, message_text: str) -> Optional[int]:
         """
         Add a new message to the database.
@@ -342,23 +1080,37 @@ class DatabaseManager:
         Returns:
             Message ID if added, None if duplicate
         """
+        return self.add_message_async(profile_id, message_text, urgent=True).result()
+
+    def add_message_async(self, profile_id: int, message_text: str, urgent: bool = False) -> Future:
+        """
+        Queue a new message on the writer thread.
+
+        Lets the scroll loop submit every message of a scroll and wait once,
+        so they share one commit.
+
+        Args:
+            profile_id: ID of the profile this message belongs to
+            message_text: The message content
+            urgent: Commit without waiting for more writes
+
+        Returns:
+            Future resolving to the message ID, or None if duplicate
+        """
         message_hash = self.generate_message_hash(message_text)
-        
-        with self.get_connection() as conn:
+        # BUGFIX: Store timestamp in UTC format for Laravel compatibility
+        # Laravel's accessor expects UTC timestamps and converts to app timezone (America/Mexico_City)
+        # Format: YYYY-MM-DD HH:MM:SS (matches Laravel's datetime expectations)
+        scraped_at = datetime.now(tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        logger.debug(f"Bugfix: Storing scraped_at in UTC: {scraped_at}")
+
+        def command(conn: sqlite3.Connection) -> Optional[int]:
             try:
-                # BUGFIX: Store timestamp in UTC format for Laravel compatibility
-                # Laravel's accessor expects UTC timestamps and converts to app timezone (America/Mexico_City)
-                # Format: YYYY-MM-DD HH:MM:SS (matches Laravel's datetime expectations)
-                from datetime import datetime, timezone
-                scraped_at = datetime.now(tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
-                logger.debug(f"Bugfix: Storing scraped_at in UTC: {scraped_at}")
-                
                 cursor = conn.execute(
                     '''INSERT INTO messages (profile_id, message_text, message_hash, scraped_at) 
                        VALUES (?, ?, ?, ?)''',
                     (profile_id, message_text, message_hash, scraped_at)
                 )
-                conn.commit()
                 message_id = cursor.lastrowid
                 logger.debug(f"Added message {message_id} for profile {profile_id}")
                 return message_id
@@ -374,7 +1126,10 @@ class DatabaseManager:
                 if existing:
                     logger.warning(f"Bugfix: Existing message ID {existing[0]}: {existing[1][:100]}...")
                 return None
+
+        return self._write(command, urgent)
     
+    @traced('db.add_messages_batch')
     def add_messages_batch(self, profile_id: int, messages: List[str]) -> Tuple[int, int]:
         """
         Add multiple messages in a batch operation.
@@ -386,12 +1141,12 @@ class DatabaseManager:
         Returns:
             Tuple of (new_messages_count, duplicate_messages_count)
         """
-        new_count = 0
-        duplicate_count = 0
-        
-        with self.get_connection() as conn:
-            for message_text in messages:
-                message_hash = self.generate_message_hash(message_text)
+        hashes = [(message_text, self.generate_message_hash(message_text)) for message_text in messages]
+
+        def command(conn: sqlite3.Connection) -> Tuple[int, int]:
+            new_count = 0
+            duplicate_count = 0
+            for message_text, message_hash in hashes:
                 try:
                     conn.execute(
                         '''INSERT INTO messages (profile_id, message_text, message_hash) 
@@ -401,74 +1156,254 @@ class DatabaseManager:
                     new_count += 1
                 except sqlite3.IntegrityError:
                     duplicate_count += 1
-            
-            conn.commit()
-            logger.info(f"Batch insert: {new_count} new, {duplicate_count} duplicates")
             return new_count, duplicate_count
+
+        new_count, duplicate_count = self._write(command, urgent=True).result()
+        logger.info(f"Batch insert: {new_count} new, {duplicate_count} duplicates")
+        return new_count, duplicate_count
+    
+    def get_message(self, message_id: int) -> Optional[MessageRecord]:
+        """
+        Fetch a single message by primary key.
+        
+        Args:
+            message_id: Message ID
+            
+        Returns:
+            MessageRecord (with profile_username when the profile exists), or None if not found
+        """
+        with self.get_connection() as conn:
+            row = conn.execute('''
+                SELECT m.*, p.username as profile_username
+                FROM messages m
+                LEFT JOIN profiles p ON m.profile_id = p.id
+                WHERE m.id = ?
+            ''', (message_id,)).fetchone()
+            return MessageRecord.from_row(row) if row else None
     
     def get_unposted_messages(self, limit: Optional[int] = None) -> List[Dict]:
         """Get messages that haven't been posted yet."""
-        query = '''
-            SELECT m.*, p.username as profile_username 
-            FROM messages m
-            JOIN profiles p ON m.profile_id = p.id
-            WHERE m.posted_to_twitter = 0
-            ORDER BY m.scraped_at ASC
-        '''
+        query = UNPOSTED_MESSAGES_QUERY
+        params = []
         
         if limit:
-            query += f' LIMIT {limit}'
+            query += ' LIMIT ?'
+            params.append(int(limit))
         
         with self.get_connection() as conn:
-            cursor = conn.execute(query)
+            cursor = conn.execute(query, params)
             messages = [dict(row) for row in cursor.fetchall()]
             logger.debug(f"Retrieved {len(messages)} unposted messages")
             return messages
     
+    def stream_quality_messages(self, is_valid: Callable[[str], bool], limit: int = 1,
+                                profile_filter: Optional[str] = None,
+                                page_size: int = 50) -> Iterator[Dict]:
+        """
+        Yield the first `limit` unposted messages that pass the quality filter.
+        
+        Pages through the queue in keyset order on a single connection and only
+        reads as many pages as needed. Rows checked for the first time get their
+        verdict persisted in quality_checked, so rejected rows are never read
+        again and passing rows are not re-evaluated. Rejects are also marked as
+        skipped (post_url = 'SKIPPED_QUALITY_FILTER') as before. All verdicts are
+        written with executemany in one transaction when the generator finishes
+        or is closed.
+        
+        Args:
+            is_valid: Quality predicate for message text (e.g. MessageQualityFilter.is_valid_message)
+            limit: Number of valid messages to yield
+            profile_filter: Optional profile username to filter by
+            page_size: Rows read per keyset page
+            
+        Yields:
+            Message dictionaries (including profile_username)
+        """
+        passed_ids: List[Tuple[int]] = []
+        rejected: List[Tuple[str, int]] = []
+        yielded = 0
+        
+        with self.get_connection() as conn:
+            try:
+                after = None
+                while yielded < limit:
+                    query, params = _unposted_page_query(after, profile_filter)
+                    rows = conn.execute(query, params + [page_size]).fetchall()
+                    if not rows:
+                        break
+                    
+                    for row in rows:
+                        message = dict(row)
+                        verdict = message.get('quality_checked')
+                        if verdict is None:
+                            if not is_valid(message['message_text']):
+                                logger.debug(f"Message ID {message['id']} failed quality: '{message['message_text'][:50]}'")
+                                rejected.append((datetime.now().isoformat(), message['id']))
+                                continue
+                            passed_ids.append((message['id'],))
+                            message['quality_checked'] = QUALITY_PASSED
+                        
+                        yield message
+                        yielded += 1
+                        if yielded >= limit:
+                            break
+                    
+                    last = rows[-1]
+                    after = (last['scraped_at'], last['id'])
+            finally:
+                self._save_quality_verdicts(conn, passed_ids, rejected)
+    
+    @staticmethod
+    def _save_quality_verdicts(conn: sqlite3.Connection, passed_ids: List[Tuple[int]],
+                               rejected: List[Tuple[str, int]]):
+        """Persist quality verdicts in one transaction (rejects are marked as skipped)."""
+        if not rejected and not passed_ids:
+            return
+        if rejected:
+            conn.executemany(
+                '''UPDATE messages
+                   SET quality_checked = 0,
+                       posted_to_twitter = 1,
+                       posted_at = ?,
+                       post_url = 'SKIPPED_QUALITY_FILTER'
+                   WHERE id = ?''',
+                rejected
+            )
+        if passed_ids:
+            conn.executemany('UPDATE messages SET quality_checked = 1 WHERE id = ?', passed_ids)
+        conn.commit()
+        logger.info(f"Quality verdicts saved: {len(passed_ids)} passed, {len(rejected)} skipped")
+    
+    def check_unverified_quality(self, is_valid: Callable[[str], bool], batch_size: int = 500) -> Tuple[int, int]:
+        """
+        Evaluate and persist the quality verdict of every unposted message not checked yet.
+        
+        Only rows with quality_checked IS NULL are read, so after the first run
+        this touches new messages only.
+        
+        Args:
+            is_valid: Quality predicate for message text
+            batch_size: Rows evaluated (and committed) per batch
+            
+        Returns:
+            Tuple of (passed_count, rejected_count)
+        """
+        passed_total = rejected_total = 0
+        last_id = 0
+        with self.get_connection() as conn:
+            while True:
+                rows = conn.execute('''
+                    SELECT id, message_text
+                    FROM messages
+                    WHERE posted_to_twitter = 0 AND quality_checked IS NULL AND id > ?
+                    ORDER BY id
+                    LIMIT ?
+                ''', (last_id, batch_size)).fetchall()
+                if not rows:
+                    break
+                
+                passed_ids, rejected = [], []
+                for row in rows:
+                    if is_valid(row['message_text']):
+                        passed_ids.append((row['id'],))
+                    else:
+                        rejected.append((datetime.now().isoformat(), row['id']))
+                self._save_quality_verdicts(conn, passed_ids, rejected)
+                passed_total += len(passed_ids)
+                rejected_total += len(rejected)
+                last_id = rows[-1]['id']
+        return passed_total, rejected_total
+    
+    def get_posting_counters(self) -> Dict[str, int]:
+        """
+        Get all posting counters with a single aggregate query.
+        
+        Quality counters come from the persisted verdicts (quality_checked);
+        run check_unverified_quality() first to include unchecked messages
+        (unchecked_unposted counts the unposted ones without a verdict).
+        
+        Returns:
+            Dictionary with total_messages, posted, unposted, posted_with_url,
+            posted_with_images, posted_missing_images, skipped_quality,
+            quality_unposted, unchecked_unposted and quality_rejected
+        """
+        with self.get_connection() as conn:
+            counters = dict(conn.execute(POSTING_COUNTERS_QUERY).fetchone())
+            logger.debug(f"Posting counters: {counters}")
+            return counters
+    
     def mark_message_posted(self, message_id: int, post_url: str = None, avatar_url: str = None):
         """Mark a message as posted with post URL and avatar URL."""
-        with self.get_connection() as conn:
+        def command(conn: sqlite3.Connection):
             conn.execute(
                 '''UPDATE messages 
                    SET posted_to_twitter = 1, posted_at = CURRENT_TIMESTAMP, post_url = ?, avatar_url = ?
                    WHERE id = ?''',
                 (post_url, avatar_url, message_id)
             )
-            conn.commit()
-            logger.info(f"Marked message {message_id} as posted (URL: {post_url}, Avatar: {avatar_url})")
+
+        # Waits for the commit: the next posting run must not pick the message again
+        self._write(command, urgent=True).result()
+        logger.info(f"Marked message {message_id} as posted (URL: {post_url}, Avatar: {avatar_url})")
+
+    def mark_posted_to_page(self, message_id: int) -> bool:
+        """
+        Mark a message as posted to the Facebook page.
+
+        Returns:
+            True if the update was committed
+        """
+        # Bugfix: Store timestamp in UTC format for Laravel compatibility
+        posted_at = datetime.now(tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+        def command(conn: sqlite3.Connection):
+            conn.execute(
+                'UPDATE messages SET posted_to_page = 1, posted_to_page_at = ? WHERE id = ?',
+                (posted_at, message_id)
+            )
+
+        try:
+            self._write(command, urgent=True).result()
+            logger.info(f"Marked message {message_id} as posted to page")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to mark message {message_id} as posted to page: {e}")
+            return False
     
     def get_message_stats(self) -> Dict:
-        """Get statistics about messages in the database."""
+        """Get statistics about messages in the database (from message_counters)."""
+        counters = self.get_message_counters()
         with self.get_connection() as conn:
-            cursor = conn.execute('''
-                SELECT 
-                    COUNT(*) as total_messages,
-                    COUNT(CASE WHEN posted_to_twitter = 1 THEN 1 END) as posted,
-                    COUNT(CASE WHEN posted_to_twitter = 0 THEN 1 END) as unposted,
-                    COUNT(DISTINCT profile_id) as profiles_with_messages
-                FROM messages
-            ''')
-            stats = dict(cursor.fetchone())
-            logger.debug(f"Message stats: {stats}")
-            return stats
+            profiles_with_messages = conn.execute(
+                'SELECT COUNT(*) FROM message_counters WHERE profile_key > 0 AND total > 0'
+            ).fetchone()[0]
+        stats = {
+            'total_messages': counters['total'],
+            'posted': counters['posted'],
+            'unposted': counters['unposted'],
+            'profiles_with_messages': profiles_with_messages,
+        }
+        logger.debug(f"Message stats: {stats}")
+        return stats
     
     # Scraping Session Management
     def start_scraping_session(self, profile_id: int) -> int:
         """Start a new scraping session."""
-        with self.get_connection() as conn:
+        def command(conn: sqlite3.Connection) -> int:
             cursor = conn.execute(
                 'INSERT INTO scraping_sessions (profile_id, started_at) VALUES (?, CURRENT_TIMESTAMP)',
                 (profile_id,)
             )
-            conn.commit()
-            session_id = cursor.lastrowid
-            logger.info(f"Bugfix: Started scraping session {session_id} for profile {profile_id} with explicit started_at")
-            return session_id
+            return cursor.lastrowid
+
+        session_id = self._write(command, urgent=True).result()
+        logger.info(f"Bugfix: Started scraping session {session_id} for profile {profile_id} with explicit started_at")
+        return session_id
     
     def complete_scraping_session(self, session_id: int, messages_found: int, 
-                                 messages_new: int, stopped_reason: str = "completed"):
-        """Complete a scraping session with results."""
-        with self.get_connection() as conn:
+                                 messages_new: int, stopped_reason: str = "completed") -> Future:
+        """Complete a scraping session with results (queued; returns the write's future)."""
+        def command(conn: sqlite3.Connection):
             conn.execute(
                 '''UPDATE scraping_sessions 
                    SET completed_at = CURRENT_TIMESTAMP, messages_found = ?, 
@@ -476,8 +1411,9 @@ class DatabaseManager:
                    WHERE id = ?''',
                 (messages_found, messages_new, stopped_reason, session_id)
             )
-            conn.commit()
             logger.info(f"Completed scraping session {session_id}: {messages_new}/{messages_found} new messages")
+
+        return self._write(command)
     
     def get_session_stats(self, profile_id: Optional[int] = None) -> List[Dict]:
         """Get scraping session statistics."""
@@ -515,69 +1451,350 @@ class DatabaseManager:
         excluding messages that were skipped due to quality filtering or duplicates.
         """
         with self.get_connection() as conn:
-            cursor = conn.execute('''
-                SELECT m.id, m.message_text, m.post_url, m.avatar_url, m.posted_at,
-                       p.username as profile_username
-                FROM messages m
-                JOIN profiles p ON m.profile_id = p.id
-                WHERE m.posted_to_twitter = 1 
-                AND (m.image_generated = 0 OR m.image_generated IS NULL)
-                AND m.post_url IS NOT NULL
-                AND m.post_url != 'SKIPPED_QUALITY_FILTER'
-                AND m.post_url != 'DUPLICATE_SKIPPED'
-                ORDER BY m.posted_at DESC
-                LIMIT ?
-            ''', (limit,))
+            cursor = conn.execute(POSTED_WITHOUT_IMAGES_QUERY, (limit,))
             messages = [dict(row) for row in cursor.fetchall()]
             logger.debug(f"Found {len(messages)} posted messages without images (excluding skipped)")
             return messages
     
-    def mark_image_generated(self, message_id: int, image_path: str) -> bool:
-        """Mark a message as having its image generated."""
+    def get_approved_messages_without_images(self, approved_since: Optional[str] = None,
+                                             message_id: Optional[int] = None) -> List[Dict]:
+        """
+        Get approved messages that still need an image, oldest approval first.
+        
+        Args:
+            approved_since: Only include messages approved at or after this timestamp
+                            (high-water mark used by the image generator watch mode)
+            message_id: Only include this specific message
+            
+        Returns:
+            List of message dictionaries
+        """
+        query, params = _approved_without_images_query(approved_since, message_id)
+        
+        with self.get_connection() as conn:
+            cursor = conn.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_next_page_image(self) -> Optional[Dict]:
+        """
+        Get the next approved image for the Facebook page posting queue.
+        
+        Orders by priority (highest first), then by approved_at (oldest first).
+        Feature: post_priority field - images with priority 1 (from "generar ahora") post first
+        """
+        with self.get_connection() as conn:
+            row = conn.execute(NEXT_PAGE_IMAGE_QUERY).fetchone()
+            return dict(row) if row else None
+    
+    def mark_image_generated(self, message_id: int, image_path: str,
+                             encoded_image_path: str = None, thumbnail_path: str = None) -> bool:
+        """
+        Mark a message as having its image generated.
+        
+        Args:
+            message_id: Message ID
+            image_path: Path to the (optimized) PNG image
+            encoded_image_path: Optional WebP/JPEG variant used for uploads
+            thumbnail_path: Optional gallery thumbnail
+        """
+        def command(conn: sqlite3.Connection):
+            conn.execute(
+                '''UPDATE messages 
+                   SET image_generated = 1, image_path = ?,
+                       encoded_image_path = ?, thumbnail_path = ?
+                   WHERE id = ?''',
+                (image_path, encoded_image_path, thumbnail_path, message_id)
+            )
+
         try:
-            with self.get_connection() as conn:
-                conn.execute(
-                    '''UPDATE messages 
-                       SET image_generated = 1, image_path = ?
-                       WHERE id = ?''',
-                    (image_path, message_id)
-                )
-                conn.commit()
-                logger.info(f"Marked message {message_id} as image generated: {image_path}")
-                return True
+            self._write(command, urgent=True).result()
+            logger.info(f"Marked message {message_id} as image generated: {image_path}")
+            return True
         except Exception as e:
             logger.error(f"Failed to mark message {message_id} as image generated: {e}")
             return False
     
     def get_message_image_stats(self) -> Dict:
-        """Get statistics about message images."""
-        with self.get_connection() as conn:
-            cursor = conn.execute('''
-                SELECT 
-                    COUNT(*) as total_posted_messages,
-                    COUNT(CASE WHEN image_generated = 1 THEN 1 END) as images_generated,
-                    COUNT(CASE WHEN image_generated = 0 OR image_generated IS NULL THEN 1 END) as images_pending
-                FROM messages
-                WHERE posted_to_twitter = 1
-            ''')
-            stats = dict(cursor.fetchone())
-            logger.debug(f"Image stats: {stats}")
-            return stats
+        """Get statistics about message images (from message_counters)."""
+        counters = self.get_message_counters()
+        stats = {
+            'total_posted_messages': counters['posted'],
+            'images_generated': counters['posted_images_generated'],
+            'images_pending': counters['posted_images_pending'],
+        }
+        logger.debug(f"Image stats: {stats}")
+        return stats
     
     def get_database_stats(self) -> Dict:
         """Get overall database statistics."""
         with self.get_connection() as conn:
             # Get table counts
             stats = {}
-            for table in ['profiles', 'messages', 'scraping_sessions']:
+            for table in ['profiles', 'scraping_sessions']:
                 cursor = conn.execute(f'SELECT COUNT(*) FROM {table}')
                 stats[f'{table}_count'] = cursor.fetchone()[0]
             
+            # messages can be large - use the maintained counter instead of COUNT(*)
+            row = conn.execute('SELECT total FROM message_counters WHERE profile_key = ?',
+                               (COUNTERS_GLOBAL_KEY,)).fetchone()
+            stats['messages_count'] = row[0] if row else 0
+            
             # Get database size
             stats['database_size_mb'] = self.db_path.stat().st_size / (1024 * 1024)
             
             logger.debug(f"Database stats: {stats}")
             return stats
+    
+    # Archive tier
+    def _ensure_messages_archive(self, conn: sqlite3.Connection) -> List[str]:
+        """
+        Create messages_archive from the current messages columns, adding any
+        column messages gained since (Laravel migrations).
+        
+        Returns:
+            Column names shared by both tables
+        """
+        columns = [(row[1], row[2]) for row in conn.execute('PRAGMA table_info(messages)').fetchall()]
+        existing = [row[1] for row in conn.execute('PRAGMA table_info(messages_archive)').fetchall()]
+        if not existing:
+            definitions = ', '.join(
+                'id INTEGER PRIMARY KEY' if name == 'id' else f'"{name}" {column_type}'.rstrip()
+                for name, column_type in columns
+            )
+            conn.execute(f'CREATE TABLE messages_archive ({definitions}, archived_at TIMESTAMP)')
+            logger.info("✅ messages_archive table created")
+        else:
+            for name, column_type in columns:
+                if name not in existing:
+                    conn.execute(f'ALTER TABLE messages_archive ADD COLUMN "{name}" {column_type}'.rstrip())
+                    logger.info(f"Added {name} column to messages_archive")
+        conn.commit()
+        return [name for name, _ in columns]
+    
+    def archive_messages(self, older_than_days: int = DEFAULT_ARCHIVE_AFTER_DAYS,
+                         scan_rows: int = ARCHIVE_SCAN_ROWS, pause: float = 0.05,
+                         max_rows: Optional[int] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Move cold messages to messages_archive in bounded batches.
+        
+        Cold means rejected, or posted and no longer waiting in the page queue,
+        with no activity since the cutoff (ARCHIVE_CANDIDATE_PREDICATE). The
+        table is walked in id windows of scan_rows rows; each window is one
+        BEGIN IMMEDIATE transaction that records the hashes in
+        message_hash_archive, copies the rows and deletes them from messages,
+        so the write lock is held for one window at a time.
+        
+        message_counters follow the delete triggers, i.e. they count the hot
+        table only.
+        
+        Args:
+            older_than_days: Archive messages with no activity for this many days
+            scan_rows: Id range examined (and at most moved) per transaction
+            pause: Seconds to sleep between windows so other writers get the lock
+            max_rows: Stop after archiving about this many rows
+            dry_run: Only count the candidates
+            
+        Returns:
+            Dictionary with cutoff, candidates or archived, windows and seconds
+        """
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).strftime('%Y-%m-%d %H:%M:%S')
+        stats = {'cutoff': cutoff, 'archived': 0, 'windows': 0, 'seconds': 0.0}
+        start = time.perf_counter()
+        
+        with self.get_connection() as conn:
+            if dry_run:
+                stats['candidates'] = conn.execute(
+                    f'SELECT COUNT(*) FROM messages WHERE {ARCHIVE_CANDIDATE_PREDICATE}', {'cutoff': cutoff}
+                ).fetchone()[0]
+                return stats
+            
+            low, high = conn.execute('SELECT MIN(id), MAX(id) FROM messages').fetchone()
+            if low is None:
+                return stats
+            
+            columns = ', '.join(f'"{name}"' for name in self._ensure_messages_archive(conn))
+            window = f'id >= :start AND id < :end AND {ARCHIVE_CANDIDATE_PREDICATE}'
+            window_start = low
+            while window_start <= high:
+                params = {'cutoff': cutoff, 'start': window_start, 'end': window_start + scan_rows,
+                          'archived_at': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')}
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    conn.execute(f'''
+                        INSERT OR REPLACE INTO message_hash_archive
+                            (message_hash, approved_for_posting, approved_at, archived_at)
+                        SELECT message_hash, approved_for_posting, approved_at, :archived_at
+                        FROM messages WHERE {window}
+                    ''', params)
+                    conn.execute(f'''
+                        INSERT OR REPLACE INTO messages_archive ({columns}, archived_at)
+                        SELECT {columns}, :archived_at FROM messages WHERE {window}
+                    ''', params)
+                    moved = conn.execute(f'DELETE FROM messages WHERE {window}', params).rowcount
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                
+                stats['archived'] += moved
+                stats['windows'] += 1
+                window_start += scan_rows
+                if max_rows is not None and stats['archived'] >= max_rows:
+                    break
+                if moved and pause:
+                    time.sleep(pause)
+        
+        stats['seconds'] = round(time.perf_counter() - start, 2)
+        logger.info(f"📦 Archived {stats['archived']} messages older than {cutoff} "
+                    f"({stats['windows']} windows, {stats['seconds']}s)")
+        return stats
+    
+    def get_archive_stats(self) -> Dict[str, int]:
+        """Row counts of the archive tier (archived rows and archived hashes)."""
+        with self.get_connection() as conn:
+            hashes = conn.execute('SELECT COUNT(*) FROM message_hash_archive').fetchone()[0]
+            has_archive = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_archive'"
+            ).fetchone()
+            rows = conn.execute('SELECT COUNT(*) FROM messages_archive').fetchone()[0] if has_archive else 0
+        return {'archived_messages': rows, 'archived_hashes': hashes}
+    
+    # Full-text search
+    @staticmethod
+    def _fts_query(text: str, prefix: bool = False) -> str:
+        """Turn free text into an FTS5 query: every word must match (as a prefix with prefix=True)."""
+        terms = []
+        for word in re.findall(r'\w+', text):
+            term = '"' + word.replace('"', '""') + '"'
+            terms.append(term + '*' if prefix else term)
+        return ' '.join(terms)
+    
+    def search_messages(self, query: str, limit: int = 20, offset: int = 0, prefix: bool = False,
+                        raw: bool = False, snippet_tokens: int = 12) -> List[Dict]:
+        """
+        Full-text search over message_text, best matches first (bm25).
+        
+        Matching ignores case and accents. Until backfill_message_fts() has
+        finished, older messages may be missing from the results.
+        
+        Args:
+            query: Words to search for (all must match)
+            limit: Maximum number of results
+            offset: Results to skip (paging)
+            prefix: Match words as prefixes ('jaj' finds 'jajaja')
+            raw: Pass query as FTS5 syntax (phrases, OR, NEAR, column filters)
+            snippet_tokens: Tokens of context in each snippet
+            
+        Returns:
+            List of dictionaries with id, profile_id, profile_username, scraped_at,
+            approved_for_posting, posted_to_twitter, message_text, snippet
+            (matches in [brackets]) and rank (lower is better)
+        """
+        match = query if raw else self._fts_query(query, prefix)
+        if not match:
+            return []
+        
+        with self.get_connection() as conn:
+            rows = conn.execute('''
+                SELECT m.id, m.profile_id, p.username as profile_username, m.scraped_at,
+                       m.approved_for_posting, m.posted_to_twitter, m.message_text,
+                       snippet(messages_fts, 0, '[', ']', '…', ?) as snippet,
+                       bm25(messages_fts) as rank
+                FROM messages_fts
+                JOIN messages m ON m.id = messages_fts.rowid
+                LEFT JOIN profiles p ON p.id = m.profile_id
+                WHERE messages_fts MATCH ?
+                ORDER BY rank
+                LIMIT ? OFFSET ?
+            ''', (snippet_tokens, match, limit, offset)).fetchall()
+        return [dict(row) for row in rows]
+    
+    def get_fts_status(self) -> Dict[str, Any]:
+        """Whether the full-text index exists and how many message ids still wait for backfill."""
+        with self.get_connection() as conn:
+            available = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'"
+            ).fetchone() is not None
+            state = dict(conn.execute(
+                "SELECT key, value FROM maintenance_state WHERE key IN ('fts_backfill_done', 'fts_backfill_until')"
+            ).fetchall())
+        done, until = state.get('fts_backfill_done', 0), state.get('fts_backfill_until', 0)
+        return {'available': available, 'backfill_done_id': done, 'backfill_until_id': until,
+                'pending_ids': max(until - done, 0)}
+    
+    def backfill_message_fts(self, chunk_size: int = FTS_BACKFILL_CHUNK, pause: float = 0.05,
+                             max_chunks: Optional[int] = None) -> int:
+        """
+        Index messages that existed before the full-text index, in chunks.
+        
+        Each chunk indexes one id range and advances fts_backfill_done in the
+        same short transaction, so the job can be stopped and resumed at any
+        point and never holds the write lock for long.
+        
+        Args:
+            chunk_size: Message ids per transaction
+            pause: Seconds to sleep between chunks
+            max_chunks: Stop after this many chunks (None = until done)
+            
+        Returns:
+            Number of messages indexed
+        """
+        indexed = chunks = 0
+        with self.get_connection() as conn:
+            while max_chunks is None or chunks < max_chunks:
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    state = dict(conn.execute(
+                        "SELECT key, value FROM maintenance_state WHERE key IN ('fts_backfill_done', 'fts_backfill_until')"
+                    ).fetchall())
+                    done, until = state.get('fts_backfill_done'), state.get('fts_backfill_until')
+                    if done is None or until is None or done >= until:
+                        conn.execute("DELETE FROM maintenance_state WHERE key IN ('fts_backfill_done', 'fts_backfill_until')")
+                        conn.commit()
+                        break
+                    
+                    chunk_end = min(done + chunk_size, until)
+                    indexed += conn.execute(
+                        '''INSERT INTO messages_fts (rowid, message_text)
+                           SELECT id, message_text FROM messages WHERE id > ? AND id <= ?''',
+                        (done, chunk_end)
+                    ).rowcount
+                    conn.execute(
+                        "UPDATE maintenance_state SET value = ?, updated_at = CURRENT_TIMESTAMP WHERE key = 'fts_backfill_done'",
+                        (chunk_end,)
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                chunks += 1
+                if pause:
+                    time.sleep(pause)
+        
+        if indexed:
+            logger.info(f"🔎 Full-text backfill: {indexed} messages indexed in {chunks} chunk(s)")
+        return indexed
+    
+    def save_run_metrics(self, run_id: str, script: str, started_at: datetime, summary: List[Dict]):
+        """
+        Store the per-span timing summary of a run (see utils/run_trace.py).
+        
+        Args:
+            run_id: Unique run identifier
+            script: Script that ran (e.g. 'relay_agent')
+            started_at: Run start time
+            summary: Rows with span, calls, total_ms, self_ms, max_ms, errors
+        """
+        with self.get_connection() as conn:
+            conn.executemany(
+                '''INSERT INTO run_metrics (run_id, script, span, calls, total_ms, self_ms, max_ms, errors, started_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                [(run_id, script, row['span'], row['calls'], row['total_ms'], row['self_ms'],
+                  row['max_ms'], row['errors'], started_at.strftime('%Y-%m-%d %H:%M:%S'))
+                 for row in summary]
+            )
+            conn.commit()
+            logger.debug(f"Stored {len(summary)} run metrics for {run_id}")
 
 
 # Global database instance
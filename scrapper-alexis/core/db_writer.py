@@ -0,0 +1,253 @@
+"""
+Single-writer thread for the scraper database.
+
+Writes from the scraping/posting code are queued as commands (functions
+that take a connection) and executed by one background thread on its own
+connection. The thread group-commits: it starts a transaction with the
+first command and commits once COMMIT_INTERVAL seconds have passed or
+MAX_BATCH commands have run, so many small writes share one fsync and the
+browser automation thread never waits on the disk.
+
+Every command gets a concurrent.futures.Future. It resolves after the
+commit that made the write durable, so callers that need a new row id (or
+read-your-writes) call .result(); fire-and-forget callers ignore it.
+Commands submitted with urgent=True (the caller is about to block on the
+result) close the batch right away instead of waiting out the interval.
+
+Each command runs inside a SAVEPOINT: a failing command is rolled back on
+its own and its future gets the exception, the rest of the batch commits.
+
+Queued writes are drained on flush(), close() and at interpreter exit
+(atexit, which also runs after an unhandled exception).
+
+The writer thread opens no run_trace spans: its time overlaps the main
+thread's spans and would be subtracted from the run's unattributed time.
+Commit counts and time are logged on close() instead.
+
+Usage:
+    writer = DatabaseWriter('/path/to/db.sqlite')
+    future = writer.submit(lambda conn: conn.execute('INSERT ...', params).lastrowid, urgent=True)
+    row_id = future.result()
+"""
+
+import os
+import time
+import queue
+import atexit
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Group commit window (seconds) and size threshold
+COMMIT_INTERVAL = float(os.getenv('DB_WRITER_COMMIT_INTERVAL', '0.05'))
+MAX_BATCH = int(os.getenv('DB_WRITER_MAX_BATCH', '200'))
+# Pending commands before submit() blocks (back-pressure)
+QUEUE_SIZE = 10000
+# Seconds to wait for the database lock (Laravel writes to the same file)
+BUSY_TIMEOUT = 30
+
+Command = Tuple[Callable[[sqlite3.Connection], Any], Future, bool]
+_FLUSH = object()
+
+
+class DatabaseWriter:
+    """Background thread that executes queued write commands with group commit."""
+
+    def __init__(self, db_path: str, commit_interval: float = COMMIT_INTERVAL, max_batch: int = MAX_BATCH):
+        """
+        Initialize the writer (the thread starts on the first submit).
+
+        Args:
+            db_path: Path to the SQLite database
+            commit_interval: Max seconds between the first command of a batch and its commit
+            max_batch: Commit after this many commands
+        """
+        self.db_path = str(db_path)
+        self.commit_interval = commit_interval
+        self.max_batch = max(1, max_batch)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {'commands': 0, 'failed': 0, 'batches': 0, 'max_batch': 0, 'commit_seconds': 0.0}
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("DatabaseWriter is closed")
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, command: Callable[[sqlite3.Connection], Any], urgent: bool = False) -> Future:
+        """
+        Queue a write command.
+
+        Args:
+            command: Function taking the writer's connection; must not commit
+            urgent: Commit as soon as this command has run (caller waits for it)
+
+        Returns:
+            Future resolving to the command's return value after it is committed
+        """
+        self._ensure_thread()
+        future: Future = Future()
+        self._queue.put((command, future, urgent))
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Commit everything queued so far and wait for it.
+
+        Returns:
+            True if the queue was drained within the timeout
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.empty()
+        done: Future = Future()
+        self._queue.put((_FLUSH, done, True))
+        try:
+            done.result(timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self, timeout: Optional[float] = 30):
+        """Drain pending writes and stop the thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._thread is not None and self._thread.is_alive():
+            if not self.flush(timeout):
+                logger.warning(f"⚠️ DB writer: timed out draining {self._queue.qsize()} queued write(s)")
+            self._queue.put(None)
+            self._thread.join(timeout)
+        if self.stats['commands']:
+            logger.info(
+                f"DB writer: {self.stats['commands']} writes in {self.stats['batches']} commits "
+                f"(largest {self.stats['max_batch']}, {self.stats['failed']} failed, "
+                f"{self.stats['commit_seconds']:.2f}s committing)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.text_factory = str
+        return conn
+
+    def _run(self):
+        conn = None
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                batch, flushes, stop = self._collect(item)
+                if batch:
+                    try:
+                        if conn is None:
+                            conn = self._connect()
+                    except Exception as e:
+                        # Fail this batch instead of leaving callers waiting forever
+                        logger.error(f"❌ DB writer: cannot open {self.db_path}: {e}")
+                        for _, future, _ in batch:
+                            future.set_exception(e)
+                    else:
+                        self._execute_batch(conn, batch)
+                for done in flushes:
+                    done.set_result(True)
+                if stop:
+                    return
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _collect(self, first) -> Tuple[List[Command], List[Future], bool]:
+        """Gather commands until the commit interval ends, the batch is full or an urgent command/flush arrives."""
+        batch: List[Command] = []
+        flushes: List[Future] = []
+        deadline = time.monotonic() + self.commit_interval
+        item = first
+        while True:
+            if item is None:
+                return batch, flushes, True
+            command, future, urgent = item
+            if command is _FLUSH:
+                flushes.append(future)
+                return batch, flushes, False
+            batch.append(item)
+            if urgent or len(batch) >= self.max_batch:
+                return batch, flushes, False
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                return batch, flushes, False
+
+    def _execute_batch(self, conn: sqlite3.Connection, batch: List[Command]):
+        results: List[Tuple[Future, bool, Any]] = []
+        start = time.perf_counter()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for command, future, _ in batch:
+                conn.execute('SAVEPOINT db_writer_command')
+                try:
+                    value = command(conn)
+                    conn.execute('RELEASE db_writer_command')
+                    results.append((future, True, value))
+                except Exception as e:
+                    conn.execute('ROLLBACK TO db_writer_command')
+                    conn.execute('RELEASE db_writer_command')
+                    results.append((future, False, e))
+            conn.execute('COMMIT')
+        except Exception as e:
+            # Commit (or BEGIN) failed: nothing in this batch was written
+            logger.error(f"❌ DB writer: commit of {len(batch)} write(s) failed: {e}")
+            try:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+            except sqlite3.Error:
+                pass
+            results = [(future, False, e) for _, future, _ in batch]
+
+        self.stats['commit_seconds'] += time.perf_counter() - start
+        self.stats['batches'] += 1
+        self.stats['commands'] += len(batch)
+        self.stats['max_batch'] = max(self.stats['max_batch'], len(batch))
+        for future, ok, value in results:
+            if ok:
+                future.set_result(value)
+            else:
+                self.stats['failed'] += 1
+                future.set_exception(value)
+
+
+# Writers per database path (one process-wide writer per file)
+_writers: Dict[str, DatabaseWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(db_path: str) -> DatabaseWriter:
+    """Process-wide writer for a database file (drained at exit)."""
+    key = os.path.abspath(str(db_path))
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = DatabaseWriter(key)
+        return writer
+
+
+def flush_all(timeout: Optional[float] = None) -> bool:
+    """Commit the queued writes of every writer."""
+    return all([writer.flush(timeout) for writer in list(_writers.values())])
+
+
+@atexit.register
+def _close_writers():
+    for writer in list(_writers.values()):
+        writer.close()
@@ -10,9 +10,13 @@ Supported script types:
 """
 import logging
 import os
+import queue
+import atexit
+import hashlib
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, TYPE_CHECKING
+from typing import Dict, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from playwright.sync_api import Page
@@ -26,6 +30,159 @@ _script_type: str = 'unknown'  # Track which script type is running
 # Base debug directory (created only when debug is enabled)
 BASE_DEBUG_DIR = Path('debug_output')
 
+# Shared volume accessible from the web interface (second copy of each screenshot)
+PICTURES_DIR = Path('/pictures')
+
+# Feature: Screenshot capture limits so debug mode stays usable in production.
+# Per-run byte budget for screenshots written to disk (0 = unlimited)
+SCREENSHOT_BUDGET_BYTES = int(float(os.getenv('DEBUG_SCREENSHOT_BUDGET_MB', '200')) * 1024 * 1024)
+# Keep every Nth screenshot per category (errors are never sampled out)
+SCREENSHOT_SAMPLE_EVERY = max(1, int(os.getenv('DEBUG_SCREENSHOT_SAMPLE_EVERY', '1')))
+# Categories that fire in loops get sampled harder regardless of the default
+CATEGORY_SAMPLE_EVERY = {'stuck': 5}
+UNSAMPLED_CATEGORIES = ('errors',)
+# Pending screenshots; when the writer falls this far behind new ones are dropped
+SCREENSHOT_QUEUE_SIZE = 32
+
+
+class ScreenshotWriter:
+    """
+    Background writer for debug screenshots.
+
+    The scraping thread only grabs the PNG bytes from Playwright (which is not
+    thread-safe, so capture has to stay on that thread) and enqueues them.
+    Hashing, de-duplication and both disk writes happen on a daemon thread.
+    """
+
+    def __init__(self, budget_bytes: int = SCREENSHOT_BUDGET_BYTES, queue_size: int = SCREENSHOT_QUEUE_SIZE):
+        self.budget_bytes = budget_bytes
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start a new run: clear budget, sampling counters, dedupe index and stats."""
+        with self._lock:
+            self._seen: Dict[str, Path] = {}
+            self._category_counts: Dict[str, int] = {}
+            self.bytes_accepted = 0
+            self.stats = {'written': 0, 'duplicates': 0, 'sampled_out': 0, 'over_budget': 0, 'dropped': 0, 'failed': 0}
+
+    def should_capture(self, category: str) -> bool:
+        """Sampling decision, made before paying for the capture."""
+        with self._lock:
+            count = self._category_counts.get(category, 0)
+            self._category_counts[category] = count + 1
+            if category in UNSAMPLED_CATEGORIES:
+                return True
+            every = max(SCREENSHOT_SAMPLE_EVERY, CATEGORY_SAMPLE_EVERY.get(category, 1))
+            if count % every:
+                self.stats['sampled_out'] += 1
+                return False
+            if self.budget_bytes and self.bytes_accepted >= self.budget_bytes:
+                self.stats['over_budget'] += 1
+                return False
+            return True
+
+    def submit(self, data: bytes, filepath: Path, pictures_path: Optional[Path], logger: logging.Logger) -> bool:
+        """
+        Hand captured bytes to the writer without blocking.
+
+        Returns:
+            True if queued, False if over budget or the queue is full
+        """
+        with self._lock:
+            if self.budget_bytes and self.bytes_accepted + len(data) > self.budget_bytes:
+                self.stats['over_budget'] += 1
+                return False
+            try:
+                self._queue.put_nowait((data, filepath, pictures_path, logger))
+            except queue.Full:
+                self.stats['dropped'] += 1
+                return False
+            self.bytes_accepted += len(data)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='debug-screenshot-writer', daemon=True)
+                self._thread.start()
+            return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                self._write(*item)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, data: bytes, filepath: Path, pictures_path: Optional[Path], logger: logging.Logger):
+        digest = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            original = self._seen.get(digest)
+            if original is None:
+                self._seen[digest] = filepath
+        if original is not None:
+            # Identical frame (e.g. a stuck scroll): keep the first file only
+            # and give its bytes back to the budget
+            with self._lock:
+                self.stats['duplicates'] += 1
+                self.bytes_accepted -= len(data)
+            logger.debug(f"   📸 Duplicate of {original.name}, not written: {filepath.name}")
+            return
+
+        try:
+            filepath.parent.mkdir(parents=True, exist_ok=True)
+            filepath.write_bytes(data)
+        except Exception as e:
+            with self._lock:
+                self.stats['failed'] += 1
+            logger.error(f"Failed to write debug screenshot {filepath}: {e}")
+            return
+        with self._lock:
+            self.stats['written'] += 1
+
+        if pictures_path is not None:
+            try:
+                pictures_path.parent.mkdir(parents=True, exist_ok=True)
+                pictures_path.write_bytes(data)
+                logger.debug(f"   📋 Also saved to: {pictures_path}")
+            except Exception as copy_err:
+                logger.warning(f"Failed to copy screenshot to pictures folder: {copy_err}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued screenshot is written.
+
+        Returns:
+            True if the queue drained (False on timeout)
+        """
+        if timeout is None:
+            self._queue.join()
+            return True
+        done = threading.Event()
+        waiter = threading.Thread(target=lambda: (self._queue.join(), done.set()), daemon=True)
+        waiter.start()
+        return done.wait(timeout)
+
+
+_screenshot_writer: Optional[ScreenshotWriter] = None
+
+
+def get_screenshot_writer() -> ScreenshotWriter:
+    """Get global screenshot writer instance."""
+    global _screenshot_writer
+    if _screenshot_writer is None:
+        _screenshot_writer = ScreenshotWriter()
+        atexit.register(_screenshot_writer.flush, 30)
+    return _screenshot_writer
+
+
+def flush_debug_screenshots(timeout: Optional[float] = None) -> bool:
+    """Wait for pending debug screenshots to reach disk (no-op if none were taken)."""
+    if _screenshot_writer is None:
+        return True
+    return _screenshot_writer.flush(timeout)
+
 
 class NoOpDebugSession:
     """No-op debug session when debug output is disabled."""
@@ -127,6 +284,10 @@ class DebugSession:
         global _current_run_dir, _run_logger
         _current_run_dir = self.run_dir
         _run_logger = self.logger
+
+        # New run: fresh screenshot budget, sampling counters and dedupe index
+        flush_debug_screenshots(timeout=30)
+        get_screenshot_writer().reset()
         
         self.logger.info("="*70)
         self.logger.info(f"🚀 DEBUG SESSION STARTED: {run_name}")
@@ -168,7 +329,16 @@ class DebugSession:
         return self.categories.get(category, self.categories['other'])
     
     def close(self):
-        """Close the debug session."""
+        """Close the debug session (waits for pending screenshots first)."""
+        if _screenshot_writer is not None:
+            if not _screenshot_writer.flush(timeout=60):
+                self.logger.warning("⚠️ Timed out waiting for debug screenshots to be written")
+            stats = _screenshot_writer.stats
+            self.logger.info(
+                f"📸 Screenshots: {stats['written']} written, {stats['duplicates']} duplicates, "
+                f"{stats['sampled_out']} sampled out, {stats['over_budget']} over budget, "
+                f"{stats['dropped']} dropped ({_screenshot_writer.bytes_accepted / (1024 * 1024):.1f} MB)"
+            )
         self.logger.info("="*70)
         self.logger.info("✅ DEBUG SESSION COMPLETED")
         self.logger.info("="*70)
@@ -187,6 +357,11 @@ def take_debug_screenshot(page: "Page", step_name: str, category: str = "other",
     2. pictures/ folder (accessible from web interface for debugging)
     - If DEBUG_OUTPUT_ENABLED=false, this function returns immediately without taking a screenshot
     
+    Feature: Only the capture happens on the calling thread. The PNG bytes are
+    handed to a background writer that de-duplicates identical frames and
+    writes both copies, so debug mode no longer blocks scraping on disk I/O.
+    Captures are sampled per category and limited by a per-run byte budget.
+    
     Args:
         page: Playwright Page instance
         step_name: Name of the step (e.g., "login_attempt", "after_navigation")
@@ -194,7 +369,8 @@ def take_debug_screenshot(page: "Page", step_name: str, category: str = "other",
         description: Additional description for logging
         
     Returns:
-        Path to saved screenshot (empty string if debug is disabled)
+        Path the screenshot is being written to (empty string if debug is
+        disabled or the screenshot was skipped)
     """
     # Skip screenshot if debug output is disabled
     if not _debug_enabled:
@@ -209,7 +385,6 @@ def take_debug_screenshot(page: "Page", step_name: str, category: str = "other",
         else:
             # Fallback for backward compatibility (no active session)
             base_dir = BASE_DEBUG_DIR / "legacy"
-            base_dir.mkdir(parents=True, exist_ok=True)
             logger = logging.getLogger(__name__)
         
         # Sanitize category to remove invalid characters
@@ -218,9 +393,10 @@ def take_debug_screenshot(page: "Page", step_name: str, category: str = "other",
         if not safe_category:
             safe_category = "other"
         
-        # Determine category directory WITHIN the run folder
-        category_dir = base_dir / safe_category  # ← Category subfolder in run folder
-        category_dir.mkdir(parents=True, exist_ok=True)
+        writer = get_screenshot_writer()
+        if not writer.should_capture(safe_category):
+            logger.debug(f"📸 Screenshot skipped (sampling/budget) [{category.upper()}]: {step_name}")
+            return ""
         
         # Sanitize step_name for filename
         safe_step_name = "".join(c if c.isalnum() or c in ('_', '-') else '_' for c in step_name)
@@ -229,35 +405,23 @@ def take_debug_screenshot(page: "Page", step_name: str, category: str = "other",
         # Create filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
         filename = f"{timestamp}_{safe_step_name}.png"
-        filepath = category_dir / filename  # ← Final path: run_folder/category/screenshot.png
+        filepath = base_dir / safe_category / filename  # ← Final path: run_folder/category/screenshot.png
         
-        # Take screenshot (viewport only to prevent crashes on heavy pages)
-        # Using full_page=False is much more stable on VPS with limited resources
-        page.screenshot(path=str(filepath), full_page=False)
+        # Use simpler naming for pictures folder: category_timestamp_step.png
+        pictures_path = PICTURES_DIR / f"{safe_category}_{timestamp}_{safe_step_name}.png"
         
-        # ALSO save a copy to pictures/ folder for easy web access
-        try:
-            pictures_dir = Path('/pictures')  # Shared volume accessible from web
-            pictures_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Use simpler naming for pictures folder: category_timestamp_step.png
-            pictures_filename = f"{safe_category}_{timestamp}_{safe_step_name}.png"
-            pictures_path = pictures_dir / pictures_filename
-            
-            # Copy screenshot to pictures folder
-            import shutil
-            shutil.copy2(str(filepath), str(pictures_path))
-            logger.info(f"   📋 Also saved to: {pictures_path}")
-        except Exception as copy_err:
-            logger.warning(f"Failed to copy screenshot to pictures folder: {copy_err}")
+        # Take screenshot into memory (viewport only to prevent crashes on heavy pages)
+        # Using full_page=False is much more stable on VPS with limited resources
+        data = page.screenshot(full_page=False)
         
-        # Get current URL for context
-        current_url = page.url
+        if not writer.submit(data, filepath, pictures_path, logger):
+            logger.debug(f"📸 Screenshot not queued (budget reached or writer busy): {step_name}")
+            return ""
         
         log_msg = f"📸 SCREENSHOT [{category.upper()}]: {step_name}"
         if description:
             log_msg += f" - {description}"
-        log_msg += f"\n   URL: {current_url}\n   Saved: {filepath}"
+        log_msg += f"\n   URL: {page.url}\n   Saved: {filepath}"
         
         logger.info(log_msg)
         return str(filepath)
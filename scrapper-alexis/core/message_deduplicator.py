@@ -5,11 +5,14 @@ Handles message comparison, hashing, and duplicate detection
 to prevent re-scraping existing content.
 """
 
+import re
 import hashlib
 import logging
-from typing import List, Set, Dict, Optional
+from collections import Counter
+from typing import List, Set, Dict, Optional, NamedTuple
 from difflib import SequenceMatcher
 from .database import get_database, DatabaseManager
+from utils.run_trace import traced
 
 logger = logging.getLogger(__name__)
 
@@ -80,6 +83,7 @@ class MessageDeduplicator:
         normalized = MessageDeduplicator.normalize_message_text(text)
         return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
     
+    @traced('dedup.is_duplicate')
     def is_duplicate(self, message_text: str, profile_id: Optional[int] = None) -> bool:
         """
         Check if a message is a duplicate of existing content.
@@ -300,6 +304,48 @@ class MessageDeduplicator:
         logger.debug("Hash preloading completed")
 
 
+# Quality filter reason codes (QualityVerdict.reason)
+QUALITY_OK = 'ok'
+QUALITY_EMPTY = 'empty'
+QUALITY_NOT_TEXT = 'not_text'
+QUALITY_TOO_SHORT = 'too_short'
+QUALITY_TOO_LONG = 'too_long'
+QUALITY_UI_ELEMENT = 'ui_element'
+QUALITY_TOO_FEW_WORDS = 'too_few_words'
+QUALITY_SPECIAL_CHARS = 'special_chars'
+
+QUALITY_UI_ELEMENTS = (
+    'compartir', 'comentar', 'me gusta', 'reaccionar',
+    'share', 'comment', 'like', 'react', 'loading',
+    'ver más', 'see more', 'mostrar más'
+)
+_UI_ELEMENT_RE = re.compile('|'.join(re.escape(element) for element in QUALITY_UI_ELEMENTS))
+
+
+class _SpecialCharTable(dict):
+    """
+    str.translate table that deletes alphanumeric and whitespace characters.
+    
+    Filled lazily per code point, so after warm-up translate() runs entirely
+    in C and len(text.translate(table)) is the special character count.
+    """
+    
+    def __missing__(self, code_point: int):
+        char = chr(code_point)
+        value = None if char.isalnum() or char.isspace() else code_point
+        self[code_point] = value
+        return value
+
+
+_SPECIAL_CHAR_TABLE = _SpecialCharTable()
+
+
+class QualityVerdict(NamedTuple):
+    """Quality filter result for one message."""
+    valid: bool
+    reason: str
+
+
 class MessageQualityFilter:
     """Additional filtering for message quality and relevance."""
     
@@ -328,14 +374,8 @@ class MessageQualityFilter:
             return False
         
         # Skip obvious UI elements
-        ui_elements = [
-            'compartir', 'comentar', 'me gusta', 'reaccionar',
-            'share', 'comment', 'like', 'react', 'loading',
-            'ver más', 'see more', 'mostrar más'
-        ]
-        
         text_lower = text.lower()
-        if any(element in text_lower and len(text) < 50 for element in ui_elements):
+        if any(element in text_lower and len(text) < 50 for element in QUALITY_UI_ELEMENTS):
             return False
         
         # Check word count - must have more than 4 words
@@ -350,6 +390,51 @@ class MessageQualityFilter:
         
         return True
     
+    @staticmethod
+    def evaluate_batch(messages: List[str]) -> List[QualityVerdict]:
+        """
+        Evaluate many messages at once, with the reason for each verdict.
+        
+        Same criteria and results as is_valid_message, but the per-character
+        work runs in C: UI elements are matched with one precompiled regex,
+        special characters are counted with str.translate and only the first
+        five words are split off.
+        
+        Args:
+            messages: List of message texts
+            
+        Returns:
+            One QualityVerdict (valid, reason code) per message, in order
+        """
+        ui_search = _UI_ELEMENT_RE.search
+        table = _SPECIAL_CHAR_TABLE
+        verdicts = []
+        
+        for text in messages:
+            if not text:
+                verdicts.append(QualityVerdict(False, QUALITY_EMPTY))
+                continue
+            if not isinstance(text, str):
+                verdicts.append(QualityVerdict(False, QUALITY_NOT_TEXT))
+                continue
+            
+            text = text.strip()
+            length = len(text)
+            if length < 5:
+                verdicts.append(QualityVerdict(False, QUALITY_TOO_SHORT))
+            elif length > 2000:
+                verdicts.append(QualityVerdict(False, QUALITY_TOO_LONG))
+            elif length < 50 and ui_search(text.lower()):
+                verdicts.append(QualityVerdict(False, QUALITY_UI_ELEMENT))
+            elif len(text.split(None, 4)) <= 4:
+                verdicts.append(QualityVerdict(False, QUALITY_TOO_FEW_WORDS))
+            elif len(text.translate(table)) > length * 0.3:
+                verdicts.append(QualityVerdict(False, QUALITY_SPECIAL_CHARS))
+            else:
+                verdicts.append(QualityVerdict(True, QUALITY_OK))
+        
+        return verdicts
+    
     @staticmethod
     def filter_quality_messages(messages: List[str]) -> List[str]:
         """
@@ -361,13 +446,12 @@ class MessageQualityFilter:
         Returns:
             List of quality messages
         """
-        quality_messages = []
-        
-        for message in messages:
-            if MessageQualityFilter.is_valid_message(message):
-                quality_messages.append(message)
+        verdicts = MessageQualityFilter.evaluate_batch(messages)
+        quality_messages = [message for message, verdict in zip(messages, verdicts) if verdict.valid]
         
-        logger.info(f"Quality filter: {len(quality_messages)}/{len(messages)} messages passed")
+        rejected = Counter(verdict.reason for verdict in verdicts if not verdict.valid)
+        details = f" ({', '.join(f'{reason}: {count}' for reason, count in rejected.most_common())})" if rejected else ""
+        logger.info(f"Quality filter: {len(quality_messages)}/{len(messages)} messages passed{details}")
         return quality_messages
 
 
@@ -0,0 +1,131 @@
+"""
+Versioned schema migrations for the scraper database.
+
+The applied version is stored in PRAGMA user_version (an integer in the
+database header), so the startup check on an up-to-date database is a
+single integer read. Pending migrations run in one transaction together
+with the version bump: either all of them are applied or none.
+
+The Laravel migrations alter the same tables, so migrations must tolerate
+objects that already exist: add_columns() only adds the columns missing
+from PRAGMA table_info and reports the rest as already present.
+
+To change the schema, append a Migration with the next version number.
+Never edit or reorder migrations that have shipped.
+"""
+
+import sqlite3
+import logging
+from typing import Callable, List, NamedTuple, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Migration(NamedTuple):
+    """One schema step; apply() runs inside the migration transaction."""
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def add_columns(conn: sqlite3.Connection, table: str, columns: Sequence[Tuple[str, str]]) -> List[str]:
+    """
+    Add the columns a table does not have yet.
+
+    Args:
+        conn: Connection inside the migration transaction
+        table: Table name
+        columns: (column name, declaration) pairs, e.g. ('avatar_url', 'TEXT')
+
+    Returns:
+        Names of the columns that were added
+    """
+    existing = {row[1] for row in conn.execute(f'PRAGMA table_info({table})').fetchall()}
+    added = []
+    for name, declaration in columns:
+        if name in existing:
+            continue
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {declaration}')
+        added.append(name)
+
+    present = [name for name, _ in columns if name not in added]
+    if present:
+        logger.debug(f"{table}: columns already present (e.g. from Laravel): {', '.join(present)}")
+    if added:
+        logger.info(f"{table}: added columns {', '.join(added)}")
+    return added
+
+
+def _message_columns(conn: sqlite3.Connection):
+    # Columns added to messages over time (formerly DatabaseManager._migrate_database).
+    # Several also come from the Laravel migrations, whichever runs first.
+    add_columns(conn, 'messages', [
+        ('avatar_url', 'TEXT'),
+        ('image_generated', 'BOOLEAN DEFAULT 0'),
+        ('image_path', 'TEXT'),
+        ('auto_post_enabled', 'BOOLEAN DEFAULT 1'),
+        ('approval_type', 'TEXT'),
+        ('approved_for_posting', 'BOOLEAN'),
+        ('approved_at', 'TIMESTAMP'),
+        ('posted_to_page', 'BOOLEAN DEFAULT 0'),
+        ('posted_to_page_at', 'TIMESTAMP'),
+        ('downloaded', 'BOOLEAN DEFAULT 0'),
+        ('downloaded_at', 'TIMESTAMP'),
+        # Encoded image variants produced by utils/image_encoder.py
+        ('encoded_image_path', 'TEXT'),
+        ('thumbnail_path', 'TEXT'),
+        # Persisted quality filter verdicts (see stream_quality_messages)
+        ('quality_checked', 'BOOLEAN'),
+    ])
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'messages columns for images, approval, page posting, downloads and quality', _message_columns),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Applied migration version (PRAGMA user_version, 0 for a new database)."""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def pending_migrations(version: int) -> List[Migration]:
+    """Migrations newer than the given version, in order."""
+    return [migration for migration in MIGRATIONS if migration.version > version]
+
+
+def run_migrations(conn: sqlite3.Connection) -> List[Migration]:
+    """
+    Apply pending migrations in one transaction.
+
+    The version is read again after taking the write lock, so concurrent
+    startups apply each migration once.
+
+    Args:
+        conn: Database connection (must not be inside a transaction)
+
+    Returns:
+        The migrations that were applied (empty when up to date)
+    """
+    if get_schema_version(conn) >= LATEST_VERSION:
+        return []
+
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        version = get_schema_version(conn)
+        pending = pending_migrations(version)
+        for migration in pending:
+            logger.info(f"Applying schema migration {migration.version}: {migration.description}")
+            migration.apply(conn)
+        if pending:
+            conn.execute(f'PRAGMA user_version = {pending[-1].version}')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if pending:
+        logger.info(f"✅ Schema migrated from version {version} to {pending[-1].version}")
+    return pending
@@ -124,57 +124,21 @@ class ProfileManager:
             'twitter': parsed_data.get('twitter_credentials', {})
         }
         
-        # Get URLs from .env
-        env_urls = set(parsed_data['facebook_groups'])
-        
-        # Get all existing profiles from database (active or not)
-        with self.db.get_connection() as conn:
-            cursor = conn.execute('SELECT id, url, is_active FROM profiles')
-            all_db_profiles = [dict(row) for row in cursor.fetchall()]
-        
-        # Deactivate profiles not in .env
-        for db_profile in all_db_profiles:
-            if db_profile['url'] not in env_urls and db_profile['is_active']:
-                logger.info(f"Deactivating profile no longer in .env: {db_profile['url']}")
-                self.db.deactivate_profile(db_profile['id'])
-        
-        # Activate or create profiles from .env
-        profiles = []
-        for url in env_urls:
-            profile_id = self.extract_profile_id_from_url(url)
-            
-            # Check if profile already exists
-            existing_profile = next((p for p in all_db_profiles if p['url'] == url), None)
-            
-            if existing_profile:
-                # Profile exists, activate it if needed
-                db_profile_id = existing_profile['id']
-                if not existing_profile['is_active']:
-                    logger.info(f"Reactivating profile: {url}")
-                    with self.db.get_connection() as conn:
-                        conn.execute('UPDATE profiles SET is_active = 1 WHERE id = ?', (db_profile_id,))
-                        conn.commit()
-            else:
-                # Profile doesn't exist, create it
-                try:
-                    db_profile_id = self.db.add_profile(
-                        username=profile_id,
-                        url=url,
-                        credentials_reference='env'
-                    )
-                    logger.info(f"Created new profile: {url}")
-                except Exception as e:
-                    logger.error(f"Error adding profile {profile_id}: {e}")
-                    continue
-            
-            profiles.append({
-                'id': db_profile_id,
-                'username': profile_id,
-                'url': url
-            })
-        
+        # URL -> username, de-duplicated in configured order
+        env_profiles = {
+            url: self.extract_profile_id_from_url(url)
+            for url in parsed_data['facebook_groups']
+        }
+
+        # Upsert configured profiles and deactivate the rest in one transaction
+        try:
+            profiles = self.db.sync_profiles(env_profiles, credentials_reference='env')
+        except Exception as e:
+            logger.error(f"Error syncing profiles to database: {e}")
+            return []
+
         self.profiles = profiles
-        logger.info(f"Synced {len(profiles)} profiles to database ({len(env_urls)} active)")
+        logger.info(f"Synced {len(profiles)} profiles to database ({len(env_profiles)} active)")
         return profiles
     
     def get_active_profiles(self, limit: Optional[int] = None) -> List[Dict]:
@@ -0,0 +1,172 @@
+"""
+Cached settings provider for scraper_settings and posting_settings.
+
+The web UI is the single source of truth for settings, so long-running
+processes must pick up changes without a restart. Instead of opening a new
+connection and re-reading the tables on every call, the provider keeps one
+read connection and checks PRAGMA data_version, which only changes when
+another connection commits to the database. Rows are re-read only then.
+
+updated_at is second-resolution (Eloquent timestamps), so two saves in the
+same second would look identical; the settings rows are tiny, so after a
+data_version change the rows themselves are compared instead.
+
+Decrypted values (Laravel encrypt()) are memoized by ciphertext, so each
+password is decrypted once per process no matter how often it is read.
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_TABLES = ('scraper_settings', 'posting_settings')
+
+
+class SettingsProvider:
+    """Loads the settings tables once and refreshes them when the database changes."""
+
+    def __init__(self, db_path: str = None):
+        """
+        Initialize settings provider.
+
+        Args:
+            db_path: Path to the Laravel SQLite database (defaults to config.DATABASE_PATH)
+        """
+        self._db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._data_version: Optional[int] = None
+        self._rows: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._decrypted: Dict[str, str] = {}
+        self.reloads = 0
+
+    @property
+    def db_path(self) -> str:
+        if self._db_path is None:
+            import config
+            self._db_path = config.DATABASE_PATH
+        return self._db_path
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if not self.db_path or not os.path.exists(self.db_path):
+                raise FileNotFoundError(
+                    f"Laravel database not found at: {self.db_path}. "
+                    f"Please ensure the application is installed correctly and database exists."
+                )
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+        return self._conn
+
+    def _load_row(self, conn: sqlite3.Connection, table: str) -> Optional[Dict[str, Any]]:
+        try:
+            row = conn.execute(f"SELECT * FROM {table} LIMIT 1").fetchone()
+        except sqlite3.OperationalError as e:
+            # posting_settings only exists once the Laravel migrations ran
+            logger.debug(f"Could not read {table}: {e}")
+            return None
+        return dict(row) if row else None
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Re-read the settings tables if another connection committed since the last read.
+
+        Args:
+            force: Re-read even if the database did not change
+
+        Returns:
+            True if any settings row changed
+        """
+        with self._lock:
+            conn = self._connection()
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if not force and data_version == self._data_version and self._rows:
+                return False
+
+            changed = False
+            for table in SETTINGS_TABLES:
+                row = self._load_row(conn, table)
+                if row != self._rows.get(table):
+                    changed = True
+                self._rows[table] = row
+
+            self._data_version = data_version
+            if changed:
+                self.reloads += 1
+                logger.debug(f"Settings reloaded (data_version {data_version})")
+            return changed
+
+    def get_table(self, table: str) -> Optional[Dict[str, Any]]:
+        """Current settings row of a table (None if the table/row does not exist)."""
+        with self._lock:
+            self.refresh()
+            row = self._rows.get(table)
+            return dict(row) if row else None
+
+    def get_scraper_settings(self) -> Dict[str, Any]:
+        """
+        Current scraper_settings row.
+
+        Raises:
+            ValueError: If no settings were configured in the web interface
+        """
+        row = self.get_table('scraper_settings')
+        if not row:
+            raise ValueError(
+                "No settings found in database. "
+                "Please configure settings via web interface Settings page."
+            )
+        return row
+
+    def get_posting_settings(self) -> Optional[Dict[str, Any]]:
+        """Current posting_settings row (None if not configured)."""
+        return self.get_table('posting_settings')
+
+    def get(self, key: str, default: Any = None, table: str = 'scraper_settings') -> Any:
+        """Single setting value (default when missing or NULL)."""
+        row = self.get_table(table) or {}
+        value = row.get(key)
+        return default if value is None else value
+
+    def decrypt(self, value: Optional[str]) -> str:
+        """Decrypt a Laravel-encrypted value once per ciphertext; plain values pass through."""
+        if not value:
+            return ''
+        with self._lock:
+            if value not in self._decrypted:
+                try:
+                    from utils.laravel_decrypt import decrypt_laravel_value, is_encrypted
+                except ImportError:
+                    logger.warning("Laravel decrypt utility not available - encrypted values will not work")
+                    self._decrypted[value] = value
+                else:
+                    self._decrypted[value] = decrypt_laravel_value(value) if is_encrypted(value) else value
+            return self._decrypted[value]
+
+    def get_decrypted(self, key: str, table: str = 'scraper_settings') -> str:
+        """Setting value decrypted if it is Laravel-encrypted (memoized)."""
+        return self.decrypt(self.get(key, table=table))
+
+    def close(self):
+        """Close the read connection (reopened on next access)."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._data_version = None
+
+
+# Global settings provider instance
+_settings_provider = None
+
+
+def get_settings_provider() -> SettingsProvider:
+    """Get global settings provider instance."""
+    global _settings_provider
+    if _settings_provider is None:
+        _settings_provider = SettingsProvider()
+    return _settings_provider
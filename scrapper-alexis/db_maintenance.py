@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Database maintenance commands for the scraper database.
+
+Usage:
+    python3 db_maintenance.py check-plans       # Verify queue queries use their indexes
+    python3 db_maintenance.py check-plans --allow-skip  # Do not fail on queries that could not be checked
+    python3 db_maintenance.py check-counters    # Verify message_counters, rebuild on mismatch
+    python3 db_maintenance.py archive --days 90 # Move cold messages to messages_archive
+    python3 db_maintenance.py fts-backfill      # Index existing messages for full-text search
+    python3 db_maintenance.py search "texto"    # Full-text search over scraped messages
+    python3 db_maintenance.py migrate           # Show the schema version and apply pending migrations
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.migrations import LATEST_VERSION, get_schema_version
+from core.database import get_database, DEFAULT_ARCHIVE_AFTER_DAYS, ARCHIVE_SCAN_ROWS, FTS_BACKFILL_CHUNK
+
+
+def check_plans(args) -> int:
+    """Fail if any hot queue query does a full scan of messages."""
+    db = get_database(args.db)
+    plans = db.explain_queue_queries()
+    problems = db.check_queue_query_plans(plans)
+
+    for name, plan in plans.items():
+        if name in problems:
+            status = "FAIL"
+        elif plan and plan[0].startswith('SKIP'):
+            status = "SKIP"
+        else:
+            status = "OK"
+        print(f"[{status}] {name}")
+        for detail in plan:
+            print(f"       {detail}")
+
+    if problems:
+        print(f"\n{len(problems)} queue query plan(s) need attention: {', '.join(problems)}")
+        return 1
+
+    # A skipped query was not checked at all, so it only passes when explicitly allowed
+    skipped = [name for name, plan in plans.items() if plan and plan[0].startswith('SKIP')]
+    if skipped:
+        print(f"\n{len(skipped)} queue query plan(s) could not be checked: {', '.join(skipped)}")
+        if not args.allow_skip:
+            print("Pass --allow-skip to accept unchecked queries")
+            return 1
+        print("All checked queue queries are index-backed (--allow-skip)")
+        return 0
+
+    print("\nAll queue queries are index-backed")
+    return 0
+
+
+def check_counters(args) -> int:
+    """Compare message_counters with the messages table and rebuild it on mismatch."""
+    db = get_database(args.db)
+    mismatches = db.check_message_counters()
+
+    if not mismatches and not args.force:
+        print("message_counters is consistent")
+        return 0
+
+    for profile_key, diff in sorted(mismatches.items()):
+        scope = 'global' if profile_key == 0 else f"profile {profile_key}"
+        details = ', '.join(f"{name} {stored} != {actual}" for name, (stored, actual) in diff.items())
+        print(f"[MISMATCH] {scope}: {details}")
+
+    db.rebuild_message_counters()
+    remaining = db.check_message_counters()
+    print(f"message_counters rebuilt ({len(remaining)} mismatch(es) after rebuild)")
+    return 1 if mismatches or remaining else 0
+
+
+def archive(args) -> int:
+    """Move rejected/posted messages older than --days to messages_archive."""
+    db = get_database(args.db)
+    stats = db.archive_messages(older_than_days=args.days, scan_rows=args.scan_rows, pause=args.pause,
+                                max_rows=args.max_rows, dry_run=args.dry_run)
+
+    if args.dry_run:
+        print(f"{stats['candidates']} message(s) with no activity since {stats['cutoff']} would be archived")
+        return 0
+
+    archive_stats = db.get_archive_stats()
+    print(f"Archived {stats['archived']} message(s) older than {stats['cutoff']} "
+          f"in {stats['windows']} batch(es), {stats['seconds']}s")
+    print(f"Archive: {archive_stats['archived_messages']} message(s), {archive_stats['archived_hashes']} hash(es)")
+    return 0
+
+
+def fts_backfill(args) -> int:
+    """Index messages that predate the full-text index (resumable)."""
+    db = get_database(args.db)
+    status = db.get_fts_status()
+    if not status['available']:
+        print("Full-text index not available (SQLite built without FTS5?)")
+        return 1
+
+    print(f"{status['pending_ids']} message id(s) waiting for backfill")
+    indexed = db.backfill_message_fts(chunk_size=args.chunk_size, pause=args.pause, max_chunks=args.max_chunks)
+    status = db.get_fts_status()
+    print(f"Indexed {indexed} message(s); {status['pending_ids']} id(s) still pending")
+    return 0
+
+
+def search(args) -> int:
+    """Full-text search over message_text."""
+    db = get_database(args.db)
+    status = db.get_fts_status()
+    if not status['available']:
+        print("Full-text index not available (SQLite built without FTS5?)")
+        return 1
+    if status['pending_ids']:
+        print(f"Note: {status['pending_ids']} older message id(s) not indexed yet (run fts-backfill)\n")
+
+    results = db.search_messages(args.query, limit=args.limit, prefix=args.prefix, raw=args.raw)
+    for result in results:
+        print(f"#{result['id']} @{result['profile_username']} {result['scraped_at']} (rank {result['rank']:.2f})")
+        print(f"    {result['snippet']}")
+    print(f"\n{len(results)} result(s)")
+    return 0
+
+
+def migrate(args) -> int:
+    """Report the schema version (get_database() applies pending migrations)."""
+    db = get_database(args.db)
+    with db.get_connection() as conn:
+        version = get_schema_version(conn)
+    status = "up to date" if version >= LATEST_VERSION else "PENDING - see the log for the migration error"
+    print(f"Schema version {version} (latest {LATEST_VERSION}): {status}")
+    return 0 if version >= LATEST_VERSION else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Scraper database maintenance')
+    parser.add_argument('--db', default=None, help='Database path (default: config.DATABASE_PATH)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    plans_parser = subparsers.add_parser('check-plans', help='EXPLAIN QUERY PLAN regression check for queue queries')
+    plans_parser.add_argument('--allow-skip', action='store_true',
+                              help='Exit 0 even if some queue queries could not be checked')
+    counters_parser = subparsers.add_parser('check-counters', help='Consistency check (and rebuild) of message_counters')
+    counters_parser.add_argument('--force', action='store_true', help='Rebuild even when consistent')
+    archive_parser = subparsers.add_parser('archive', help='Move cold messages to messages_archive')
+    archive_parser.add_argument('--days', type=int, default=DEFAULT_ARCHIVE_AFTER_DAYS,
+                                help=f"Archive messages with no activity for this many days (default {DEFAULT_ARCHIVE_AFTER_DAYS})")
+    archive_parser.add_argument('--scan-rows', type=int, default=ARCHIVE_SCAN_ROWS,
+                                help=f"Id range per transaction (default {ARCHIVE_SCAN_ROWS})")
+    archive_parser.add_argument('--pause', type=float, default=0.05, help='Seconds between batches (default 0.05)')
+    archive_parser.add_argument('--max-rows', type=int, default=None, help='Stop after about this many rows')
+    archive_parser.add_argument('--dry-run', action='store_true', help='Only count the candidates')
+    backfill_parser = subparsers.add_parser('fts-backfill', help='Index existing messages for full-text search')
+    backfill_parser.add_argument('--chunk-size', type=int, default=FTS_BACKFILL_CHUNK,
+                                 help=f"Message ids per transaction (default {FTS_BACKFILL_CHUNK})")
+    backfill_parser.add_argument('--pause', type=float, default=0.05, help='Seconds between chunks (default 0.05)')
+    backfill_parser.add_argument('--max-chunks', type=int, default=None, help='Stop after this many chunks')
+    subparsers.add_parser('migrate', help='Apply pending schema migrations and show the version')
+    search_parser = subparsers.add_parser('search', help='Full-text search over scraped messages')
+    search_parser.add_argument('query', help='Words to search for')
+    search_parser.add_argument('--limit', type=int, default=20)
+    search_parser.add_argument('--prefix', action='store_true', help='Match words as prefixes')
+    search_parser.add_argument('--raw', action='store_true', help='Query is FTS5 syntax')
+
+    args = parser.parse_args()
+    commands = {
+        'check-plans': check_plans,
+        'check-counters': check_counters,
+        'archive': archive,
+        'fts-backfill': fts_backfill,
+        'search': search,
+        'migrate': migrate,
+    }
+    return commands[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
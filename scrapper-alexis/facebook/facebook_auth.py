@@ -16,6 +16,7 @@ import config
 from core.exceptions import LoginError
 from utils.selector_strategies import EMAIL_SELECTORS, PASSWORD_SELECTORS, try_selectors
 from core.debug_helper import take_debug_screenshot, log_page_state, log_debug_info
+from utils.run_trace import traced
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +65,7 @@ def check_auth_state() -> bool:
     return exists
 
 
+@traced('auth.verify_login')
 def verify_logged_in(page: Page) -> bool:
     """
     Verify if user is actually logged into Facebook by checking for redirect.
@@ -198,6 +200,7 @@ def verify_logged_in(page: Page) -> bool:
         return False
 
 
+@traced('auth.manual_intervention')
 def wait_for_manual_intervention(
     page: Page, 
     message: str = "Manual intervention required", 
@@ -226,6 +229,7 @@ def wait_for_manual_intervention(
     return True
 
 
+@traced('auth.login_with_retry')
 def login_facebook_with_retry(page: Page, max_retries: int = 3, wait_time: int = 50) -> bool:
     """
     Perform Facebook login with retry logic and verification.
@@ -399,6 +403,7 @@ def login_facebook_with_retry(page: Page, max_retries: int = 3, wait_time: int =
     raise LoginError(f"Login failed after {max_retries} attempts with {wait_time}s waits")
 
 
+@traced('auth.login')
 def login_facebook(page: Page) -> bool:
     """
     Perform Facebook login with fallback selectors and human-like behavior.
@@ -803,6 +808,7 @@ def login_facebook(page: Page) -> bool:
         raise LoginError(f"Login error: {e}")
 
 
+@traced('auth.save_state')
 def save_auth_state(context: BrowserContext, page: Page) -> None:
     """
     Save Facebook authentication state with IndexedDB and session storage.
@@ -16,6 +16,8 @@ from utils.selector_strategies import MESSAGE_SELECTORS, try_selectors
 from core.debug_helper import take_debug_screenshot, log_page_state, log_debug_info
 from core.database import get_database
 from core.message_deduplicator import get_message_deduplicator, MessageQualityFilter
+from utils.run_trace import span, traced
+from utils import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -108,6 +110,7 @@ def _validate_page_after_navigation(page: Page, original_url: str, final_url: st
         return False  # Fail safe
 
 
+@traced('extract.navigate')
 def navigate_to_message(page: Page, url: str, max_retries: int = 3) -> bool:
     """
     Navigate to Facebook message URL with retry logic.
@@ -501,6 +504,7 @@ def _smart_scroll_and_extract(page: Page, selector: str, target_messages: int, m
     return list(extracted_messages)
 
 
+@traced('extract.close_popup')
 def check_and_close_login_popup(page: Page) -> bool:
     """
     Check if Facebook is showing a login popup and try to close it.
@@ -577,6 +581,7 @@ def check_and_close_login_popup(page: Page) -> bool:
         return False
 
 
+@traced('extract.profile')
 def extract_message_text_with_database(page: Page, profile_id: int, max_messages: int = 10, 
                                      max_retries: int = 3) -> Tuple[list, dict]:
     """
@@ -812,157 +817,164 @@ def _smart_scroll_and_extract_with_db(page: Page, selector: str, profile_id: int
     }
     
     while scroll_count < max_scrolls and len(extracted_messages) < target_messages:
-        try:
-            # Check if page is still alive
-            if page.is_closed():
-                logger.error("Page was closed unexpectedly")
-                break
-            
-            # BUGFIX: Add diagnostic logging and try multiple selectors
-            # Facebook's DOM structure varies by page type (profile, group, post)
-            logger.debug(f"Extracting text via JavaScript with smart selector detection...")
-            
-            messages_on_page = page.evaluate('''
-                () => {
-                    // BUGFIX V4: Target ONLY actual post content, NOT comments
-                    // POST: <div class="xdj266r x14z9mp xat24cr x1lziwak x1vvkbs">
-                    // COMMENT: <div class="xwib8y2 ..."> (must ignore)
-                    // Key: Posts have x1vvkbs class, comments don't!
-                    const selectors = [
-                        'div.xdj266r.x1vvkbs',                       // PRIMARY: Posts have x1vvkbs class
-                        'div.xdj266r.x14z9mp.xat24cr.x1lziwak.x1vvkbs',  // Full post content selector
-                        'div[data-ad-comet-preview="message"]',      // Fallback
-                    ];
-                    
-                    let bestSelector = null;
-                    let maxElements = 0;
-                    
-                    // Find which selector returns the most elements
-                    for (const selector of selectors) {
-                        const count = document.querySelectorAll(selector).length;
-                        console.log('[SCRAPER DEBUG] Selector "' + selector + '" found ' + count + ' elements');
-                        if (count > maxElements) {
-                            maxElements = count;
-                            bestSelector = selector;
-                        }
-                    }
-                    
-                    console.log('[SCRAPER DEBUG] Best selector: "' + bestSelector + '" with ' + maxElements + ' elements');
-                    
-                    if (!bestSelector || maxElements === 0) {
-                        console.log('[SCRAPER ERROR] No valid selector found! Page may not have loaded or DOM structure changed.');
-                        console.log('[SCRAPER ERROR] Forcing div[role="article"] div.xdj266r...');
-                        bestSelector = 'div[role="article"] div.xdj266r';  // Force article context
-                    }
-                    
-                    const elements = document.querySelectorAll(bestSelector);
-                    const texts = [];
-                    const seen = new Set();  // Deduplicate within same extraction
-                    
-                    // BUGFIX V2: Enhanced filtering to exclude UI elements
-                    const uiPatterns = [
-                        /notificación/i,
-                        /notification/i,
-                        /número de/i,
-                        /push están/i,
-                        /^(Compartir|Comentar|Me gusta|Reaccionar|Share|Comment|Like|Ver más|See more|Responder|Reply|Seguir|Follow|Todas|No leídas|Unread|All)$/i,
-                        /^[^a-záéíóúñ\s]{10,}$/,  // Skip text with no letters (likely obfuscated classes)
-                        /^activa las notificaciones/i,
-                        /^las notificaciones/i,
-                    ];
-                    
-                    for (let i = 0; i < Math.min(elements.length, 100); i++) {
-                        const element = elements[i];
+        with span('extract.scroll', index=scroll_count, strategy=scroll_strategy):
+            try:
+                # Check if page is still alive
+                if page.is_closed():
+                    logger.error("Page was closed unexpectedly")
+                    break
+                
+                # BUGFIX: Add diagnostic logging and try multiple selectors
+                # Facebook's DOM structure varies by page type (profile, group, post)
+                logger.debug(f"Extracting text via JavaScript with smart selector detection...")
+                
+                with span('extract.js_evaluate'):
+                    messages_on_page = page.evaluate('''
+                        () => {
+                            // BUGFIX V4: Target ONLY actual post content, NOT comments
+                            // POST: <div class="xdj266r x14z9mp xat24cr x1lziwak x1vvkbs">
+                            // COMMENT: <div class="xwib8y2 ..."> (must ignore)
+                            // Key: Posts have x1vvkbs class, comments don't!
+                            const selectors = [
+                                'div.xdj266r.x1vvkbs',                       // PRIMARY: Posts have x1vvkbs class
+                                'div.xdj266r.x14z9mp.xat24cr.x1lziwak.x1vvkbs',  // Full post content selector
+                                'div[data-ad-comet-preview="message"]',      // Fallback
+                            ];
                         
-                        // BUGFIX V4: Skip comments - they're inside div.xwib8y2 containers
-                        const commentContainer = element.closest('div.xwib8y2');
-                        if (commentContainer) {
-                            console.log('[SCRAPER DEBUG] Skipping comment element');
-                            continue;
-                        }
+                            let bestSelector = null;
+                            let maxElements = 0;
                         
-                        // Skip if element is inside a navigation or notification area
-                        const parent = element.closest('[role="navigation"], [role="banner"], [aria-label*="notif"], [aria-label*="Notif"]');
-                        if (parent) {
-                            continue;
-                        }
+                            // Find which selector returns the most elements
+                            for (const selector of selectors) {
+                                const count = document.querySelectorAll(selector).length;
+                                console.log('[SCRAPER DEBUG] Selector "' + selector + '" found ' + count + ' elements');
+                                if (count > maxElements) {
+                                    maxElements = count;
+                                    bestSelector = selector;
+                                }
+                            }
                         
-                        // Get text with proper Unicode handling
-                        let text = element.innerText || element.textContent || '';
+                            console.log('[SCRAPER DEBUG] Best selector: "' + bestSelector + '" with ' + maxElements + ' elements');
                         
-                        // Ensure proper UTF-8 encoding by normalizing Unicode
-                        text = text.normalize('NFC');
+                            if (!bestSelector || maxElements === 0) {
+                                console.log('[SCRAPER ERROR] No valid selector found! Page may not have loaded or DOM structure changed.');
+                                console.log('[SCRAPER ERROR] Forcing div[role="article"] div.xdj266r...');
+                                bestSelector = 'div[role="article"] div.xdj266r';  // Force article context
+                            }
                         
-                        const cleaned = text.trim();
+                            const elements = document.querySelectorAll(bestSelector);
+                            const texts = [];
+                            const seen = new Set();  // Deduplicate within same extraction
                         
-                        // BUGFIX V3: Remove author metadata lines (Autor, Hypeonmx, etc.)
-                        // If text has multiple lines starting with "Autor", take the last line
-                        let lines = cleaned.split('\\n');
-                        let finalText = cleaned;
-                        if (lines.length > 1 && lines[0].match(/^Autor/i)) {
-                            // Skip author metadata lines, keep the actual content
-                            finalText = lines.slice(1).filter(l => !l.match(/^[A-Z][a-z]+$/)).join(' ').trim();
-                        }
+                            // BUGFIX V2: Enhanced filtering to exclude UI elements
+                            const uiPatterns = [
+                                /notificación/i,
+                                /notification/i,
+                                /número de/i,
+                                /push están/i,
+                                /^(Compartir|Comentar|Me gusta|Reaccionar|Share|Comment|Like|Ver más|See more|Responder|Reply|Seguir|Follow|Todas|No leídas|Unread|All)$/i,
+                                /^[^a-záéíóúñ\s]{10,}$/,  // Skip text with no letters (likely obfuscated classes)
+                                /^activa las notificaciones/i,
+                                /^las notificaciones/i,
+                            ];
                         
-                        // Filter out metadata and page info, keep actual posts (20+ chars)
-                        if (finalText.length >= 20 && !seen.has(finalText) && 
-                            !finalText.match(/^(Centro de|Detalles|Páginas de|Página ·|Creador digital|Blog personal|Colaboraciones)/i)) {
-                            let isUIElement = false;
-                            for (const pattern of uiPatterns) {
-                                if (pattern.test(finalText)) {
-                                    isUIElement = true;
-                                    break;
+                            for (let i = 0; i < Math.min(elements.length, 100); i++) {
+                                const element = elements[i];
+                            
+                                // BUGFIX V4: Skip comments - they're inside div.xwib8y2 containers
+                                const commentContainer = element.closest('div.xwib8y2');
+                                if (commentContainer) {
+                                    console.log('[SCRAPER DEBUG] Skipping comment element');
+                                    continue;
                                 }
-                            }
                             
-                            if (!isUIElement) {
-                                texts.push(finalText);
-                                seen.add(finalText);
+                                // Skip if element is inside a navigation or notification area
+                                const parent = element.closest('[role="navigation"], [role="banner"], [aria-label*="notif"], [aria-label*="Notif"]');
+                                if (parent) {
+                                    continue;
+                                }
+                            
+                                // Get text with proper Unicode handling
+                                let text = element.innerText || element.textContent || '';
+                            
+                                // Ensure proper UTF-8 encoding by normalizing Unicode
+                                text = text.normalize('NFC');
+                            
+                                const cleaned = text.trim();
+                            
+                                // BUGFIX V3: Remove author metadata lines (Autor, Hypeonmx, etc.)
+                                // If text has multiple lines starting with "Autor", take the last line
+                                let lines = cleaned.split('\\n');
+                                let finalText = cleaned;
+                                if (lines.length > 1 && lines[0].match(/^Autor/i)) {
+                                    // Skip author metadata lines, keep the actual content
+                                    finalText = lines.slice(1).filter(l => !l.match(/^[A-Z][a-z]+$/)).join(' ').trim();
+                                }
+                            
+                                // Filter out metadata and page info, keep actual posts (20+ chars)
+                                if (finalText.length >= 20 && !seen.has(finalText) && 
+                                    !finalText.match(/^(Centro de|Detalles|Páginas de|Página ·|Creador digital|Blog personal|Colaboraciones)/i)) {
+                                    let isUIElement = false;
+                                    for (const pattern of uiPatterns) {
+                                        if (pattern.test(finalText)) {
+                                            isUIElement = true;
+                                            break;
+                                        }
+                                    }
+                                
+                                    if (!isUIElement) {
+                                        texts.push(finalText);
+                                        seen.add(finalText);
+                                    }
+                                }
                             }
+                        
+                            console.log('[SCRAPER DEBUG] Extracted ' + texts.length + ' unique messages from ' + elements.length + ' elements');
+                            return texts;
                         }
-                    }
-                    
-                    console.log('[SCRAPER DEBUG] Extracted ' + texts.length + ' unique messages from ' + elements.length + ' elements');
-                    return texts;
-                }
-            ''')
-            
-            # BUGFIX: Add comprehensive logging for debugging
-            logger.info(f"Bugfix: JavaScript extraction returned {len(messages_on_page)} messages")
-            if len(messages_on_page) == 0:
-                logger.warning("Bugfix: No messages found - selector detection may have failed or page structure changed")
-            elif len(messages_on_page) > 0 and scroll_count == 0:
-                # Log first few messages on first scroll for debugging
-                logger.info(f"Bugfix: Sample messages extracted (first 3):")
-                for idx, msg in enumerate(messages_on_page[:3], 1):
-                    logger.info(f"  {idx}. {msg[:100]}...")
-            logger.debug(f"Found {len(messages_on_page)} potential messages via JS")
-            stats['total_scraped'] += len(messages_on_page)
-            
-            # Check each message for duplicates and add new ones to database
-            new_messages_this_scroll = 0
-            duplicates_this_scroll = 0
-            
-            for i, message_text in enumerate(messages_on_page):
-                # BUGFIX V2: Enhanced logging for duplicate detection and quality filtering
-                # Check if this message is a duplicate
-                is_dup = deduplicator.is_duplicate(message_text, profile_id)
-                if scroll_count == 0 and i < 3:
-                    # Log first few checks for debugging
-                    logger.info(f"Bugfix: Message {i+1} is_duplicate={is_dup}, length={len(message_text)}, words={len(message_text.split())}")
+                    ''')
                 
-                if is_dup:
-                    stats['duplicates_found'] += 1
-                    duplicates_this_scroll += 1
+                # BUGFIX: Add comprehensive logging for debugging
+                logger.info(f"Bugfix: JavaScript extraction returned {len(messages_on_page)} messages")
+                if len(messages_on_page) == 0:
+                    logger.warning("Bugfix: No messages found - selector detection may have failed or page structure changed")
+                elif len(messages_on_page) > 0 and scroll_count == 0:
+                    # Log first few messages on first scroll for debugging
+                    logger.info(f"Bugfix: Sample messages extracted (first 3):")
+                    for idx, msg in enumerate(messages_on_page[:3], 1):
+                        logger.info(f"  {idx}. {msg[:100]}...")
+                logger.debug(f"Found {len(messages_on_page)} potential messages via JS")
+                stats['total_scraped'] += len(messages_on_page)
+                
+                # Check each message for duplicates and add new ones to database
+                new_messages_this_scroll = 0
+                duplicates_this_scroll = 0
+                # Inserts queued on the DB writer thread; resolved once per scroll (one commit)
+                pending_inserts = []
+                
+                for i, message_text in enumerate(messages_on_page):
+                    # BUGFIX V2: Enhanced logging for duplicate detection and quality filtering
+                    # Check if this message is a duplicate
+                    is_dup = deduplicator.is_duplicate(message_text, profile_id)
+                    if scroll_count == 0 and i < 3:
+                        # Log first few checks for debugging
+                        logger.info(f"Bugfix: Message {i+1} is_duplicate={is_dup}, length={len(message_text)}, words={len(message_text.split())}")
                     
-                    # Mark first duplicate if not already marked
-                    if stats['first_duplicate_index'] is None:
-                        stats['first_duplicate_index'] = len(extracted_messages) + i
-                        logger.info(f"🔍 First duplicate encountered at index {stats['first_duplicate_index']}")
-                        logger.info(f"Duplicate message: {message_text[:100]}...")
-                else:
-                    # This is a new message - add to database and our list
-                    message_id = db.add_message(profile_id, message_text)
+                    if is_dup:
+                        stats['duplicates_found'] += 1
+                        duplicates_this_scroll += 1
+                        
+                        # Mark first duplicate if not already marked
+                        if stats['first_duplicate_index'] is None:
+                            stats['first_duplicate_index'] = len(extracted_messages) + len(pending_inserts) + i
+                            logger.info(f"🔍 First duplicate encountered at index {stats['first_duplicate_index']}")
+                            logger.info(f"Duplicate message: {message_text[:100]}...")
+                    else:
+                        # This is a new message - add to database and our list
+                        pending_inserts.append((message_text, db.add_message_async(profile_id, message_text)))
+                
+                for message_text, insert in pending_inserts:
+                    message_id = insert.result()
                     if message_id:
                         extracted_messages.append(message_text)
                         stats['new_messages'] += 1
@@ -970,174 +982,178 @@ def _smart_scroll_and_extract_with_db(page: Page, selector: str, profile_id: int
                         logger.debug(f"Added new message {message_id}: {message_text[:50]}...")
                     else:
                         logger.warning(f"Bugfix: Failed to add message to database: {message_text[:100]}...")
-            
-            # Check if we should stop due to too many duplicates in a row
-            if duplicates_this_scroll > 0 and new_messages_this_scroll == 0:
-                # Only duplicates found this scroll
-                consecutive_duplicate_only_scrolls += 1
                 
-                # SMART BAILOUT: If we see 2+ consecutive scrolls with ONLY duplicates, bail out
-                # This means all visible content is already in DB - no point waiting 18s each scroll!
-                if consecutive_duplicate_only_scrolls >= 2:
-                    logger.info(f"🛑 SMART BAILOUT: {consecutive_duplicate_only_scrolls} consecutive scrolls with only duplicates")
-                    logger.info(f"   All visible content already in database - no new content available")
-                    stats['stopped_due_to_duplicate'] = True
-                    break
+                # Check if we should stop due to too many duplicates in a row
+                if duplicates_this_scroll > 0 and new_messages_this_scroll == 0:
+                    # Only duplicates found this scroll
+                    consecutive_duplicate_only_scrolls += 1
+                    
+                    # SMART BAILOUT: If we see 2+ consecutive scrolls with ONLY duplicates, bail out
+                    # This means all visible content is already in DB - no point waiting 18s each scroll!
+                    if consecutive_duplicate_only_scrolls >= 2:
+                        logger.info(f"🛑 SMART BAILOUT: {consecutive_duplicate_only_scrolls} consecutive scrolls with only duplicates")
+                        logger.info(f"   All visible content already in database - no new content available")
+                        stats['stopped_due_to_duplicate'] = True
+                        break
+                    
+                    if len(extracted_messages) >= 5:  # Only stop if we have some messages already
+                        logger.info(f"🛑 Only duplicates found this scroll - likely reached existing content")
+                        stats['stopped_due_to_duplicate'] = True
+                        break
+                    else:
+                        logger.info(f"⚠️ Only duplicates this scroll, but continuing to find more content...")
+                elif new_messages_this_scroll > 0:
+                    # Reset counter when we find new messages
+                    consecutive_duplicate_only_scrolls = 0
                 
-                if len(extracted_messages) >= 5:  # Only stop if we have some messages already
-                    logger.info(f"🛑 Only duplicates found this scroll - likely reached existing content")
-                    stats['stopped_due_to_duplicate'] = True
-                    break
-                else:
-                    logger.info(f"⚠️ Only duplicates this scroll, but continuing to find more content...")
-            elif new_messages_this_scroll > 0:
-                # Reset counter when we find new messages
-                consecutive_duplicate_only_scrolls = 0
-            
-            if duplicates_this_scroll > 0 and new_messages_this_scroll > 0:
-                logger.info(f"📊 Mixed results: {new_messages_this_scroll} new, {duplicates_this_scroll} duplicates - continuing to scroll")
-            
-            current_message_count = len(extracted_messages)
-            
-            logger.info(f"Scroll {scroll_count + 1}: Extracted {current_message_count}/{target_messages} "
-                       f"unique messages (+{new_messages_this_scroll} new)")
-            
-            # Check if we reached target
-            if current_message_count >= target_messages:
-                logger.info(f"[SUCCESS] Reached target of {target_messages} messages!")
-                break
-            
-            # Check if we got new messages this scroll
-            if new_messages_this_scroll > 0:
-                no_new_messages_count = 0  # Reset counter
-            else:
-                no_new_messages_count += 1
-                logger.warning(f"  → No new messages this scroll (attempt {no_new_messages_count}/{max_no_new_messages})")
+                if duplicates_this_scroll > 0 and new_messages_this_scroll > 0:
+                    logger.info(f"📊 Mixed results: {new_messages_this_scroll} new, {duplicates_this_scroll} duplicates - continuing to scroll")
+                
+                current_message_count = len(extracted_messages)
                 
-                # Stop if no new messages for several attempts
-                if no_new_messages_count >= max_no_new_messages:
-                    logger.info("No new messages loading, reached end of available content")
+                logger.info(f"Scroll {scroll_count + 1}: Extracted {current_message_count}/{target_messages} "
+                           f"unique messages (+{new_messages_this_scroll} new)")
+                
+                # Check if we reached target
+                if current_message_count >= target_messages:
+                    logger.info(f"[SUCCESS] Reached target of {target_messages} messages!")
                     break
-            
-            previous_message_count = current_message_count
-            
-            # Get current scroll position BEFORE scrolling (with crash protection)
-            try:
-                current_scroll_position = page.evaluate("window.pageYOffset")
-            except Exception as e:
-                logger.warning(f"  ⚠️  Page became unstable while reading scroll position: {e}")
-                logger.info(f"✅ Successfully extracted {current_message_count} messages before instability")
-                break
-            
-            # FAIL-SAFE: Detect if we're stuck (scroll position hasn't changed)
-            if current_scroll_position == previous_scroll_position:
-                stuck_scroll_count += 1
-                logger.warning(f"  ⚠️  Scroll position hasn't changed! (stuck count: {stuck_scroll_count})")
                 
-                # Take screenshot every 3rd stuck attempt for debugging
-                if stuck_scroll_count % 3 == 0:
-                    logger.info(f"  📸 Taking screenshot for debugging (stuck count: {stuck_scroll_count})...")
-                    try:
-                        take_debug_screenshot(page, f"stuck_scroll_{scroll_count}", "stuck", 
-                                            f"Stuck after {scroll_count} scrolls, {current_message_count} messages")
-                    except Exception as e:
-                        logger.warning(f"Could not take stuck screenshot: {e}")
+                # Check if we got new messages this scroll
+                if new_messages_this_scroll > 0:
+                    no_new_messages_count = 0  # Reset counter
+                else:
+                    no_new_messages_count += 1
+                    logger.warning(f"  → No new messages this scroll (attempt {no_new_messages_count}/{max_no_new_messages})")
+                    
+                    # Stop if no new messages for several attempts
+                    if no_new_messages_count >= max_no_new_messages:
+                        logger.info("No new messages loading, reached end of available content")
+                        break
                 
-                # Bugfix: Wait in chunks to detect browser closure early
-                # Split 18 seconds into 4× 4.5-second chunks with page checks
-                logger.info(f"  ⏳ Waiting 18 seconds for messages to load (stuck attempt {stuck_scroll_count})...")
-                try:
-                    for wait_chunk in range(4):
-                        # Bugfix: Import is_page_alive from facebook_auth
-                        from facebook.facebook_auth import is_page_alive
-                        if not is_page_alive(page):
-                            logger.error(f"❌ Bugfix: Browser closed during wait chunk {wait_chunk + 1}/4")
-                            logger.info(f"✅ Returning {len(extracted_messages)} messages extracted before closure")
-                            return extracted_messages, stats
-                        page.wait_for_timeout(4500)  # 4.5 seconds × 4 = 18 seconds total
-                except Exception as wait_error:
-                    error_msg = str(wait_error).lower()
-                    if 'closed' in error_msg or 'target' in error_msg:
-                        logger.error(f"❌ Bugfix: Browser closed during stuck wait: {str(wait_error)[:100]}")
-                        logger.info(f"✅ Returning {len(extracted_messages)} messages extracted before closure")
-                        return extracted_messages, stats
-                    raise  # Re-raise other errors
+                previous_message_count = current_message_count
                 
-                # Try AGGRESSIVE scroll to force lazy loading
-                logger.debug(f"Attempting aggressive scroll (3000px) with {scroll_strategy} method...")
+                # Get current scroll position BEFORE scrolling (with crash protection)
                 try:
-                    if scroll_strategy == "mouse_wheel":
-                        page.mouse.wheel(0, 3000)
-                    elif scroll_strategy == "page_down":
-                        for _ in range(6):  # 6 Page Downs ≈ 3000px
-                            page.keyboard.press("PageDown")
-                            page.wait_for_timeout(100)
-                    else:  # default
-                        page.evaluate("window.scrollBy(0, 3000)")
+                    current_scroll_position = page.evaluate("window.pageYOffset")
                 except Exception as e:
-                    logger.warning(f"  ⚠️  Page crashed during scroll: {e}")
-                    logger.info(f"✅ Successfully extracted {current_message_count} messages before crash")
+                    logger.warning(f"  ⚠️  Page became unstable while reading scroll position: {e}")
+                    logger.info(f"✅ Successfully extracted {current_message_count} messages before instability")
                     break
-            else:
-                # Normal incremental scroll (with crash protection)
-                stuck_scroll_count = 0  # Reset stuck counter
                 
+                # FAIL-SAFE: Detect if we're stuck (scroll position hasn't changed)
+                if current_scroll_position == previous_scroll_position:
+                    stuck_scroll_count += 1
+                    logger.warning(f"  ⚠️  Scroll position hasn't changed! (stuck count: {stuck_scroll_count})")
+                    
+                    # Take screenshot every 3rd stuck attempt for debugging
+                    if stuck_scroll_count % 3 == 0:
+                        logger.info(f"  📸 Taking screenshot for debugging (stuck count: {stuck_scroll_count})...")
+                        try:
+                            take_debug_screenshot(page, f"stuck_scroll_{scroll_count}", "stuck", 
+                                                f"Stuck after {scroll_count} scrolls, {current_message_count} messages")
+                        except Exception as e:
+                            logger.warning(f"Could not take stuck screenshot: {e}")
+                    
+                    # Bugfix: Wait in chunks to detect browser closure early
+                    # Split 18 seconds into 4× 4.5-second chunks with page checks
+                    logger.info(f"  ⏳ Waiting 18 seconds for messages to load (stuck attempt {stuck_scroll_count})...")
+                    with span('extract.stuck_wait'):
+                        try:
+                            for wait_chunk in range(4):
+                                # Bugfix: Import is_page_alive from facebook_auth
+                                from facebook.facebook_auth import is_page_alive
+                                if not is_page_alive(page):
+                                    logger.error(f"❌ Bugfix: Browser closed during wait chunk {wait_chunk + 1}/4")
+                                    logger.info(f"✅ Returning {len(extracted_messages)} messages extracted before closure")
+                                    return extracted_messages, stats
+                                page.wait_for_timeout(4500)  # 4.5 seconds × 4 = 18 seconds total
+                                metrics.SCROLL_WAIT_SECONDS.inc(4.5, kind='stuck')
+                        except Exception as wait_error:
+                            error_msg = str(wait_error).lower()
+                            if 'closed' in error_msg or 'target' in error_msg:
+                                logger.error(f"❌ Bugfix: Browser closed during stuck wait: {str(wait_error)[:100]}")
+                                logger.info(f"✅ Returning {len(extracted_messages)} messages extracted before closure")
+                                return extracted_messages, stats
+                            raise  # Re-raise other errors
+                    
+                    # Try AGGRESSIVE scroll to force lazy loading
+                    logger.debug(f"Attempting aggressive scroll (3000px) with {scroll_strategy} method...")
+                    try:
+                        if scroll_strategy == "mouse_wheel":
+                            page.mouse.wheel(0, 3000)
+                        elif scroll_strategy == "page_down":
+                            for _ in range(6):  # 6 Page Downs ≈ 3000px
+                                page.keyboard.press("PageDown")
+                                page.wait_for_timeout(100)
+                        else:  # default
+                            page.evaluate("window.scrollBy(0, 3000)")
+                    except Exception as e:
+                        logger.warning(f"  ⚠️  Page crashed during scroll: {e}")
+                        logger.info(f"✅ Successfully extracted {current_message_count} messages before crash")
+                        break
+                else:
+                    # Normal incremental scroll (with crash protection)
+                    stuck_scroll_count = 0  # Reset stuck counter
+                    
+                    try:
+                        if scroll_strategy == "mouse_wheel":
+                            logger.debug(f"Scrolling with mouse wheel (1500px)...")
+                            page.mouse.wheel(0, 1500)
+                        elif scroll_strategy == "page_down":
+                            logger.debug(f"Scrolling with Page Down key...")
+                            for _ in range(3):  # 3 Page Downs ≈ 1500px
+                                page.keyboard.press("PageDown")
+                                page.wait_for_timeout(100)
+                        else:  # default
+                            logger.debug(f"Scrolling down (1500px)...")
+                            page.evaluate("window.scrollBy(0, 1500)")
+                    except Exception as e:
+                        logger.warning(f"  ⚠️  Page crashed during scroll: {e}")
+                        logger.info(f"✅ Successfully extracted {current_message_count} messages before crash")
+                        break
+                
+                # Get new scroll position (with crash protection)
                 try:
-                    if scroll_strategy == "mouse_wheel":
-                        logger.debug(f"Scrolling with mouse wheel (1500px)...")
-                        page.mouse.wheel(0, 1500)
-                    elif scroll_strategy == "page_down":
-                        logger.debug(f"Scrolling with Page Down key...")
-                        for _ in range(3):  # 3 Page Downs ≈ 1500px
-                            page.keyboard.press("PageDown")
-                            page.wait_for_timeout(100)
-                    else:  # default
-                        logger.debug(f"Scrolling down (1500px)...")
-                        page.evaluate("window.scrollBy(0, 1500)")
+                    previous_scroll_position = page.evaluate("window.pageYOffset")
                 except Exception as e:
-                    logger.warning(f"  ⚠️  Page crashed during scroll: {e}")
-                    logger.info(f"✅ Successfully extracted {current_message_count} messages before crash")
+                    logger.warning(f"  ⚠️  Cannot read scroll position after scroll: {e}")
+                    logger.info(f"✅ Successfully extracted {current_message_count} messages")
                     break
+                
+                scroll_count += 1
+                
+                # Bugfix: Wait in chunks to detect browser closure early
+                # Split 12 seconds into 3× 4-second chunks with page checks
+                logger.debug(f"⏳ Waiting 12 seconds for Facebook to lazy-load new content...")
+                with span('extract.lazy_load_wait'):
+                    try:
+                        for wait_chunk in range(3):
+                            from facebook.facebook_auth import is_page_alive
+                            if not is_page_alive(page):
+                                logger.error(f"❌ Bugfix: Browser closed during lazy-load wait chunk {wait_chunk + 1}/3")
+                                logger.info(f"✅ Returning {len(extracted_messages)} messages extracted before closure")
+                                return extracted_messages, stats
+                            page.wait_for_timeout(4000)  # 4 seconds × 3 = 12 seconds total
+                            metrics.SCROLL_WAIT_SECONDS.inc(4, kind='lazy_load')
+                    except Exception as wait_error:
+                        error_msg = str(wait_error).lower()
+                        if 'closed' in error_msg or 'target' in error_msg:
+                            logger.error(f"❌ Bugfix: Browser closed during lazy-load wait: {str(wait_error)[:100]}")
+                            logger.info(f"✅ Returning {len(extracted_messages)} messages extracted before closure")
+                            return extracted_messages, stats
+                        raise  # Re-raise other errors
             
-            # Get new scroll position (with crash protection)
-            try:
-                previous_scroll_position = page.evaluate("window.pageYOffset")
             except Exception as e:
-                logger.warning(f"  ⚠️  Cannot read scroll position after scroll: {e}")
-                logger.info(f"✅ Successfully extracted {current_message_count} messages")
-                break
-            
-            scroll_count += 1
-            
-            # Bugfix: Wait in chunks to detect browser closure early
-            # Split 12 seconds into 3× 4-second chunks with page checks
-            logger.debug(f"⏳ Waiting 12 seconds for Facebook to lazy-load new content...")
-            try:
-                for wait_chunk in range(3):
-                    from facebook.facebook_auth import is_page_alive
-                    if not is_page_alive(page):
-                        logger.error(f"❌ Bugfix: Browser closed during lazy-load wait chunk {wait_chunk + 1}/3")
-                        logger.info(f"✅ Returning {len(extracted_messages)} messages extracted before closure")
-                        return extracted_messages, stats
-                    page.wait_for_timeout(4000)  # 4 seconds × 3 = 12 seconds total
-            except Exception as wait_error:
-                error_msg = str(wait_error).lower()
-                if 'closed' in error_msg or 'target' in error_msg:
-                    logger.error(f"❌ Bugfix: Browser closed during lazy-load wait: {str(wait_error)[:100]}")
-                    logger.info(f"✅ Returning {len(extracted_messages)} messages extracted before closure")
-                    return extracted_messages, stats
-                raise  # Re-raise other errors
-        
-        except Exception as e:
-            # Handle page crashes gracefully
-            error_msg = str(e)
-            if "Target crashed" in error_msg or "Page closed" in error_msg:
-                logger.error(f"Page crashed during extraction: {e}")
-                logger.info(f"Returning {len(extracted_messages)} messages extracted before crash")
-                break
-            else:
-                logger.error(f"Unexpected error during scroll: {e}")
-                break
+                # Handle page crashes gracefully
+                error_msg = str(e)
+                if "Target crashed" in error_msg or "Page closed" in error_msg:
+                    logger.error(f"Page crashed during extraction: {e}")
+                    logger.info(f"Returning {len(extracted_messages)} messages extracted before crash")
+                    break
+                else:
+                    logger.error(f"Unexpected error during scroll: {e}")
+                    break
     
     logger.info(f"=== Scroll & Extract Summary ===")
     logger.info(f"Total scrolls: {scroll_count}")
@@ -8,10 +8,42 @@ import logging
 import time
 from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
 import config
+from utils.wait_strategies import wait_for_any_visible
 
 logger = logging.getLogger(__name__)
 
 
+def page_mode_composers(page: Page, page_name: str) -> list:
+    """
+    Composer texts that name the page ("¿Qué estás pensando, [PageName]?").
+
+    These only show up once the account acts as the page (the personal feed
+    shows the generic "¿Qué estás pensando?" composer too), so waits on them
+    cannot return before a profile switch has taken effect. Where the page
+    never shows its name, the wait runs to its bound like the old sleep.
+    """
+    return [
+        page.get_by_text(f"¿Qué estás pensando, {page_name}", exact=False),
+        page.get_by_text(f"What's on your mind, {page_name}", exact=False),
+    ]
+
+
+def _profile_switcher_buttons(page: Page) -> list:
+    """'Tu perfil' / 'Your profile' account switcher buttons."""
+    return [
+        page.get_by_role('button', name='Tu perfil', exact=True),
+        page.get_by_role('button', name='Your profile', exact=True),
+    ]
+
+
+def _switch_to_page_buttons(page: Page, page_name: str) -> list:
+    """'Cambiar a [PageName]' / 'Switch to [PageName]' buttons in the switcher menu."""
+    return [
+        page.get_by_role('button', name=f'Cambiar a {page_name}'),
+        page.get_by_role('button', name=f'Switch to {page_name}'),
+    ]
+
+
 def is_in_page_mode(page: Page, page_name: str = None) -> bool:
     """
     Check if currently in page mode by looking for post composer.
@@ -126,7 +158,7 @@ def switch_to_page_mode(page: Page, page_name: str, page_url: str = None, max_re
         # This ensures we're not already on the target page, which can cause switch issues
         logger.info("Navigating to Facebook home before switching profiles...")
         page.goto('https://www.facebook.com', wait_until='domcontentloaded', timeout=config.NAVIGATION_TIMEOUT)
-        page.wait_for_timeout(2000)
+        wait_for_any_visible(page, _profile_switcher_buttons(page), 2000, 'switch_home_loaded')
         
         for attempt in range(1, max_retries + 1):
             logger.info(f"Switch attempt {attempt}/{max_retries}")
@@ -142,7 +174,7 @@ def switch_to_page_mode(page: Page, page_name: str, page_url: str = None, max_re
                     if switcher.is_visible(timeout=3000):
                         logger.info("Found 'Tu perfil' button (Spanish) using getByRole")
                         switcher.click(timeout=3000)
-                        page.wait_for_timeout(2000)
+                        wait_for_any_visible(page, _switch_to_page_buttons(page, page_name), 2000, 'switcher_menu_open')
                         switcher_clicked = True
                 except Exception as e:
                     logger.debug(f"Spanish 'Tu perfil' button not found: {e}")
@@ -154,7 +186,7 @@ def switch_to_page_mode(page: Page, page_name: str, page_url: str = None, max_re
                         if switcher.is_visible(timeout=3000):
                             logger.info("Found 'Your profile' button (English) using getByRole")
                             switcher.click(timeout=3000)
-                            page.wait_for_timeout(2000)
+                            wait_for_any_visible(page, _switch_to_page_buttons(page, page_name), 2000, 'switcher_menu_open')
                             switcher_clicked = True
                     except Exception as e:
                         logger.debug(f"English 'Your profile' button not found: {e}")
@@ -175,7 +207,7 @@ def switch_to_page_mode(page: Page, page_name: str, page_url: str = None, max_re
                             if switcher.is_visible(timeout=2000):
                                 logger.info(f"Found profile switcher (legacy): {selector}")
                                 switcher.click(timeout=3000)
-                                page.wait_for_timeout(2000)
+                                wait_for_any_visible(page, _switch_to_page_buttons(page, page_name), 2000, 'switcher_menu_open')
                                 switcher_clicked = True
                                 break
                         except:
@@ -202,7 +234,6 @@ def switch_to_page_mode(page: Page, page_name: str, page_url: str = None, max_re
                     if switch_button.is_visible(timeout=3000):
                         logger.info(f"Found 'Cambiar a {page_name}' button (Spanish)")
                         switch_button.click(timeout=3000)
-                        page.wait_for_timeout(3000)
                         page_clicked = True
                 except Exception as e:
                     logger.debug(f"Spanish 'Cambiar a' button not found: {e}")
@@ -214,7 +245,6 @@ def switch_to_page_mode(page: Page, page_name: str, page_url: str = None, max_re
                         if switch_button.is_visible(timeout=3000):
                             logger.info(f"Found 'Switch to {page_name}' button (English)")
                             switch_button.click(timeout=3000)
-                            page.wait_for_timeout(3000)
                             page_clicked = True
                     except Exception as e:
                         logger.debug(f"English 'Switch to' button not found: {e}")
@@ -234,7 +264,6 @@ def switch_to_page_mode(page: Page, page_name: str, page_url: str = None, max_re
                             if page_element.is_visible(timeout=3000):
                                 logger.info(f"Found page element (legacy): {selector}")
                                 page_element.click(timeout=3000)
-                                page.wait_for_timeout(3000)
                                 page_clicked = True
                                 break
                         except Exception as e:
@@ -251,8 +280,10 @@ def switch_to_page_mode(page: Page, page_name: str, page_url: str = None, max_re
                 
                 # Bugfix: After clicking "Cambiar a [Page]", the page needs time to switch
                 # and may need a reload to show the updated feed as the page
+                # Upper bound: the previous 3s post-click + 5s switch sleeps. Only the composer
+                # naming the page counts: the generic one is already visible on the personal feed.
                 logger.info("Waiting for profile switch to complete...")
-                page.wait_for_timeout(5000)  # Increased wait time
+                wait_for_any_visible(page, page_mode_composers(page, page_name), 8000, 'profile_switch_complete')
                 
                 # Bugfix: Log URL after switch for debugging
                 logger.info(f"URL after switch attempt: {page.url}")
@@ -261,7 +292,7 @@ def switch_to_page_mode(page: Page, page_name: str, page_url: str = None, max_re
                 logger.info("Reloading page to refresh feed with switched profile...")
                 try:
                     page.reload(wait_until='domcontentloaded')
-                    page.wait_for_timeout(4000)  # Wait for reload to complete
+                    wait_for_any_visible(page, page_mode_composers(page, page_name), 4000, 'switch_reload_composer')  # Wait for reload to complete
                     logger.info(f"Page reloaded, current URL: {page.url}")
                 except Exception as reload_e:
                     logger.warning(f"Page reload failed: {reload_e}")
@@ -276,7 +307,7 @@ def switch_to_page_mode(page: Page, page_name: str, page_url: str = None, max_re
                         else:
                             logger.info("Post button not found after reload, trying page URL as fallback...")
                             page.goto(page_url, wait_until='domcontentloaded', timeout=config.NAVIGATION_TIMEOUT)
-                            page.wait_for_timeout(3000)
+                            wait_for_any_visible(page, page_mode_composers(page, page_name), 3000, 'page_url_composer')
                             logger.info(f"Navigated to page URL: {page.url}")
                     except Exception as check_e:
                         logger.debug(f"Post button check/fallback failed: {check_e}")
@@ -334,7 +365,7 @@ def ensure_page_mode(page: Page, page_name: str, page_url: str = None) -> bool:
             logger.info(f"Method 1: Attempting direct navigation to page URL: {page_url}")
             try:
                 page.goto(page_url, wait_until='domcontentloaded', timeout=config.NAVIGATION_TIMEOUT)
-                page.wait_for_timeout(3000)
+                wait_for_any_visible(page, page_mode_composers(page, page_name), 3000, 'page_url_composer')
                 
                 # Verify we can now post
                 if is_in_page_mode(page, page_name):
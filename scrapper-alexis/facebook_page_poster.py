@@ -12,6 +12,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 import logging
+import random
+import time
 from datetime import datetime
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError, Page
 
@@ -19,9 +21,14 @@ import config
 from core.exceptions import LoginError, NavigationError
 from utils.browser_config import create_browser_context
 from facebook.facebook_auth import check_auth_state, verify_logged_in, login_facebook_with_retry, save_auth_state
-from facebook.facebook_page_manager import ensure_page_mode
+from facebook.facebook_page_manager import ensure_page_mode, page_mode_composers
 from core.database import get_database, initialize_database
+from core.settings_provider import get_settings_provider
 from core.debug_helper import take_debug_screenshot, DebugSession
+from utils import metrics, profiling
+from utils.wait_strategies import (
+    RequestTracker, wait_for_any_visible, wait_until_gone, wait_for_condition, log_wait_summary
+)
 
 # Create logs directory
 logs_dir = Path('logs')
@@ -37,6 +44,37 @@ setup_basicConfig_with_mexico_timezone(log_file, getattr(logging, config.LOG_LEV
 logger = logging.getLogger(__name__)
 
 
+# Feature: Selectors used by the selector-driven waits in the posting flow
+POST_DIALOG_SELECTORS = [
+    'div[role="dialog"]',
+    'div[aria-label="Create post"]',
+    'div[aria-label="Crear publicación"]',
+]
+COMPOSER_INDICATORS = [
+    'text=¿Qué estás pensando',
+    'text=What\'s on your mind',
+]
+# Facebook photo uploads go through upload.facebook.com / rupload endpoints
+UPLOAD_REQUEST_PATTERN = r'upload\.facebook\.com|rupload'
+# Resolves when a follow-up dialog button is visible or the composer dialog closed
+PUBLISH_OUTCOME_JS = """
+({texts, dialogs}) => {
+    const visible = el => el.getClientRects().length > 0;
+    const buttons = Array.from(document.querySelectorAll('button, div[role="button"]')).filter(visible);
+    if (buttons.some(b => texts.some(t => (b.innerText || '').includes(t)))) return true;
+    return !dialogs.some(sel => Array.from(document.querySelectorAll(sel)).some(visible));
+}
+"""
+
+
+def _publish_buttons(page):
+    """Publicar/Post button locators (Spanish first, like the manual recording)."""
+    return [
+        page.get_by_role('button', name='Publicar', exact=True),
+        page.get_by_role('button', name='Post', exact=True),
+    ]
+
+
 def is_page_alive(page: Page) -> bool:
     """
     Check if page/context/browser is still alive and operational.
@@ -64,10 +102,8 @@ def is_page_alive(page: Page) -> bool:
 
 
 def get_posting_settings():
-    """Get posting settings from database."""
+    """Get posting settings from database (cached, refreshed when the web UI saves)."""
     try:
-        import sqlite3
-        
         # ALWAYS use Laravel database - single source of truth
         # Use config.DATABASE_PATH which auto-detects correct path
         db_path = config.DATABASE_PATH
@@ -76,34 +112,28 @@ def get_posting_settings():
             logger.error("Run: sudo ./install.sh to initialize database")
             return None
         
-        conn = sqlite3.connect(db_path)
+        provider = get_settings_provider()
         
         # Get posting settings
-        cursor = conn.execute("SELECT page_name, page_url, interval_min, interval_max, enabled FROM posting_settings LIMIT 1")
-        result = cursor.fetchone()
-        
-        if not result:
-            conn.close()
+        posting = provider.get_posting_settings()
+        if not posting:
             return None
         
         settings = {
-            'page_name': result[0],
-            'page_url': result[1],
-            'interval_min': result[2],
-            'interval_max': result[3],
-            'enabled': bool(result[4])
+            'page_name': posting.get('page_name'),
+            'page_url': posting.get('page_url'),
+            'interval_min': posting.get('interval_min'),
+            'interval_max': posting.get('interval_max'),
+            'enabled': bool(posting.get('enabled'))
         }
         
-        # Get operating hours from scraper_settings
-        cursor = conn.execute("SELECT posting_start_hour, posting_start_period, posting_stop_hour, posting_stop_period FROM scraper_settings LIMIT 1")
-        hours_result = cursor.fetchone()
-        conn.close()
-        
-        if hours_result:
-            settings['posting_start_hour'] = hours_result[0]
-            settings['posting_start_period'] = hours_result[1]
-            settings['posting_stop_hour'] = hours_result[2]
-            settings['posting_stop_period'] = hours_result[3]
+        # Get operating hours from scraper_settings (defaults if not set)
+        scraper = provider.get_table('scraper_settings')
+        if scraper:
+            settings['posting_start_hour'] = scraper.get('posting_start_hour')
+            settings['posting_start_period'] = scraper.get('posting_start_period')
+            settings['posting_stop_hour'] = scraper.get('posting_stop_hour')
+            settings['posting_stop_period'] = scraper.get('posting_stop_period')
         else:
             # Default values if not set
             settings['posting_start_hour'] = 7
@@ -182,38 +212,32 @@ def is_within_operating_hours(start_hour: int, start_period: str, stop_hour: int
             return True
 
 
+def _choose_upload_path(image_path: str, encoded_image_path: str = None) -> str:
+    """Feature: Prefer the smaller WebP/JPEG variant for uploads when it exists on disk."""
+    if encoded_image_path:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        candidate = encoded_image_path
+        if not os.path.isabs(candidate):
+            candidate = os.path.join(script_dir, 'data', 'message_images', os.path.basename(candidate))
+        if os.path.exists(candidate):
+            return encoded_image_path
+    return image_path
+
+
 def get_next_approved_image():
     """Get the next approved image to post (only auto-post enabled).
     Orders by priority (highest first), then by approved_at (oldest first)."""
     try:
-        import sqlite3
-        
-        # Connect to scraper database
-        db = get_database()
-        
-        # Get next approved image by priority (highest first), then oldest approved
-        # Feature: post_priority field - images with priority 1 (from "generar ahora") post first
-        query = """
-            SELECT m.id, m.message_text, m.image_path
-            FROM messages m
-            WHERE m.image_generated = 1
-              AND m.approved_for_posting = 1
-              AND m.auto_post_enabled = 1
-              AND (m.posted_to_page = 0 OR m.posted_to_page IS NULL)
-            ORDER BY m.post_priority DESC, m.approved_at ASC
-            LIMIT 1
-        """
-        
-        with db.get_connection() as conn:
-            cursor = conn.execute(query)
-            result = cursor.fetchone()
-            
-            if result:
-                return {
-                    'id': result['id'],
-                    'message_text': result['message_text'],
-                    'image_path': result['image_path']
-                }
+        # Feature: Query lives in DatabaseManager so it shares the page queue index
+        result = get_database().get_next_page_image()
+        
+        if result:
+            return {
+                'id': result['id'],
+                'message_text': result['message_text'],
+                'image_path': result['image_path'],
+                'upload_path': _choose_upload_path(result['image_path'], result['encoded_image_path'])
+            }
         
         return None
         
@@ -225,31 +249,19 @@ def get_next_approved_image():
 def get_specific_image(image_id: int):
     """Get a specific image by ID for manual posting."""
     try:
-        import sqlite3
-        
-        # Connect to scraper database
         db = get_database()
         
-        # Get specific image by ID
-        query = """
-            SELECT m.id, m.message_text, m.image_path, m.approved_for_posting, m.posted_to_page
-            FROM messages m
-            WHERE m.id = ?
-              AND m.image_generated = 1
-        """
-        
-        with db.get_connection() as conn:
-            cursor = conn.execute(query, (image_id,))
-            result = cursor.fetchone()
-            
-            if result:
-                return {
-                    'id': result['id'],
-                    'message_text': result['message_text'],
-                    'image_path': result['image_path'],
-                    'approved_for_posting': bool(result['approved_for_posting']),
-                    'posted_to_page': bool(result['posted_to_page'])
-                }
+        # Get specific image by ID (primary-key lookup)
+        record = db.get_message(image_id)
+        if record and record.image_generated:
+            return {
+                'id': record.id,
+                'message_text': record.message_text,
+                'image_path': record.image_path,
+                'upload_path': _choose_upload_path(record.image_path, record.encoded_image_path),
+                'approved_for_posting': bool(record.approved_for_posting),
+                'posted_to_page': record.posted_to_page
+            }
         
         return None
         
@@ -261,24 +273,9 @@ def get_specific_image(image_id: int):
 def mark_as_posted(message_id):
     """Mark message as posted to page."""
     try:
-        import sqlite3
-        
-        # Update scraper database
+        # Update scraper database (UTC timestamp, committed by the DB writer thread)
         db = get_database()
-        
-        with db.get_connection() as conn:
-            # BUGFIX: Store timestamp in UTC format for Laravel compatibility
-            # Laravel's accessor will convert from UTC to app timezone (Mexico) for display
-            from datetime import timezone as dt_timezone
-            timestamp = datetime.now(tz=dt_timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
-            conn.execute(
-                "UPDATE messages SET posted_to_page = 1, posted_to_page_at = ? WHERE id = ?",
-                (timestamp, message_id)
-            )
-            conn.commit()
-        
-        logger.info(f"Marked message {message_id} as posted to page")
-        return True
+        return db.mark_posted_to_page(message_id)
         
     except Exception as e:
         logger.error(f"Failed to mark message as posted: {e}")
@@ -315,7 +312,7 @@ def validate_page_login(page, page_url: str) -> bool:
         # If not, try navigating to page URL
         logger.info(f"Not ready to post, navigating to page URL: {page_url}")
         page.goto(page_url, wait_until='domcontentloaded')
-        page.wait_for_timeout(3000)
+        wait_for_any_visible(page, COMPOSER_INDICATORS, 3000, 'page_validation_composer')
         
         take_debug_screenshot(page, "01_page_validation_after_nav", "page_posting", f"After navigation to: {page_url}")
         
@@ -343,6 +340,7 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
     Returns:
         True if successfully posted
     """
+    upload_tracker = None
     try:
         logger.info("="*70)
         logger.info("POSTING IMAGE TO FACEBOOK PAGE")
@@ -367,7 +365,7 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
                 if composer.is_visible(timeout=3000):
                     logger.info(f"✅ Found composer with page name: {composer_text}")
                     composer.click(timeout=3000)
-                    page.wait_for_timeout(3000)
+                    wait_for_any_visible(page, POST_DIALOG_SELECTORS, 3000, 'composer_modal_open')
                     composer_clicked = True
             except Exception as e:
                 logger.debug(f"Composer with page name not found: {e}")
@@ -381,7 +379,7 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
                 if composer.is_visible(timeout=3000):
                     logger.info("✅ Found composer using generic search")
                     composer.click(timeout=3000)
-                    page.wait_for_timeout(3000)
+                    wait_for_any_visible(page, POST_DIALOG_SELECTORS, 3000, 'composer_modal_open')
                     composer_clicked = True
             except Exception as e:
                 logger.debug(f"Generic composer search failed: {e}")
@@ -394,7 +392,7 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
                 if composer.is_visible(timeout=3000):
                     logger.info("✅ Found English composer")
                     composer.click(timeout=3000)
-                    page.wait_for_timeout(3000)
+                    wait_for_any_visible(page, POST_DIALOG_SELECTORS, 3000, 'composer_modal_open')
                     composer_clicked = True
             except Exception as e:
                 logger.debug(f"English composer search failed: {e}")
@@ -427,6 +425,9 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
         
         logger.info(f"Full image path: {image_full_path}")
         
+        # Track upload requests from before the file is chosen so the wait sees all of them
+        upload_tracker = RequestTracker(page, UPLOAD_REQUEST_PATTERN).start()
+        
         # Bugfix: Find the file input BEFORE clicking Foto/video button
         # Then use with_file_chooser to handle the upload properly
         logger.info("Looking for Foto/video button...")
@@ -447,7 +448,6 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
                     file_chooser.set_files(image_full_path)
                 
                 logger.info("Image uploaded successfully")
-                page.wait_for_timeout(3000)
                 upload_success = True
         except Exception as e:
             logger.debug(f"Spanish Foto/video button failed: {e}")
@@ -466,7 +466,6 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
                     file_chooser.set_files(image_full_path)
                     
                     logger.info("Image uploaded successfully")
-                    page.wait_for_timeout(3000)
                     upload_success = True
             except Exception as e:
                 logger.debug(f"English Photo/video button failed: {e}")
@@ -488,13 +487,21 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
             except Exception as debug_e:
                 logger.error(f"Failed to debug buttons: {debug_e}")
             
+            upload_tracker.stop()
             return False
         
         take_debug_screenshot(page, "05_image_uploaded", "page_posting", "Image uploaded")
         
-        # Wait for image to be processed
+        # Wait for image to be processed (upper bound: the previous 3s + 5s sleeps)
         logger.info("Waiting for image to be processed...")
-        page.wait_for_timeout(5000)
+        wait_for_any_visible(page, [
+            page.get_by_role('button', name='Siguiente'),
+            page.get_by_role('button', name='Next'),
+            page.get_by_role('button', name='Publicar', exact=True),
+            page.get_by_role('button', name='Post', exact=True),
+        ], 8000, 'image_processed')
+        upload_tracker.wait_until_quiet(5000, 'image_upload_network')
+        upload_tracker.stop()
         
         take_debug_screenshot(page, "06_before_next", "page_posting", "Before clicking Siguiente/Next")
         
@@ -508,7 +515,7 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
             if next_button.is_visible(timeout=5000):
                 logger.info("Found Siguiente button (Spanish)")
                 next_button.click(timeout=3000)
-                page.wait_for_timeout(3000)
+                wait_for_any_visible(page, _publish_buttons(page), 3000, 'publish_button_ready')
                 next_button_clicked = True
         except Exception as e:
             logger.debug(f"Spanish Siguiente button not found: {e}")
@@ -520,7 +527,7 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
                 if next_button.is_visible(timeout=5000):
                     logger.info("Found Next button (English)")
                     next_button.click(timeout=3000)
-                    page.wait_for_timeout(3000)
+                    wait_for_any_visible(page, _publish_buttons(page), 3000, 'publish_button_ready')
                     next_button_clicked = True
             except Exception as e:
                 logger.debug(f"English Next button not found: {e}")
@@ -541,7 +548,6 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
             if post_button.is_visible(timeout=5000):
                 logger.info("Found Publicar button (Spanish, exact match)")
                 post_button.click(timeout=3000)
-                page.wait_for_timeout(5000)
                 post_button_clicked = True
         except Exception as e:
             logger.debug(f"Spanish Publicar button not found: {e}")
@@ -553,7 +559,6 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
                 if post_button.is_visible(timeout=5000):
                     logger.info("Found Post button (English, exact match)")
                     post_button.click(timeout=3000)
-                    page.wait_for_timeout(5000)
                     post_button_clicked = True
             except Exception as e:
                 logger.debug(f"English Post button not found: {e}")
@@ -580,8 +585,13 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
         take_debug_screenshot(page, "08_after_first_publicar_click", "page_posting", "After clicking first Publicar")
         
         # Bugfix: Handle intermediate dialogs (event creation, etc.)
+        # Wait until either a follow-up dialog button shows up or the composer closes
+        # (upper bound: the previous 5s + 3s sleeps)
         logger.info("Checking for intermediate dialogs...")
-        page.wait_for_timeout(3000)
+        wait_for_condition(page, PUBLISH_OUTCOME_JS, 8000, 'publish_outcome', arg={
+            'texts': ['Ahora no', 'Not now', 'Realizar publicación original', 'Make original post'],
+            'dialogs': POST_DIALOG_SELECTORS,
+        })
         
         # Bugfix: NEW - Check for "Habla con las personas directamente" modal and click "Ahora no"
         # CRITICAL: This modal is a PROMO overlay - clicking "Ahora no" dismisses it and post CONTINUES TO PUBLISH
@@ -604,7 +614,7 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
                         take_debug_screenshot(page, "09_habla_personas_modal_found", "page_posting", "Habla con personas modal found")
                         dismiss_btn.click(timeout=3000)
                         logger.info("Bugfix: Clicked 'Ahora no' - promo dismissed, post continues to publish automatically")
-                        page.wait_for_timeout(3000)  # Wait for post to finish publishing
+                        wait_until_gone(page, ['div[role="dialog"]'], 3000, 'ahora_no_publish')  # Wait for post to finish publishing
                         ahora_no_modal_handled = True
                         break
                 except:
@@ -619,7 +629,7 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
                         take_debug_screenshot(page, "09_habla_personas_modal_found", "page_posting", "Habla con personas modal found")
                         dismiss_btn.click(timeout=3000)
                         logger.info("Bugfix: Clicked 'Ahora no' - promo dismissed, post continues to publish automatically")
-                        page.wait_for_timeout(3000)  # Wait for post to finish publishing
+                        wait_until_gone(page, ['div[role="dialog"]'], 3000, 'ahora_no_publish')  # Wait for post to finish publishing
                         ahora_no_modal_handled = True
                 except:
                     pass
@@ -652,7 +662,7 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
                             take_debug_screenshot(page, "09_intermediate_dialog_found", "page_posting", "Intermediate dialog found")
                             original_btn.click(timeout=3000)
                             logger.info("Clicked 'Realizar publicación original' button")
-                            page.wait_for_timeout(2000)
+                            wait_for_any_visible(page, _publish_buttons(page), 2000, 'original_post_publish_ready')
                             original_post_dialog_handled = True
                             break
                     except:
@@ -667,7 +677,7 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
                             take_debug_screenshot(page, "09_intermediate_dialog_found", "page_posting", "Intermediate dialog found")
                             original_btn.click(timeout=3000)
                             logger.info("Clicked 'Realizar publicación original' button")
-                            page.wait_for_timeout(2000)
+                            wait_for_any_visible(page, _publish_buttons(page), 2000, 'original_post_publish_ready')
                             original_post_dialog_handled = True
                     except:
                         pass
@@ -686,7 +696,7 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
                     if post_button.is_visible(timeout=5000):
                         logger.info("Found Publicar button again (Spanish)")
                         post_button.click(timeout=3000)
-                        page.wait_for_timeout(5000)
+                        wait_until_gone(page, POST_DIALOG_SELECTORS, 5000, 'second_publish')
                         second_post_clicked = True
                 except Exception as e:
                     logger.debug(f"Spanish Publicar button not found second time: {e}")
@@ -697,7 +707,7 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
                         if post_button.is_visible(timeout=5000):
                             logger.info("Found Post button again (English)")
                             post_button.click(timeout=3000)
-                            page.wait_for_timeout(5000)
+                            wait_until_gone(page, POST_DIALOG_SELECTORS, 5000, 'second_publish')
                             second_post_clicked = True
                     except Exception as e:
                         logger.debug(f"English Post button not found second time: {e}")
@@ -713,7 +723,7 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
         
         # Bugfix: VERIFY the post actually succeeded
         logger.info("Verifying post was published...")
-        page.wait_for_timeout(5000)
+        wait_until_gone(page, POST_DIALOG_SELECTORS, 5000, 'verify_dialog_closed')
         
         # Check for error dialogs or failure indicators
         try:
@@ -759,8 +769,8 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
             
             if dialog_still_open:
                 # Wait a bit more and re-check
-                logger.info("Waiting 5 more seconds and re-checking dialog status...")
-                page.wait_for_timeout(5000)
+                logger.info("Waiting up to 5 more seconds and re-checking dialog status...")
+                wait_until_gone(page, dialog_selectors, 5000, 'verify_dialog_closed_extended')
                 
                 # Re-check if any dialog is still visible
                 still_open_after_wait = False
@@ -788,8 +798,8 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
             logger.error("❌ Cannot mark as posted - dialog verification failed")
             return False
         
-        # Wait a bit more for the post to appear
-        page.wait_for_timeout(3000)
+        # Wait for the feed composer to come back (post appears in the feed)
+        wait_for_any_visible(page, COMPOSER_INDICATORS, 5000, 'composer_back')
         
         take_debug_screenshot(page, "09_final_verification", "page_posting", "Final verification")
         
@@ -798,7 +808,6 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
         # If we can still click "What's on your mind", the posting flow is complete
         try:
             logger.info("Verifying post appeared on page...")
-            page.wait_for_timeout(2000)
             
             # Check if post modal is closed (best indicator of success)
             logger.info("Step 1: Checking if post creation modal is closed...")
@@ -859,11 +868,114 @@ def post_image_to_page(page, image_path: str, page_name: str = None) -> bool:
         return True
         
     except Exception as e:
+        if upload_tracker:
+            upload_tracker.stop()
         logger.error(f"Failed to post image: {e}")
         take_debug_screenshot(page, "error_posting", "page_posting", f"Error: {e}")
         return False
 
 
+def post_with_retries(page, image_path: str, page_name: str, max_post_attempts: int = 3) -> bool:
+    """
+    Post an image to the page, retrying with a page refresh between attempts.
+    
+    Args:
+        page: Playwright Page instance (already in page mode)
+        image_path: Path to the image file to upload
+        page_name: Name of the Facebook page
+        max_post_attempts: Maximum posting attempts
+        
+    Returns:
+        True if the image was posted
+    """
+    for post_attempt in range(1, max_post_attempts + 1):
+        logger.info("="*70)
+        logger.info(f"POSTING ATTEMPT {post_attempt}/{max_post_attempts}")
+        logger.info("="*70)
+        
+        if post_image_to_page(page, image_path, page_name):
+            return True
+        
+        logger.error(f"❌ Posting attempt {post_attempt}/{max_post_attempts} failed")
+        
+        if post_attempt < max_post_attempts:
+            wait_time = 5
+            # Bugfix: Check if page is still alive before waiting
+            if is_page_alive(page):
+                logger.info(f"⏳ Waiting {wait_time} seconds before retry...")
+                try:
+                    page.wait_for_timeout(wait_time * 1000)
+                    
+                    # Refresh the page before retrying
+                    logger.info("🔄 Refreshing page before retry...")
+                    page.reload()
+                    wait_for_any_visible(page, COMPOSER_INDICATORS, 3000, 'retry_reload_composer')
+                except PlaywrightError as timeout_error:
+                    logger.error(f"❌ Bugfix: Cannot wait or reload - page closed during timeout: {str(timeout_error)[:100]}")
+                    logger.error(f"❌ Bugfix: Posting failed due to browser/page closure - cannot retry")
+                    return False
+            else:
+                logger.error(f"❌ Bugfix: Page is closed - cannot wait or retry posting")
+                logger.error(f"❌ Bugfix: Posting failed due to browser/page closure on attempt {post_attempt}")
+                return False
+        else:
+            logger.error("❌ All posting attempts exhausted")
+    
+    return False
+
+
+def ensure_ready_for_next_post(page, page_name: str, page_url: str) -> bool:
+    """
+    Feature: Cheap page-mode re-verification between posts of a batch session.
+    
+    Only falls back to the full ensure_page_mode() flow when the page composer
+    is no longer visible after returning to the feed.
+    
+    Returns:
+        True if the composer for the page is available
+    """
+    from facebook.facebook_page_manager import is_in_page_mode
+    
+    if is_in_page_mode(page, page_name):
+        logger.info("✅ Still in page mode - skipping profile switch")
+        return True
+    
+    logger.info("Composer not visible - reloading feed before re-checking page mode...")
+    try:
+        page.goto('https://www.facebook.com/', wait_until='domcontentloaded', timeout=60000)
+        wait_for_any_visible(page, COMPOSER_INDICATORS, 4000, 'home_loaded')
+    except PlaywrightTimeoutError as e:
+        logger.warning(f"Feed reload timed out: {e}")
+    
+    if is_in_page_mode(page, page_name):
+        logger.info("✅ Page mode confirmed after feed reload")
+        return True
+    
+    logger.info("Page mode lost - switching profile again...")
+    return ensure_page_mode(page, page_name, page_url)
+
+
+def log_latency_report(setup_timings: dict, post_timings: list):
+    """Feature: Log the session setup cost and the per-post latency breakdown."""
+    logger.info("="*70)
+    logger.info("POSTING SESSION LATENCY")
+    logger.info("="*70)
+    setup_total = sum(setup_timings.values())
+    logger.info("Session setup: " + ", ".join(f"{k}={v:.1f}s" for k, v in setup_timings.items()) + f" (total {setup_total:.1f}s)")
+    
+    for timing in post_timings:
+        status = "✅" if timing['success'] else "❌"
+        logger.info(
+            f"{status} Post {timing['message_id']}: gap={timing['gap']:.1f}s select={timing['select']:.2f}s "
+            f"page_mode={timing['page_mode']:.1f}s post={timing['post']:.1f}s mark={timing['mark']:.2f}s"
+        )
+    
+    posted = [t for t in post_timings if t['success']]
+    if posted:
+        work = sum(t['select'] + t['page_mode'] + t['post'] + t['mark'] for t in posted)
+        logger.info(f"Posted {len(posted)} image(s): {(setup_total + work) / len(posted):.1f}s per post including setup (gaps excluded)")
+
+
 def main():
     """Main execution function."""
     # Debug is controlled via database settings at http://YOUR_SERVER_IP/settings
@@ -960,6 +1072,15 @@ def main():
         logger.info(f"Found approved image: ID {image_data['id']}")
         logger.info(f"Image path: {image_data['image_path']}")
         
+        # Feature: Batch posting session - post up to POST_BATCH_SIZE queued images per browser launch
+        # Manual runs for a specific image always post exactly one
+        batch_size = 1 if specific_image_id else max(1, config.POST_BATCH_SIZE)
+        if batch_size > 1:
+            logger.info(f"Batch posting session: up to {batch_size} images, gap {config.POST_BATCH_GAP_MIN}-{config.POST_BATCH_GAP_MAX}s")
+        setup_timings = {}
+        post_timings = []
+        phase_start = time.monotonic()
+        
         # Initialize database
         initialize_database()
         
@@ -977,7 +1098,10 @@ def main():
                 logger.info(f"Using proxy: {config.PROXY_CONFIG['server']}")
             
             browser = p.firefox.launch(**firefox_options)
+            metrics.BROWSER_LAUNCHES.inc(browser='firefox')
             logger.info("Browser launched")
+            setup_timings['launch'] = time.monotonic() - phase_start
+            phase_start = time.monotonic()
             
             try:
                 # Create browser context with auth state
@@ -990,6 +1114,7 @@ def main():
                     logger.info("No saved session - will need to login")
                     context = create_browser_context(browser)
                 
+                metrics.track_network_bytes(context)
                 page = context.new_page()
                 
                 # Verify login
@@ -1015,6 +1140,8 @@ def main():
                     logger.info("Login successful")
                 else:
                     logger.info("Already logged in")
+                setup_timings['login'] = time.monotonic() - phase_start
+                phase_start = time.monotonic()
                 
                 # Bugfix: Check if we're already logged in as the page, or switch if needed
                 # The auth state might already have us logged in as Miltoner!
@@ -1033,7 +1160,7 @@ def main():
                         logger.info(f"Navigation attempt {nav_attempt}/{max_nav_retries}...")
                         # Bugfix: Increase timeout from 30s (default) to 60s
                         page.goto('https://www.facebook.com/', wait_until='domcontentloaded', timeout=60000)
-                        page.wait_for_timeout(4000)  # Give it time to load
+                        wait_for_any_visible(page, COMPOSER_INDICATORS + ['div[role="main"]'], 4000, 'home_loaded')
                         nav_success = True
                         logger.info(f"✅ Navigation successful on attempt {nav_attempt}")
                         break
@@ -1057,6 +1184,8 @@ def main():
                 
                 logger.info(f"Current URL: {page.url}")
                 take_debug_screenshot(page, "01_home_loaded", "page_posting", "Home page loaded")
+                setup_timings['navigate'] = time.monotonic() - phase_start
+                phase_start = time.monotonic()
                 
                 # Bugfix: Check if composer shows page name (means we're already logged in as page)
                 logger.info("Checking if already logged in as page...")
@@ -1082,64 +1211,95 @@ def main():
                             return 1
                         
                         logger.info("✅ Successfully switched to page profile")
-                        page.wait_for_timeout(3000)
+                        wait_for_any_visible(page, page_mode_composers(page, page_name), 3000, 'after_switch_composer')
                         take_debug_screenshot(page, "02_after_switch", "page_posting", "After profile switch")
                         
                 except Exception as e:
                     logger.warning(f"Could not check composer text: {e}")
                     logger.info("Will attempt to post anyway...")
                 
+                setup_timings['page_mode'] = time.monotonic() - phase_start
+                
                 # Post the image (pass page_name for composer detection)
                 # Bugfix: Add retry logic for posting failures
-                max_post_attempts = 3
-                post_success = False
-                
-                for post_attempt in range(1, max_post_attempts + 1):
+                # Select/page-mode times of follow-up posts are measured before the next iteration
+                gap = select_time = page_mode_time = 0.0
+                while True:
+                    timing = {
+                        'message_id': image_data['id'], 'gap': gap, 'select': select_time,
+                        'page_mode': page_mode_time, 'post': 0.0, 'mark': 0.0, 'success': False
+                    }
+                    post_timings.append(timing)
+                    
+                    phase_start = time.monotonic()
+                    success = post_with_retries(page, image_data['upload_path'], page_name)
+                    timing['post'] = time.monotonic() - phase_start
+                    metrics.POST_SECONDS.observe(timing['post'], platform='facebook_page')
+                    metrics.POSTS_PUBLISHED.inc(platform='facebook_page', status='success' if success else 'failed')
+                    
+                    if not success:
+                        logger.error("Failed to post image after all retry attempts")
+                        break
+                    
+                    # Mark as posted
+                    phase_start = time.monotonic()
+                    mark_as_posted(image_data['id'])
+                    timing['mark'] = time.monotonic() - phase_start
+                    timing['success'] = True
                     logger.info("="*70)
-                    logger.info(f"POSTING ATTEMPT {post_attempt}/{max_post_attempts}")
+                    logger.info("✅ POST SUCCESSFUL")
                     logger.info("="*70)
                     
-                    success = post_image_to_page(page, image_data['image_path'], page_name)
+                    if len(post_timings) >= batch_size:
+                        break
+                    
+                    # Randomized gap between posts of the same session
+                    gap = random.uniform(config.POST_BATCH_GAP_MIN, config.POST_BATCH_GAP_MAX)
+                    logger.info(f"⏳ Waiting {gap:.0f}s before next post ({len(post_timings)}/{batch_size} posted)...")
+                    time.sleep(gap)
                     
-                    if success:
-                        # Mark as posted
-                        mark_as_posted(image_data['id'])
-                        logger.info("="*70)
-                        logger.info("✅ POST SUCCESSFUL")
-                        logger.info("="*70)
-                        post_success = True
+                    if not is_manual_run:
+                        settings = get_posting_settings() or settings
+                        if not settings['enabled']:
+                            logger.info("Page posting was disabled during the session - stopping batch")
+                            break
+                        if not is_within_operating_hours(
+                            settings.get('posting_start_hour', 7),
+                            settings.get('posting_start_period', 'AM'),
+                            settings.get('posting_stop_hour', 1),
+                            settings.get('posting_stop_period', 'AM')
+                        ):
+                            logger.info("⏸️  Operating hours ended - stopping batch")
+                            break
+                    
+                    phase_start = time.monotonic()
+                    next_image = get_next_approved_image()
+                    select_time = time.monotonic() - phase_start
+                    if not next_image:
+                        logger.info("Queue empty - stopping batch")
+                        break
+                    image_data = next_image
+                    logger.info(f"Next approved image: ID {image_data['id']}")
+                    
+                    phase_start = time.monotonic()
+                    ready = ensure_ready_for_next_post(page, page_name, page_url)
+                    page_mode_time = time.monotonic() - phase_start
+                    if not ready:
+                        logger.error("❌ Could not restore page mode - stopping batch")
+                        take_debug_screenshot(page, "ERROR_batch_page_mode", "page_posting", "Page mode lost during batch")
                         break
-                    else:
-                        logger.error(f"❌ Posting attempt {post_attempt}/{max_post_attempts} failed")
-                        
-                        if post_attempt < max_post_attempts:
-                            wait_time = 5
-                            # Bugfix: Check if page is still alive before waiting
-                            if is_page_alive(page):
-                                logger.info(f"⏳ Waiting {wait_time} seconds before retry...")
-                                try:
-                                    page.wait_for_timeout(wait_time * 1000)
-                                    
-                                    # Refresh the page before retrying
-                                    logger.info("🔄 Refreshing page before retry...")
-                                    page.reload()
-                                    page.wait_for_timeout(3000)
-                                except PlaywrightError as timeout_error:
-                                    logger.error(f"❌ Bugfix: Cannot wait or reload - page closed during timeout: {str(timeout_error)[:100]}")
-                                    logger.error(f"❌ Bugfix: Posting failed due to browser/page closure - cannot retry")
-                                    return 1
-                            else:
-                                logger.error(f"❌ Bugfix: Page is closed - cannot wait or retry posting")
-                                logger.error(f"❌ Bugfix: Posting failed due to browser/page closure on attempt {post_attempt}")
-                                return 1
-                        else:
-                            logger.error("❌ All posting attempts exhausted")
                 
-                if post_success:
-                    return 0
-                else:
-                    logger.error("Failed to post image after all retry attempts")
-                    return 1
+                log_latency_report(setup_timings, post_timings)
+                log_wait_summary()
+                
+                # Exit 0 when anything was posted: run_page_poster.sh only records the
+                # last post time on success, and a partly failed batch still posted.
+                # Failed posts are reported in the log and posts_published_total{status="failed"}.
+                posted = sum(1 for timing in post_timings if timing['success'])
+                failed = len(post_timings) - posted
+                if failed:
+                    logger.warning(f"⚠️ Batch finished with {failed} failed post(s) ({posted} posted)")
+                return 0 if posted else 1
                 
             finally:
                 logger.info("Closing browser...")
@@ -1157,6 +1317,12 @@ def main():
 
 
 if __name__ == "__main__":
-    exit_code = main()
+    metrics.start_job('facebook_page_poster')
+    exit_code = 1
+    try:
+        exit_code = profiling.run(main, 'facebook_page_poster')
+    finally:
+        # Also written when main() raises, so failures reach the textfile
+        metrics.finish_job(success=exit_code == 0)
     sys.exit(exit_code)
 
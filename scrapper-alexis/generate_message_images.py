@@ -18,6 +18,9 @@ sys.path.insert(0, str(Path(__file__).parent))
 import json
 import logging
 import re
+import time
+import sqlite3
+import argparse
 import requests
 import hashlib
 from typing import Dict, List, Any, Optional
@@ -25,6 +28,8 @@ from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeo
 
 from core.database import get_database, initialize_database
 from core.debug_helper import log_debug_info, log_success, log_error
+from utils.image_encoder import encode_message_image
+from utils import metrics, profiling
 import config
 
 # Configuration - use proxy from config (CRITICAL for Twitter avatar downloads!)
@@ -320,8 +325,229 @@ def generate_message_image(page, message_data: Dict[str, Any], use_proxy: bool =
         return None
 
 
+def launch_renderer(p):
+    """
+    Launch Firefox for image rendering.
+    
+    Args:
+        p: Playwright instance from sync_playwright()
+        
+    Returns:
+        Tuple of (browser, context, page)
+    """
+    # Create browser with proxy (use Firefox for VPS stability)
+    logger.info("Launching Firefox for image generation...")
+    
+    firefox_options = {
+        'headless': config.HEADLESS,
+        'slow_mo': 300
+    }
+    
+    # Add proxy configuration
+    if PROXY_CONFIG:
+        firefox_options['proxy'] = PROXY_CONFIG
+        logger.info(f"Using proxy: {PROXY_CONFIG['server']}")
+    
+    browser = p.firefox.launch(**firefox_options)
+    metrics.BROWSER_LAUNCHES.inc(browser='firefox')
+    logger.info("Firefox launched successfully")
+    
+    context = browser.new_context()
+    metrics.track_network_bytes(context)
+    page = context.new_page()
+    return browser, context, page
+
+
+def new_run_totals() -> Dict[str, int]:
+    """Counters shared by batch and watch mode for the final report."""
+    return {
+        'successful': 0,
+        'failed': 0,
+        # Feature: Byte totals for the encoding stage report
+        'bytes_original': 0,
+        'bytes_optimized': 0,
+        'bytes_encoded': 0,
+    }
+
+
+def render_and_record(page, db, message: Dict[str, Any], totals: Dict[str, int]) -> bool:
+    """
+    Render, encode and record the image for a single message.
+    
+    Args:
+        page: Warm Playwright page used for rendering
+        db: DatabaseManager instance
+        message: Message dictionary (id, message_text, avatar_url, posted_at, approved_at)
+        totals: Run counters updated in place
+        
+    Returns:
+        True if the image was generated and recorded
+    """
+    message_id = message['id']
+    
+    # Generate image
+    with metrics.RENDER_SECONDS.time():
+        image_path = generate_message_image(page, message, use_proxy=True)
+    
+    if not image_path:
+        metrics.IMAGES_RENDERED.inc(status='failed')
+        totals['failed'] += 1
+        print(f"ERROR: Failed to generate image for message {message_id}")
+        return False
+    
+    # Encoding stage: optimized PNG + optional WebP/JPEG + thumbnail
+    encoded = {'encoded_image_path': None, 'thumbnail_path': None}
+    try:
+        encoded = encode_message_image(
+            image_path,
+            output_format=config.IMAGE_ENCODE_FORMAT,
+            quality=config.IMAGE_ENCODE_QUALITY,
+            max_bytes=config.IMAGE_MAX_BYTES,
+            thumbnail_width=config.IMAGE_THUMBNAIL_WIDTH
+        )
+        totals['bytes_original'] += encoded['original_bytes']
+        totals['bytes_optimized'] += encoded['optimized_bytes']
+        totals['bytes_encoded'] += encoded['encoded_bytes']
+    except Exception as e:
+        # Non-critical: keep the original PNG
+        logger.warning(f"Image encoding failed for message {message_id}, keeping original PNG: {e}")
+    
+    # Update database
+    success = db.mark_image_generated(
+        message_id,
+        image_path,
+        encoded_image_path=encoded['encoded_image_path'],
+        thumbnail_path=encoded['thumbnail_path']
+    )
+    if success:
+        metrics.IMAGES_RENDERED.inc(status='success')
+        totals['successful'] += 1
+        print(f"SUCCESS: Message {message_id} image generated: {image_path}")
+        return True
+    
+    metrics.IMAGES_RENDERED.inc(status='failed')
+    totals['failed'] += 1
+    print(f"ERROR: Failed to update database for message {message_id}")
+    return False
+
+
+def print_encoding_savings(totals: Dict[str, int]):
+    """Print byte savings of the encoding stage for this run."""
+    bytes_original = totals['bytes_original']
+    if not bytes_original:
+        return
+    saved = bytes_original - totals['bytes_optimized']
+    print(f"\nEncoding Savings:")
+    print(f"  Original PNG: {bytes_original / 1024:.1f} KB")
+    print(f"  Optimized PNG: {totals['bytes_optimized'] / 1024:.1f} KB (saved {saved / 1024:.1f} KB, {saved / bytes_original * 100:.1f}%)")
+    if totals['bytes_encoded']:
+        print(f"  {config.IMAGE_ENCODE_FORMAT.upper()}: {totals['bytes_encoded'] / 1024:.1f} KB ({totals['bytes_encoded'] / bytes_original * 100:.1f}% of original)")
+
+
+def watch_approved_messages(db, poll_interval: float = 2.0, sweep_interval: float = 300.0) -> int:
+    """
+    Feature: Watch mode - keep one renderer warm and render messages as they get approved.
+    
+    Change detection is cheap: a long-lived connection polls PRAGMA data_version,
+    which only changes when another connection (e.g. the web app approving a
+    message) commits. On change, only messages approved at or after the
+    high-water mark are queried. A periodic full sweep picks up stragglers
+    (approvals with back-dated/NULL approved_at, previously failed renders).
+    
+    Args:
+        db: DatabaseManager instance
+        poll_interval: Seconds between data_version probes
+        sweep_interval: Seconds between full sweeps of the approval queue
+        
+    Returns:
+        Exit code (0 when stopped cleanly)
+    """
+    totals = new_run_totals()
+    watch_conn = sqlite3.connect(db.db_path)
+    last_version = None
+    high_water = None
+    last_sweep = 0.0
+    failed_ids = set()
+    
+    print(f"Watching for approved messages (poll {poll_interval}s, full sweep every {sweep_interval:.0f}s) - Ctrl+C to stop")
+    
+    try:
+        with sync_playwright() as p:
+            browser, context, page = launch_renderer(p)
+            
+            while True:
+                version = watch_conn.execute('PRAGMA data_version').fetchone()[0]
+                now = time.monotonic()
+                full_sweep = now - last_sweep >= sweep_interval
+                
+                if version == last_version and not full_sweep:
+                    time.sleep(poll_interval)
+                    continue
+                
+                last_version = version
+                if full_sweep:
+                    last_sweep = now
+                    failed_ids.clear()
+                    pending = db.get_approved_messages_without_images()
+                else:
+                    pending = db.get_approved_messages_without_images(approved_since=high_water)
+                
+                for message in pending:
+                    if message['id'] in failed_ids:
+                        continue
+                    
+                    print(f"\n--- Approved message {message['id']} ---")
+                    started = time.monotonic()
+                    
+                    # Relaunch the renderer if the browser died since the last message
+                    if page.is_closed():
+                        logger.warning("Renderer page closed - relaunching Firefox")
+                        metrics.BROWSER_CRASHES.inc()
+                        try:
+                            browser.close()
+                        except Exception:
+                            pass
+                        browser, context, page = launch_renderer(p)
+                    
+                    if render_and_record(page, db, message, totals):
+                        logger.info(f"Rendered message {message['id']} in {time.monotonic() - started:.1f}s")
+                    else:
+                        failed_ids.add(message['id'])
+                    
+                    if message['approved_at'] and (high_water is None or message['approved_at'] > high_water):
+                        high_water = message['approved_at']
+                
+                if pending:
+                    metrics.write_textfile()
+                
+                time.sleep(poll_interval)
+    
+    except KeyboardInterrupt:
+        print("\nWatch mode stopped")
+    except Exception as e:
+        logger.error(f"Critical error in watch mode: {e}")
+        return 1
+    finally:
+        watch_conn.close()
+        print(f"Watch mode totals: {totals['successful']} generated, {totals['failed']} failed")
+        print_encoding_savings(totals)
+    
+    return 0
+
+
 def main():
     """Main function to generate images for posted messages."""
+    parser = argparse.ArgumentParser(description='Generate images for approved messages')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and render messages as soon as they are approved')
+    parser.add_argument('--poll-interval', type=float, default=2.0,
+                        help='Watch mode: seconds between database change checks (default: 2)')
+    parser.add_argument('--sweep-interval', type=float, default=300.0,
+                        help='Watch mode: seconds between full queue sweeps (default: 300)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Watch mode: serve Prometheus metrics on this local port (default: METRICS_PORT)')
+    args = parser.parse_args()
+    
     print("MESSAGE IMAGE GENERATOR")
     print("="*50)
     
@@ -331,43 +557,22 @@ def main():
     # Initialize database
     db = initialize_database(db_path)
     
+    if args.watch:
+        metrics.serve(args.metrics_port)
+        return watch_approved_messages(db, args.poll_interval, args.sweep_interval)
+    
     # Check if specific MESSAGE_ID is provided via environment variable
     specific_message_id = os.getenv('MESSAGE_ID')
     
     # Get ALL APPROVED messages that need images (batch processing)
     # Only generate images for messages that are approved_for_posting = true and image_generated = false/null
-    messages_without_images = []
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-        
-        if specific_message_id:
-            # Generate image for specific message only
-            logger.info(f"Generating image for specific message ID: {specific_message_id}")
-            cursor.execute("""
-                SELECT id, message_text, avatar_url, posted_at, approved_at
-                FROM messages
-                WHERE id = ?
-                AND approved_for_posting = 1
-                AND (image_generated = 0 OR image_generated IS NULL)
-            """, (int(specific_message_id),))
-        else:
-            # Batch process all approved messages without images
-            cursor.execute("""
-                SELECT id, message_text, avatar_url, posted_at, approved_at
-                FROM messages
-                WHERE approved_for_posting = 1
-                AND (image_generated = 0 OR image_generated IS NULL)
-                ORDER BY approved_at ASC
-            """)
-        
-        for row in cursor.fetchall():
-            messages_without_images.append({
-                'id': row[0],
-                'message_text': row[1],
-                'avatar_url': row[2],
-                'posted_at': row[3],
-                'approved_at': row[4]
-            })
+    if specific_message_id:
+        # Generate image for specific message only
+        logger.info(f"Generating image for specific message ID: {specific_message_id}")
+        messages_without_images = db.get_approved_messages_without_images(message_id=int(specific_message_id))
+    else:
+        # Batch process all approved messages without images
+        messages_without_images = db.get_approved_messages_without_images()
     
     if not messages_without_images:
         if specific_message_id:
@@ -381,51 +586,17 @@ def main():
     else:
         print(f"Found {len(messages_without_images)} messages that need images")
     
-    successful_images = 0
-    failed_images = 0
+    totals = new_run_totals()
     
     try:
         with sync_playwright() as p:
-            # Create browser with proxy (use Firefox for VPS stability)
-            logger.info("Launching Firefox for image generation...")
-            
-            firefox_options = {
-                'headless': config.HEADLESS,
-                'slow_mo': 300
-            }
-            
-            # Add proxy configuration
-            if PROXY_CONFIG:
-                firefox_options['proxy'] = PROXY_CONFIG
-                logger.info(f"Using proxy: {PROXY_CONFIG['server']}")
-            
-            browser = p.firefox.launch(**firefox_options)
-            logger.info("Firefox launched successfully")
-            
-            context = browser.new_context()
-            page = context.new_page()
+            browser, context, page = launch_renderer(p)
             
             print(f"Processing {len(messages_without_images)} messages...")
             
             for i, message in enumerate(messages_without_images, 1):
                 print(f"\n--- Message {i}/{len(messages_without_images)} ---")
-                message_id = message['id']
-                
-                # Generate image
-                image_path = generate_message_image(page, message, use_proxy=True)
-                
-                if image_path:
-                    # Update database
-                    success = db.mark_image_generated(message_id, image_path)
-                    if success:
-                        successful_images += 1
-                        print(f"SUCCESS: Message {message_id} image generated: {image_path}")
-                    else:
-                        failed_images += 1
-                        print(f"ERROR: Failed to update database for message {message_id}")
-                else:
-                    failed_images += 1
-                    print(f"ERROR: Failed to generate image for message {message_id}")
+                render_and_record(page, db, message, totals)
                 
                 # Small delay between images
                 page.wait_for_timeout(1000)
@@ -442,9 +613,10 @@ def main():
     print("IMAGE GENERATION COMPLETE")
     print("="*50)
     print(f"Total messages processed: {len(messages_without_images)}")
-    print(f"Successful images: {successful_images}")
-    print(f"Failed images: {failed_images}")
+    print(f"Successful images: {totals['successful']}")
+    print(f"Failed images: {totals['failed']}")
     print(f"Images saved in: {IMAGES_DIR}")
+    print_encoding_savings(totals)
     
     # Show image stats
     image_stats = db.get_message_image_stats()
@@ -454,11 +626,17 @@ def main():
     print(f"  Images pending: {image_stats['images_pending']}")
     print("="*50)
     
-    return 0 if failed_images == 0 else 1
+    return 0 if totals['failed'] == 0 else 1
 
 
 if __name__ == "__main__":
-    exit_code = main()
+    metrics.start_job('generate_message_images')
+    exit_code = 1
+    try:
+        exit_code = profiling.run(main, 'generate_message_images')
+    finally:
+        # Also written when main() raises, so failures reach the textfile
+        metrics.finish_job(success=exit_code == 0)
     if exit_code == 0:
         print("SUCCESS: All message images generated!")
     else:
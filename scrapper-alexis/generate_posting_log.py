@@ -4,12 +4,24 @@ Generate a clean log of posted messages and their images.
 Simple format focused on what you need to see.
 """
 
-import sqlite3
 import sys
 import os
 from datetime import datetime
 from pathlib import Path
 import config
+from core.database import get_database
+
+IMAGES_DIR = Path(__file__).parent / 'data' / 'message_images'
+
+
+def list_image_files(images_dir: Path = IMAGES_DIR) -> set:
+    """File names in the images directory, read with a single scandir."""
+    try:
+        with os.scandir(images_dir) as entries:
+            return {entry.name for entry in entries if entry.is_file()}
+    except FileNotFoundError:
+        return set()
+
 
 def generate_posting_log():
     """Generate clean posting log."""
@@ -17,12 +29,17 @@ def generate_posting_log():
         print(f"ERROR: Laravel database not found at: {config.DATABASE_PATH}")
         sys.exit(1)
     
-    conn = sqlite3.connect(config.DATABASE_PATH)
-    cursor = conn.cursor()
+    db = get_database()
+    
+    # All counters in one aggregate query, image files in one directory scan
+    counters = db.get_posting_counters()
+    image_files = list_image_files()
     
     log_file = Path('logs/message_posting_log.txt')
     
-    with open(log_file, 'w', encoding='utf-8') as f:
+    with db.get_connection() as conn, open(log_file, 'w', encoding='utf-8') as f:
+        cursor = conn.cursor()
+        
         # Header
         f.write("=" * 80 + "\n")
         f.write("POSTED MESSAGES & IMAGES LOG\n")
@@ -39,15 +56,14 @@ def generate_posting_log():
             ORDER BY posted_at DESC
         """)
         
-        posted = cursor.fetchall()
+        f.write(f"TOTAL POSTED: {counters['posted_with_url']}\n\n")
         
-        f.write(f"TOTAL POSTED: {len(posted)}\n\n")
-        
-        for msg in posted:
+        # Stream rows instead of loading them all
+        for msg in cursor:
             msg_id, text, url, img_path, posted_at = msg
             
-            # Check if image exists
-            img_status = "✅" if img_path and Path(img_path).exists() else "❌ MISSING"
+            # Check if image exists (images are served from IMAGES_DIR by file name)
+            img_status = "✅" if img_path and Path(img_path).name in image_files else "❌ MISSING"
             
             f.write(f"ID {msg_id} | {posted_at}\n")
             f.write(f"  Message: {text}\n")
@@ -63,41 +79,12 @@ def generate_posting_log():
         f.write("STATISTICS\n")
         f.write("=" * 80 + "\n\n")
         
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN posted_to_twitter = 1 AND post_url != 'SKIPPED_QUALITY_FILTER' THEN 1 ELSE 0 END) as posted,
-                SUM(CASE WHEN post_url = 'SKIPPED_QUALITY_FILTER' THEN 1 ELSE 0 END) as skipped,
-                SUM(CASE WHEN posted_to_twitter = 0 THEN 1 ELSE 0 END) as pending
-            FROM messages
-        """)
-        total, posted, skipped, pending = cursor.fetchone()
-        
-        # Count images
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM messages 
-            WHERE posted_to_twitter = 1 
-            AND post_url != 'SKIPPED_QUALITY_FILTER'
-            AND image_generated = 1
-        """)
-        with_images = cursor.fetchone()[0]
-        
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM messages 
-            WHERE posted_to_twitter = 1 
-            AND post_url != 'SKIPPED_QUALITY_FILTER'
-            AND (image_generated = 0 OR image_generated IS NULL)
-        """)
-        missing_images = cursor.fetchone()[0]
-        
-        f.write(f"Total messages in database: {total}\n")
-        f.write(f"Successfully posted: {posted}\n")
-        f.write(f"  - With images: {with_images}\n")
-        f.write(f"  - Missing images: {missing_images}\n")
-        f.write(f"Skipped (quality filter): {skipped}\n")
-        f.write(f"Pending (not posted): {pending}\n")
+        f.write(f"Total messages in database: {counters['total_messages']}\n")
+        f.write(f"Successfully posted: {counters['posted_with_images'] + counters['posted_missing_images']}\n")
+        f.write(f"  - With images: {counters['posted_with_images']}\n")
+        f.write(f"  - Missing images: {counters['posted_missing_images']}\n")
+        f.write(f"Skipped (quality filter): {counters['skipped_quality']}\n")
+        f.write(f"Pending (not posted): {counters['unposted']}\n")
         
         # Next in queue
         f.write("\n" + "=" * 80 + "\n")
@@ -112,8 +99,7 @@ def generate_posting_log():
             LIMIT 10
         """)
         
-        next_msgs = cursor.fetchall()
-        for msg in next_msgs:
+        for msg in cursor:
             msg_id, text, length = msg
             text_short = text[:60] + '...' if len(text) > 60 else text
             f.write(f"ID {msg_id} ({length} chars): {text_short}\n")
@@ -122,7 +108,6 @@ def generate_posting_log():
         f.write("END OF LOG\n")
         f.write("=" * 80 + "\n")
     
-    conn.close()
     return log_file
 
 if __name__ == "__main__":
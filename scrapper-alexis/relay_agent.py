@@ -18,13 +18,15 @@ from core.exceptions import (
     NavigationError,
     ExtractionError
 )
-from utils.browser_config import create_browser_context
+from utils.browser_config import create_browser_context, FIREFOX_USER_PREFS
 from facebook.facebook_auth import check_auth_state, verify_logged_in, login_facebook_with_retry, save_auth_state
 from facebook.facebook_extractor import navigate_to_message, extract_message_text_with_database
 from core.debug_helper import DebugSession
 from core.database import get_database, initialize_database
+from core import db_writer
 from core.profile_manager import get_profile_manager
 from core.message_deduplicator import get_message_deduplicator
+from utils import run_trace, metrics, profiling
 
 # Create logs directory
 logs_dir = Path('logs')
@@ -49,6 +51,9 @@ def main():
     # Initialize debug session for this run (creates per-run folder)
     # Debug is controlled via database settings at http://YOUR_SERVER_IP/settings
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    run_trace.start_run('relay_agent')
+    metrics.start_job('relay_agent')
+    run_succeeded = False
     debug_session = DebugSession(f"multi_profile_scraper_{timestamp}", script_type="facebook")
     
     try:
@@ -62,7 +67,8 @@ def main():
         
         # Sync profiles from environment variables to database
         logger.info("Syncing profiles from environment variables...")
-        profiles = profile_manager.sync_profiles_to_database()
+        with run_trace.span('relay.sync_profiles'):
+            profiles = profile_manager.sync_profiles_to_database()
         
         if not profiles:
             logger.error("No profiles found! Please check your FACEBOOK_PROFILES environment variable.")
@@ -98,31 +104,7 @@ def main():
                 firefox_options = {
                     'headless': config.HEADLESS,
                     'slow_mo': config.SLOW_MO if not config.HEADLESS else 0,
-                    'firefox_user_prefs': {
-                        # Disable accessibility features (fixes DBus errors on servers)
-                        'accessibility.force_disabled': 1,
-                        'accessibility.handler.enabled': False,
-                        'accessibility.support.url': '',
-                        # Disable features that can hang Firefox
-                        'datareporting.policy.dataSubmissionEnabled': False,
-                        'datareporting.healthreport.uploadEnabled': False,
-                        'toolkit.telemetry.enabled': False,
-                        'toolkit.telemetry.unified': False,
-                        'toolkit.telemetry.archive.enabled': False,
-                        # Performance optimizations for server
-                        'browser.cache.disk.enable': False,
-                        'browser.cache.memory.enable': True,
-                        'browser.cache.offline.enable': False,
-                        'network.http.use-cache': False,
-                        # Disable unnecessary features
-                        'extensions.pocket.enabled': False,
-                        'browser.safebrowsing.downloads.enabled': False,
-                        'browser.safebrowsing.malware.enabled': False,
-                        'browser.safebrowsing.phishing.enabled': False,
-                        # Media settings
-                        'media.autoplay.default': 5,
-                        'media.autoplay.blocking_policy': 2,
-                    }
+                    'firefox_user_prefs': FIREFOX_USER_PREFS,
                 }
                 
                 # Add proxy configuration if available (CRITICAL!)
@@ -132,7 +114,9 @@ def main():
                 else:
                     logger.warning("⚠️  No proxy configured - this may cause issues!")
                 
-                browser = p.firefox.launch(**firefox_options)
+                with run_trace.span('relay.browser_launch', browser='firefox'):
+                    browser = p.firefox.launch(**firefox_options)
+                metrics.BROWSER_LAUNCHES.inc(browser='firefox')
                 logger.info(f"Firefox launched (headless={config.HEADLESS}) with server-optimized preferences")
             else:
                 logger.info("Launching Chromium...")
@@ -166,7 +150,9 @@ def main():
                 else:
                     logger.warning("⚠️  No proxy configured - this may cause issues!")
                 
-                browser = p.chromium.launch(**launch_options)
+                with run_trace.span('relay.browser_launch', browser='chromium'):
+                    browser = p.chromium.launch(**launch_options)
+                metrics.BROWSER_LAUNCHES.inc(browser='chromium')
                 logger.info(f"Chromium launched (headless={config.HEADLESS}) with crash-resistant flags")
             
             try:
@@ -187,11 +173,13 @@ def main():
                     logger.info("No saved session file - will need to login")
                     context = create_browser_context(browser)
                 
+                metrics.track_network_bytes(context)
                 page = context.new_page()
                 
                 # Add page crash and error handlers
                 def handle_page_crash(page):
                     logger.error("⚠️  PAGE CRASHED - Attempting recovery...")
+                    metrics.BROWSER_CRASHES.inc()
                 
                 def handle_page_error(error):
                     logger.error(f"⚠️  PAGE ERROR: {error}")
@@ -257,94 +245,104 @@ def main():
                     # This ensures accurate statistics even when profiles fail due to duplicates
                     profiles_scraped += 1
                     
-                    try:
-                        # Navigate to profile
-                        navigate_to_message(page, profile['url'])
+                    with run_trace.span('relay.profile', username=profile['username'], profile_id=profile['id']):
+                        try:
+                            # Navigate to profile
+                            navigate_to_message(page, profile['url'])
+                            
+                            # Extract messages with database integration
+                            messages, extraction_stats = extract_message_text_with_database(
+                                page, profile['id'], max_messages=20  # Back to 20 messages per profile
+                            )
+                            
+                            # Update totals
+                            total_messages_found += extraction_stats['total_scraped']
+                            total_new_messages += extraction_stats['new_messages']
+                            metrics.MESSAGES_SCRAPED.inc(extraction_stats['total_scraped'], profile=profile['username'])
+                            metrics.MESSAGES_NEW.inc(extraction_stats['new_messages'], profile=profile['username'])
+                            metrics.MESSAGES_DUPLICATE.inc(extraction_stats['duplicates_found'], profile=profile['username'])
+                            metrics.PROFILES_SCRAPED.inc(status='ok')
+                            
+                            if extraction_stats['stopped_due_to_duplicate']:
+                                profiles_stopped_due_to_duplicates += 1
+                                logger.info(f"✅ Profile {profile['username']}: Stopped due to duplicate - all new content processed")
+                            else:
+                                logger.info(f"✅ Profile {profile['username']}: Completed scraping")
+                            
+                            logger.info(f"  📊 Profile Stats:")
+                            logger.info(f"    - Messages found: {extraction_stats['total_scraped']}")
+                            logger.info(f"    - New messages: {extraction_stats['new_messages']}")
+                            logger.info(f"    - Duplicates: {extraction_stats['duplicates_found']}")
+                            logger.info(f"    - Quality filtered: {extraction_stats['quality_filtered']}")
+                            
+                            # Mark profile as scraped
+                            profile_manager.mark_profile_scraped(profile['id'])
+                            
+                            # Wait between profiles to be respectful
+                            if i < len(profiles):  # Don't wait after the last profile
+                                logger.info("⏳ Waiting 30 seconds before next profile...")
+                                # Bugfix: Wait in chunks to detect browser closure early
+                                # Split 30 seconds into 6× 5-second chunks with browser checks
+                                with run_trace.span('relay.inter_profile_wait'):
+                                    try:
+                                        for wait_chunk in range(6):
+                                            from facebook.facebook_auth import is_page_alive
+                                            if not is_page_alive(page):
+                                                logger.error(f"❌ Bugfix: Browser closed during inter-profile wait (chunk {wait_chunk + 1}/6)")
+                                                logger.error("   ⏭️  Stopping profile iteration - browser is closed")
+                                                break
+                                            page.wait_for_timeout(5000)  # 5 seconds × 6 = 30 seconds total
+                                    except Exception as wait_error:
+                                        error_msg = str(wait_error).lower()
+                                        if 'closed' in error_msg or 'target' in error_msg:
+                                            logger.error(f"❌ Bugfix: Browser closed during inter-profile wait: {str(wait_error)[:100]}")
+                                            break  # Exit profile loop
                         
-                        # Extract messages with database integration
-                        messages, extraction_stats = extract_message_text_with_database(
-                            page, profile['id'], max_messages=20  # Back to 20 messages per profile
-                        )
+                        except NavigationError as e:
+                            metrics.PROFILES_SCRAPED.inc(status='navigation_error')
+                            logger.error(f"❌ Navigation error for profile {profile['username']}: {e}")
+                            logger.error(f"   🔗 Profile URL: {profile['url']}")
+                            logger.error(f"   ⚠️  This share URL may be invalid or inaccessible")
+                            logger.error(f"   💡 Check the URL at {profile['url']} in your browser")
+                            logger.error(f"   ⏭️  Skipping to next profile...")
+                            continue
                         
-                        # Update totals
-                        total_messages_found += extraction_stats['total_scraped']
-                        total_new_messages += extraction_stats['new_messages']
-                        
-                        if extraction_stats['stopped_due_to_duplicate']:
-                            profiles_stopped_due_to_duplicates += 1
-                            logger.info(f"✅ Profile {profile['username']}: Stopped due to duplicate - all new content processed")
-                        else:
-                            logger.info(f"✅ Profile {profile['username']}: Completed scraping")
-                        
-                        logger.info(f"  📊 Profile Stats:")
-                        logger.info(f"    - Messages found: {extraction_stats['total_scraped']}")
-                        logger.info(f"    - New messages: {extraction_stats['new_messages']}")
-                        logger.info(f"    - Duplicates: {extraction_stats['duplicates_found']}")
-                        logger.info(f"    - Quality filtered: {extraction_stats['quality_filtered']}")
-                        
-                        # Mark profile as scraped
-                        profile_manager.mark_profile_scraped(profile['id'])
-                        
-                        # Wait between profiles to be respectful
-                        if i < len(profiles):  # Don't wait after the last profile
-                            logger.info("⏳ Waiting 30 seconds before next profile...")
-                            # Bugfix: Wait in chunks to detect browser closure early
-                            # Split 30 seconds into 6× 5-second chunks with browser checks
-                            try:
-                                for wait_chunk in range(6):
-                                    from facebook.facebook_auth import is_page_alive
-                                    if not is_page_alive(page):
-                                        logger.error(f"❌ Bugfix: Browser closed during inter-profile wait (chunk {wait_chunk + 1}/6)")
-                                        logger.error("   ⏭️  Stopping profile iteration - browser is closed")
-                                        break
-                                    page.wait_for_timeout(5000)  # 5 seconds × 6 = 30 seconds total
-                            except Exception as wait_error:
-                                error_msg = str(wait_error).lower()
-                                if 'closed' in error_msg or 'target' in error_msg:
-                                    logger.error(f"❌ Bugfix: Browser closed during inter-profile wait: {str(wait_error)[:100]}")
-                                    break  # Exit profile loop
-                    
-                    except NavigationError as e:
-                        logger.error(f"❌ Navigation error for profile {profile['username']}: {e}")
-                        logger.error(f"   🔗 Profile URL: {profile['url']}")
-                        logger.error(f"   ⚠️  This share URL may be invalid or inaccessible")
-                        logger.error(f"   💡 Check the URL at {profile['url']} in your browser")
-                        logger.error(f"   ⏭️  Skipping to next profile...")
-                        continue
-                    
-                    except ExtractionError as e:
-                        # BUGFIX: Enhanced logging for extraction failures
-                        logger.warning(f"⚠️ Profile {profile['username']}: {e}")
-                        # Check if it's a "no quality messages" error (all duplicates)
-                        if "No quality messages extracted" in str(e):
-                            logger.info(f"   ℹ️  All messages from this profile are already in the database")
-                            logger.info(f"   ✅ Profile counted as processed (no new content)")
-                        
-                        # Bugfix: Check if browser closed during extraction error
-                        # If so, stop processing remaining profiles
-                        from facebook.facebook_auth import is_page_alive
-                        if not is_page_alive(page):
-                            logger.error("❌ Bugfix: Browser closed during extraction - stopping profile iteration")
-                            logger.error(f"   ℹ️  Successfully processed {profiles_scraped} profiles before closure")
-                            break  # Exit loop
-                        
-                        continue
-                    
-                    except Exception as e:
-                        logger.error(f"❌ Error scraping profile {profile['username']}: {e}")
-                        
-                        # Bugfix: Check if error was due to browser closure
-                        # If so, stop processing remaining profiles
-                        error_msg = str(e).lower()
-                        if 'closed' in error_msg or 'target' in error_msg:
-                            logger.error("❌ Bugfix: Browser closed during scraping - stopping profile iteration")
-                            logger.error(f"   ℹ️  Successfully processed {profiles_scraped} profiles before closure")
+                        except ExtractionError as e:
+                            metrics.PROFILES_SCRAPED.inc(status='extraction_error')
+                            # BUGFIX: Enhanced logging for extraction failures
+                            logger.warning(f"⚠️ Profile {profile['username']}: {e}")
+                            # Check if it's a "no quality messages" error (all duplicates)
+                            if "No quality messages extracted" in str(e):
+                                logger.info(f"   ℹ️  All messages from this profile are already in the database")
+                                logger.info(f"   ✅ Profile counted as processed (no new content)")
+                            
+                            # Bugfix: Check if browser closed during extraction error
+                            # If so, stop processing remaining profiles
                             from facebook.facebook_auth import is_page_alive
                             if not is_page_alive(page):
-                                logger.error("   ✅ Confirmed: Browser is closed")
+                                logger.error("❌ Bugfix: Browser closed during extraction - stopping profile iteration")
+                                logger.error(f"   ℹ️  Successfully processed {profiles_scraped} profiles before closure")
                                 break  # Exit loop
+                            
+                            continue
                         
-                        continue
+                        except Exception as e:
+                            metrics.PROFILES_SCRAPED.inc(status='error')
+                            logger.error(f"❌ Error scraping profile {profile['username']}: {e}")
+                            
+                            # Bugfix: Check if error was due to browser closure
+                            # If so, stop processing remaining profiles
+                            error_msg = str(e).lower()
+                            if 'closed' in error_msg or 'target' in error_msg:
+                                logger.error("❌ Bugfix: Browser closed during scraping - stopping profile iteration")
+                                logger.error(f"   ℹ️  Successfully processed {profiles_scraped} profiles before closure")
+                                from facebook.facebook_auth import is_page_alive
+                                if not is_page_alive(page):
+                                    logger.error("   ✅ Confirmed: Browser is closed")
+                                    metrics.BROWSER_CRASHES.inc()
+                                    break  # Exit loop
+                            
+                            continue
                 
                 # Display overall results
                 logger.info("\n" + "="*70)
@@ -357,8 +355,9 @@ def main():
                 logger.info(f"  - Total new messages stored: {total_new_messages}")
                 
                 # Show database statistics
-                db_stats = db.get_database_stats()
-                message_stats = db.get_message_stats()
+                with run_trace.span('relay.db_stats'):
+                    db_stats = db.get_database_stats()
+                    message_stats = db.get_message_stats()
                 logger.info(f"  - Database total messages: {message_stats['total_messages']}")
                 logger.info(f"  - Messages ready to post: {message_stats['unposted']}")
                 logger.info(f"  - Database size: {db_stats['database_size_mb']:.2f} MB")
@@ -380,6 +379,7 @@ def main():
                 logger.info("\n" + "="*70)
                 logger.info("MULTI-PROFILE RELAY AGENT EXECUTION COMPLETE")
                 logger.info("="*70)
+                run_succeeded = True
                 
             except LoginError as e:
                 logger.error(f"\n[ERROR] Facebook authentication failed: {e}")
@@ -411,6 +411,13 @@ def main():
         raise
     
     finally:
+        # Commit writes still queued on the DB writer thread before the summary
+        db_writer.flush_all(timeout=30)
+        
+        # Timing summary: logs/run_trace_*.json and run_metrics table
+        run_trace.finish_run()
+        metrics.finish_job(success=run_succeeded)
+        
         # Close debug session
         try:
             debug_session.close()
@@ -419,5 +426,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    profiling.run(main, 'relay_agent')
 
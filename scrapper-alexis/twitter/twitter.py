@@ -184,7 +184,7 @@ def main():
                     if result.get('duplicate_detected'):
                         logger.warning("  Note: Duplicate post detected")
                     
-                    logger.info(f"  Data saved to: twitter_posts.json")
+                    logger.info(f"  Data saved to: twitter_posts.jsonl")
                     
                 else:
                     logger.error("TWEET POSTING FAILED!")
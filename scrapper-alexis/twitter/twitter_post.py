@@ -25,9 +25,7 @@ from pathlib import Path
 if __name__ == "__main__":
     sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import json
 import time
-import sqlite3
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
@@ -35,13 +33,13 @@ from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
 from core.debug_helper import take_debug_screenshot, log_debug_info, log_error, log_success, is_debug_enabled
 from core.database import get_database
 from core.message_deduplicator import MessageQualityFilter
+from utils.wait_strategies import wait_for_any_visible, wait_for_condition, log_wait_summary
+from utils.post_log import append_post, migrate_legacy_json, POST_LOG_FILE
+from utils import metrics, profiling
 
 # Character limit for Twitter/X
 X_CHAR_LIMIT = 280
 
-# JSON storage file
-POSTS_JSON_FILE = Path('twitter_posts.json')
-
 # Import proxy config from main config
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -54,6 +52,40 @@ if not PROXY_CONFIG:
     print("   Add PROXY_SERVER, PROXY_USERNAME, PROXY_PASSWORD to copy.env")
     sys.exit(1)
 
+
+# Feature: Selectors and predicates for selector-driven waits in post_tweet
+COMPOSE_TEXTAREA = '[data-testid="tweetTextarea_0"]'
+TEXTAREA_FOCUSED_JS = """() => {
+    const textarea = document.querySelector('[data-testid="tweetTextarea_0"]');
+    return textarea && document.activeElement === textarea;
+}"""
+# Compose textbox editable and its dialog/column no longer animating in
+COMPOSE_READY_JS = """() => {
+    const textarea = document.querySelector('[data-testid="tweetTextarea_0"]');
+    if (!textarea || textarea.getAttribute('contenteditable') !== 'true') return false;
+    const container = textarea.closest('[role="dialog"]') || textarea.closest('[role="main"]') || textarea;
+    return container.getAnimations({subtree: true}).every(a => a.playState !== 'running');
+}"""
+TEXTAREA_EMPTY_JS = """() => {
+    const textarea = document.querySelector('[data-testid="tweetTextarea_0"]');
+    return textarea && !(textarea.value || textarea.innerText || '').trim();
+}"""
+TEXTAREA_FILLED_JS = """() => {
+    const textarea = document.querySelector('[data-testid="tweetTextarea_0"]');
+    return textarea && (textarea.value || textarea.innerText || '').trim().length > 0;
+}"""
+POST_BUTTON_ENABLED_JS = """() => ['[data-testid="tweetButtonInline"]', '[data-testid="tweetButton"]'].some(sel => {
+    const btn = document.querySelector(sel);
+    return btn && !btn.disabled && btn.getAttribute('aria-disabled') !== 'true';
+})"""
+POST_RESULT_INDICATORS = [
+    'text=¡Ups! Eso ya lo dijiste.',
+    'text=Tu post se envió',
+    'text=Your post was sent',
+    '[data-testid="toast"]',
+]
+
+
 def truncate_for_x(text: str, limit: int = X_CHAR_LIMIT) -> str:
     """Truncate text to fit X character limit with ellipsis."""
     if len(text) <= limit:
@@ -120,8 +152,9 @@ def get_user_avatar_url(page: Page) -> Optional[str]:
 def extract_post_url(page: Page, posted_text: str) -> Optional[str]:
     """Extract the URL of the posted tweet."""
     try:
-        # Wait a bit for the post to appear in timeline
-        page.wait_for_timeout(3000)
+        # Wait for the post to appear in timeline
+        # (filter(has_text=...) instead of a :has-text() selector: quotes in the text cannot break it)
+        wait_for_any_visible(page, [page.locator('article').filter(has_text=posted_text[:20])], 3000, 'x_post_in_timeline')
         
         # Look for the posted tweet in the timeline
         # Try to find a link that contains our posted text
@@ -171,7 +204,7 @@ def extract_post_url(page: Page, posted_text: str) -> Optional[str]:
         return None
 
 def save_post_data(post_data: Dict[str, Any]):
-    """Save post data to JSON file with proper UTF-8 encoding."""
+    """Save post data to the JSONL post log with proper UTF-8 encoding."""
     try:
         # Ensure all text fields are properly encoded
         if 'posted_text' in post_data and post_data['posted_text']:
@@ -181,21 +214,11 @@ def save_post_data(post_data: Dict[str, Any]):
                 # Ensure proper UTF-8 encoding
                 post_data['posted_text'] = text.encode('utf-8').decode('utf-8')
         
-        # Load existing data or create new
-        if POSTS_JSON_FILE.exists():
-            with open(POSTS_JSON_FILE, 'r', encoding='utf-8') as f:
-                all_posts = json.load(f)
-        else:
-            all_posts = []
-        
-        # Add new post data
-        all_posts.append(post_data)
-        
-        # Save back to file with proper UTF-8 encoding
-        with open(POSTS_JSON_FILE, 'w', encoding='utf-8') as f:
-            json.dump(all_posts, f, indent=2, ensure_ascii=False)
+        # Append one line to the post log (converts a legacy twitter_posts.json first)
+        migrate_legacy_json()
+        append_post(post_data)
             
-        log_success(f"Post data saved to {POSTS_JSON_FILE}", category="storage")
+        log_success(f"Post data saved to {POST_LOG_FILE}", category="storage")
         
     except Exception as e:
         log_debug_info(f"Error saving post data: {e}", level="ERROR", category="storage")
@@ -235,7 +258,7 @@ def post_tweet(page: Page, message: str) -> Dict[str, Any]:
         
         # Wait for page to fully load and stabilize
         log_debug_info("Waiting for Twitter home page to fully load...", category="navigation")
-        page.wait_for_timeout(5000)  # Give page time to fully render
+        wait_for_any_visible(page, [COMPOSE_TEXTAREA], 5000, 'x_home_loaded')  # Give page time to fully render
         
         # Wait for key elements to be present (ensures page is loaded)
         try:
@@ -270,11 +293,11 @@ def post_tweet(page: Page, message: str) -> Dict[str, Any]:
         compose_textbox.wait_for(state='visible', timeout=30000)  # Wait for visible
         log_debug_info("Compose textbox visible", category="posting")
         
-        page.wait_for_timeout(2000)  # Extra wait for animations/rendering
+        wait_for_condition(page, COMPOSE_READY_JS, 2000, 'x_compose_rendered')  # Extra wait for animations/rendering
         
         log_debug_info("Clicking compose textbox...", category="posting")
         compose_textbox.click()
-        page.wait_for_timeout(1000)  # Wait for focus
+        wait_for_condition(page, TEXTAREA_FOCUSED_JS, 1000, 'x_compose_focus')  # Wait for focus
         
         # Verify the textarea is focused by checking for placeholder disappearance
         log_debug_info("Verifying textarea is focused...", category="posting")
@@ -287,7 +310,7 @@ def post_tweet(page: Page, message: str) -> Dict[str, Any]:
         if not is_focused:
             log_debug_info("Textarea not focused, clicking again...", category="posting")
             compose_textbox.click()
-            page.wait_for_timeout(1000)
+            wait_for_condition(page, TEXTAREA_FOCUSED_JS, 1000, 'x_compose_focus')
         
         take_debug_screenshot(page, "02_compose_clicked", category="posting")
         
@@ -296,12 +319,12 @@ def post_tweet(page: Page, message: str) -> Dict[str, Any]:
         
         # Clear any existing text first using locator
         compose_textbox.fill('')  # Clear the field
-        page.wait_for_timeout(500)
+        wait_for_condition(page, TEXTAREA_EMPTY_JS, 500, 'x_compose_cleared')
         
         # Type the message using locator.type() (handles accents, emojis, Unicode!)
         # Note: locator.type() handles special characters properly, unlike page.keyboard.type()
         compose_textbox.type(post_text, delay=50)  # 50ms delay between characters
-        page.wait_for_timeout(1000)  # Wait for typing to complete
+        wait_for_condition(page, TEXTAREA_FILLED_JS, 1000, 'x_compose_typed')  # Wait for typing to complete
         
         # Verify text was actually entered
         entered_text = page.evaluate('''() => {
@@ -321,7 +344,7 @@ def post_tweet(page: Page, message: str) -> Dict[str, Any]:
             log_debug_info("ERROR: Text was not entered! Trying alternative method...", level="ERROR", category="posting")
             # Fallback: try using fill() with force
             compose_textbox.fill(post_text, force=True)
-            page.wait_for_timeout(1000)
+            wait_for_condition(page, TEXTAREA_FILLED_JS, 1000, 'x_compose_typed')
             
             # Verify again
             entered_text = page.evaluate('''() => {
@@ -345,9 +368,9 @@ def post_tweet(page: Page, message: str) -> Dict[str, Any]:
             # Try one more time with correct text using locator.type()
             log_debug_info("Clearing and retyping correct message with locator.type()...", category="posting")
             compose_textbox.fill('')  # Clear
-            page.wait_for_timeout(500)
+            wait_for_condition(page, TEXTAREA_EMPTY_JS, 500, 'x_compose_cleared')
             compose_textbox.type(post_text, delay=50)  # Use locator.type() for Unicode support
-            page.wait_for_timeout(1000)
+            wait_for_condition(page, TEXTAREA_FILLED_JS, 1000, 'x_compose_typed')
             
             # Verify again
             entered_text = page.evaluate('''() => {
@@ -370,7 +393,7 @@ def post_tweet(page: Page, message: str) -> Dict[str, Any]:
             }
         }''')
         
-        page.wait_for_timeout(3000)  # Increased to 3s - give time for Twitter to process and enable button
+        wait_for_condition(page, POST_BUTTON_ENABLED_JS, 3000, 'x_post_button_enabled')  # Give Twitter time to process and enable button
         
         take_debug_screenshot(page, "03_message_typed", category="posting")
         
@@ -432,7 +455,7 @@ def post_tweet(page: Page, message: str) -> Dict[str, Any]:
                 # Last attempt: try the compose/post URL as fallback
                 log_debug_info("Attempting fallback: navigating to compose URL...", category="posting")
                 page.goto('https://x.com/compose/post', wait_until='domcontentloaded', timeout=30000)
-                page.wait_for_timeout(2000)
+                wait_for_any_visible(page, [COMPOSE_TEXTAREA], 2000, 'x_compose_modal_loaded')
                 
                 # Try typing in the compose modal
                 try:
@@ -449,7 +472,7 @@ def post_tweet(page: Page, message: str) -> Dict[str, Any]:
                             textarea.dispatchEvent(new Event('change', { bubbles: true }));
                         }
                     }''')
-                    page.wait_for_timeout(2000)
+                    wait_for_condition(page, POST_BUTTON_ENABLED_JS, 2000, 'x_post_button_enabled')
                     
                     # Find post button in modal
                     modal_post_button = page.locator('[data-testid="tweetButton"]').first
@@ -467,7 +490,7 @@ def post_tweet(page: Page, message: str) -> Dict[str, Any]:
         take_debug_screenshot(page, "03c_before_clicking_post", category="posting")
         post_button.click()
         log_debug_info("Post button clicked!", category="posting")
-        page.wait_for_timeout(5000)  # Give time for tweet to submit
+        wait_for_any_visible(page, POST_RESULT_INDICATORS, 5000, 'x_post_submitted')  # Give time for tweet to submit
         
         take_debug_screenshot(page, "04_after_post_click", category="posting")
         
@@ -532,6 +555,9 @@ def post_tweet(page: Page, message: str) -> Dict[str, Any]:
         take_debug_screenshot(page, "error_general", category="errors")
     finally:
         result['elapsed_time'] = time.time() - start_time
+        status = 'success' if result['success'] else ('duplicate' if result['duplicate_detected'] else 'failed')
+        metrics.POSTS_PUBLISHED.inc(platform='twitter', status=status)
+        metrics.POST_SECONDS.observe(result['elapsed_time'], platform='twitter')
         
     return result
 
@@ -555,19 +581,25 @@ def post_tweet_from_database(page: Page, message_id: int = None, text: str = Non
     
     # Get message from database or use provided text
     if message_id:
-        # Get message from database
-        messages = db.get_unposted_messages(limit=1000)  # Get a good sample
-        message_record = next((m for m in messages if m['id'] == message_id), None)
-        if not message_record:
+        # Get message from database (primary-key lookup, independent of queue size)
+        message_record = db.get_message(message_id)
+        if message_record is None:
+            return {
+                'success': False,
+                'error': f'Message with ID {message_id} not found',
+                'message_id': message_id,
+                'elapsed_time': 0
+            }
+        if message_record.posted_to_twitter:
             return {
                 'success': False,
-                'error': f'Message with ID {message_id} not found or already posted',
+                'error': f'Message with ID {message_id} already posted',
                 'message_id': message_id,
                 'elapsed_time': 0
             }
         
-        text_to_post = message_record['message_text']
-        profile_username = message_record['profile_username']
+        text_to_post = message_record.message_text
+        profile_username = message_record.profile_username or "unknown"
     else:
         # Use provided text
         if not text:
@@ -678,44 +710,15 @@ def get_next_message_to_post(limit: int = 1, profile_filter: str = None) -> Opti
     """
     db = get_database()
     
-    # Fetch more messages than needed to account for quality filtering
-    # This ensures we can skip bad messages and find good ones
-    fetch_limit = limit * 20  # Fetch 20x more to filter through
-    messages = db.get_unposted_messages(limit=fetch_limit)
-    
-    if profile_filter:
-        messages = [m for m in messages if m['profile_username'] == profile_filter]
-    
-    # Quality filter the messages and mark failed ones
-    quality_messages = []
-    failed_messages = []
-    
-    for msg in messages:
-        if MessageQualityFilter.is_valid_message(msg['message_text']):
-            quality_messages.append(msg)
-        else:
-            failed_messages.append(msg)
-            # Mark this message as failed quality check in database
-            log_debug_info(f"⚠️  Message ID {msg['id']} failed quality: '{msg['message_text'][:50]}'", category="database")
-    
-    # Mark failed messages so they don't get selected again
-    if failed_messages:
-        conn = sqlite3.connect(db.db_path)
-        cursor = conn.cursor()
-        for msg in failed_messages:
-            # Update message to mark it as "posted" with a special note
-            cursor.execute("""
-                UPDATE messages 
-                SET posted_to_twitter = 1, 
-                    posted_at = ?,
-                    post_url = 'SKIPPED_QUALITY_FILTER'
-                WHERE id = ?
-            """, (datetime.now().isoformat(), msg['id']))
-        conn.commit()
-        conn.close()
-        log_debug_info(f"Marked {len(failed_messages)} messages as skipped (quality filter)", category="database")
+    # Stream the queue in keyset pages until enough quality messages are found;
+    # verdicts (and skipped rejects) are persisted so bad rows are not re-read
+    quality_messages = list(db.stream_quality_messages(
+        MessageQualityFilter.is_valid_message,
+        limit=limit,
+        profile_filter=profile_filter
+    ))
     
-    log_debug_info(f"Found {len(quality_messages)} quality messages ready to post (skipped {len(failed_messages)} low-quality)", category="database")
+    log_debug_info(f"Found {len(quality_messages)} quality messages ready to post", category="database")
     
     if limit == 1:
         return quality_messages[0] if quality_messages else None
@@ -783,22 +786,12 @@ def batch_post_from_database(page: Page, count: int = 5, delay_seconds: int = 30
 
 
 def save_to_json_backup(post_result: Dict[str, Any]):
-    """Save posting result to JSON file for backup/compatibility."""
+    """Append posting result to the JSONL post log for backup/compatibility."""
     try:
-        # Load existing posts
-        posts = []
-        if POSTS_JSON_FILE.exists():
-            with open(POSTS_JSON_FILE, 'r', encoding='utf-8') as f:
-                posts = json.load(f)
+        migrate_legacy_json()
+        append_post(post_result)
         
-        # Add new post
-        posts.append(post_result)
-        
-        # Save back to file
-        with open(POSTS_JSON_FILE, 'w', encoding='utf-8') as f:
-            json.dump(posts, f, indent=2, ensure_ascii=False)
-        
-        log_debug_info(f"Saved post result to {POSTS_JSON_FILE}", category="storage")
+        log_debug_info(f"Saved post result to {POST_LOG_FILE}", category="storage")
         
     except Exception as e:
         # Note: We don't have page context here, so just use regular logging
@@ -811,25 +804,20 @@ def get_posting_statistics() -> Dict[str, Any]:
     """Get statistics about posting from database."""
     db = get_database()
     
-    message_stats = db.get_message_stats()
+    # One aggregate query over the persisted quality verdicts (read-only). Rejected
+    # messages are marked posted, so unposted ones are either passed or unchecked.
+    counters = db.get_posting_counters()
     
     stats = {
-        'total_messages': message_stats['total_messages'],
-        'posted_messages': message_stats['posted'],
-        'unposted_messages': message_stats['unposted'],
-        'posting_percentage': 0 if message_stats['total_messages'] == 0 else 
-                             (message_stats['posted'] / message_stats['total_messages']) * 100
+        'total_messages': counters['total_messages'],
+        'posted_messages': counters['posted'],
+        'unposted_messages': counters['unposted'],
+        'posting_percentage': 0 if counters['total_messages'] == 0 else 
+                             (counters['posted'] / counters['total_messages']) * 100,
+        'quality_unposted_messages': counters['quality_unposted'],
+        'unchecked_unposted_messages': counters['unchecked_unposted']
     }
     
-    # Get quality breakdown of unposted messages
-    unposted_messages = db.get_unposted_messages(limit=1000)  # Get up to 1000 for analysis
-    quality_unposted = MessageQualityFilter.filter_quality_messages([m['message_text'] for m in unposted_messages])
-    
-    stats.update({
-        'quality_unposted_messages': len(quality_unposted),
-        'low_quality_unposted': len(unposted_messages) - len(quality_unposted)
-    })
-    
     log_debug_info(f"Posting statistics: {stats}", category="statistics")
     return stats
 
@@ -912,10 +900,12 @@ def main():
                     print(f"Using proxy: {PROXY_CONFIG['server']}")
                 
                 browser = p.firefox.launch(**firefox_options)
+                metrics.BROWSER_LAUNCHES.inc(browser='firefox')
                 print("Firefox launched successfully")
                 
                 # Load Twitter authentication
                 context = browser.new_context(storage_state=str(auth_file))
+                metrics.track_network_bytes(context)
                 page = context.new_page()
                 
                 # Verify authentication with retries
@@ -1179,6 +1169,7 @@ def main():
                 print(f"  Post URL: {result.get('post_url', 'None')}")
                 print(f"  Avatar URL: {result.get('avatar_url', 'None')}")
                 print(f"  Elapsed time: {result.get('elapsed_time', 0):.2f}s")
+                log_wait_summary()
                 
                 if result.get('success', False):
                     print("\nSUCCESS: Message posted to Twitter!")
@@ -1199,7 +1190,13 @@ def main():
 
 
 if __name__ == "__main__":
-    success = main()
+    metrics.start_job('twitter_post')
+    success = False
+    try:
+        success = profiling.run(main, 'twitter_post')
+    finally:
+        # Also written when main() raises, so failures reach the textfile
+        metrics.finish_job(success=bool(success))
     if success:
         print("\nTwitter posting completed successfully!")
     else:
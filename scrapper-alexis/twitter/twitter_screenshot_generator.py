@@ -1,16 +1,16 @@
 #!/usr/bin/env python3
 """
 Twitter Screenshot Generator
-Generates perfect screenshots for all posts in twitter_posts.json using the template approach.
+Generates perfect screenshots for all posts in the post log (twitter_posts.jsonl) using the template approach.
 """
 
-import json
 import logging
+import itertools
 import os
 import re
 import requests
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterator, Any
 from urllib.parse import quote
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 
@@ -26,6 +26,7 @@ except ImportError:
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 import config
+from utils.post_log import iter_posts, migrate_legacy_json, POST_LOG_FILE, LEGACY_JSON_FILE
 
 # Configuration - use proxy from config (CRITICAL!)
 PROXY_CONFIG = config.PROXY_CONFIG
@@ -34,7 +35,6 @@ if not PROXY_CONFIG:
     print("   Add PROXY_SERVER, PROXY_USERNAME, PROXY_PASSWORD to copy.env")
     sys.exit(1)
 
-POSTS_JSON_FILE = Path('twitter_posts.json')
 TEMPLATE_FILE = Path('tweet_template.html')
 SCREENSHOTS_DIR = Path('screenshots')
 SCREENSHOTS_DIR.mkdir(exist_ok=True)
@@ -418,22 +418,13 @@ def generate_screenshot(page, post_data: Dict[str, Any], use_proxy: bool = True,
         return None
 
 
-def load_posts_data() -> List[Dict[str, Any]]:
-    """Load posts from twitter_posts.json."""
+def load_posts_data() -> Iterator[Dict[str, Any]]:
+    """Stream posts from the post log (converting a legacy twitter_posts.json first)."""
     try:
-        if not POSTS_JSON_FILE.exists():
-            logger.error(f"Posts file not found: {POSTS_JSON_FILE}")
-            return []
-        
-        with open(POSTS_JSON_FILE, 'r', encoding='utf-8') as f:
-            posts = json.load(f)
-        
-        logger.info(f"Loaded {len(posts)} posts from {POSTS_JSON_FILE}")
-        return posts
-        
+        migrate_legacy_json()
+        yield from iter_posts()
     except Exception as e:
-        logger.error(f"Error loading posts data: {e}")
-        return []
+        logger.error(f"Error loading posts data from {POST_LOG_FILE} / {LEGACY_JSON_FILE}: {e}")
 
 
 def main():
@@ -465,12 +456,15 @@ def main():
     logger.info(f"Debug mode: {args.debug}")
     logger.info(f"Screenshots directory: {SCREENSHOTS_DIR}")
     
-    # Load posts data
+    # Stream posts data (peek one post so an empty log fails before launching the browser)
     posts = load_posts_data()
-    if not posts:
-        logger.error("No posts found to process")
+    first_post = next(posts, None)
+    if first_post is None:
+        logger.error(f"No posts found to process in {POST_LOG_FILE}")
         return 1
+    posts = itertools.chain([first_post], posts)
     
+    processed_posts = 0
     successful_screenshots = 0
     failed_screenshots = 0
     
@@ -508,10 +502,11 @@ def main():
                     logger.warning(f"Failed to extract profile info from Twitter: {e}")
                     logger.info("Will use default values")
             
-            logger.info(f"Processing {len(posts)} posts...")
+            logger.info(f"Processing posts from {POST_LOG_FILE}...")
             
             for i, post in enumerate(posts, 1):
-                logger.info(f"\n--- Post {i}/{len(posts)} ---")
+                logger.info(f"\n--- Post {i} ---")
+                processed_posts = i
                 
                 if not post.get('success', False):
                     logger.warning(f"Skipping failed post: {post.get('error', 'Unknown error')}")
@@ -545,7 +540,7 @@ def main():
     logger.info("=" * 70)
     logger.info("SCREENSHOT GENERATION COMPLETE")
     logger.info("=" * 70)
-    logger.info(f"Total posts processed: {len(posts)}")
+    logger.info(f"Total posts processed: {processed_posts}")
     logger.info(f"Successful screenshots: {successful_screenshots}")
     logger.info(f"Failed screenshots: {failed_screenshots}")
     logger.info(f"Screenshots saved in: {SCREENSHOTS_DIR}")
@@ -13,6 +13,33 @@ import config
 
 logger = logging.getLogger(__name__)
 
+# Server-optimized Firefox preferences (the scraper must run in Firefox)
+FIREFOX_USER_PREFS = {
+    # Disable accessibility features (fixes DBus errors on servers)
+    'accessibility.force_disabled': 1,
+    'accessibility.handler.enabled': False,
+    'accessibility.support.url': '',
+    # Disable features that can hang Firefox
+    'datareporting.policy.dataSubmissionEnabled': False,
+    'datareporting.healthreport.uploadEnabled': False,
+    'toolkit.telemetry.enabled': False,
+    'toolkit.telemetry.unified': False,
+    'toolkit.telemetry.archive.enabled': False,
+    # Performance optimizations for server
+    'browser.cache.disk.enable': False,
+    'browser.cache.memory.enable': True,
+    'browser.cache.offline.enable': False,
+    'network.http.use-cache': False,
+    # Disable unnecessary features
+    'extensions.pocket.enabled': False,
+    'browser.safebrowsing.downloads.enabled': False,
+    'browser.safebrowsing.malware.enabled': False,
+    'browser.safebrowsing.phishing.enabled': False,
+    # Media settings
+    'media.autoplay.default': 5,
+    'media.autoplay.blocking_policy': 2,
+}
+
 
 def create_browser_context(
     browser: Browser,
@@ -0,0 +1,157 @@
+"""
+Image encoding pipeline for generated message images.
+
+Playwright writes full-quality PNG screenshots (including the 500px template
+padding), which are heavy to serve in the web gallery and slow to upload to
+the Facebook page. This module post-processes a rendered PNG into:
+
+- an optimized lossless PNG (replaces the original only when smaller)
+- an optional WebP or JPEG at a target quality / size budget
+- a small thumbnail for the gallery
+
+Pillow is optional: without it the original PNG is kept untouched.
+"""
+
+import io
+import os
+import logging
+from pathlib import Path
+from typing import Dict, Tuple
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Formats accepted for the alternate encoding -> (Pillow format, file extension)
+ENCODE_FORMATS = {
+    'webp': ('WEBP', '.webp'),
+    'jpeg': ('JPEG', '.jpg'),
+    'jpg': ('JPEG', '.jpg'),
+}
+
+# Lowest quality tried when stepping down to meet a size target
+MIN_QUALITY = 40
+QUALITY_STEP = 10
+
+
+def _write_atomic(path: Path, data: bytes):
+    """Write bytes to path via a temp file so readers never see partial images."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _flatten_alpha(image: 'Image.Image') -> 'Image.Image':
+    """Drop the alpha channel when it is fully opaque (lossless)."""
+    if image.mode == 'RGBA':
+        alpha_min, _ = image.getchannel('A').getextrema()
+        if alpha_min == 255:
+            return image.convert('RGB')
+    return image
+
+
+def _encode_lossy(image: 'Image.Image', pil_format: str, quality: int) -> bytes:
+    """Encode image to WebP/JPEG bytes at the given quality."""
+    buffer = io.BytesIO()
+    if pil_format == 'JPEG':
+        image.convert('RGB').save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buffer, format='WEBP', quality=quality, method=6)
+    return buffer.getvalue()
+
+
+def _encode_to_target(image: 'Image.Image', pil_format: str, quality: int, max_bytes: int) -> Tuple[bytes, int]:
+    """
+    Encode at the requested quality, stepping down until the size target is met.
+
+    Returns:
+        Tuple of (encoded bytes, quality used)
+    """
+    data = _encode_lossy(image, pil_format, quality)
+    while max_bytes and len(data) > max_bytes and quality - QUALITY_STEP >= MIN_QUALITY:
+        quality -= QUALITY_STEP
+        data = _encode_lossy(image, pil_format, quality)
+
+    if max_bytes and len(data) > max_bytes:
+        logger.warning(f"Size target {max_bytes} bytes not met ({len(data)} bytes at quality {quality})")
+    return data, quality
+
+
+def encode_message_image(png_path: str, output_format: str = 'webp', quality: int = 85,
+                         max_bytes: int = 0, thumbnail_width: int = 320) -> Dict:
+    """
+    Run the encoding stage on a freshly rendered message PNG.
+
+    Args:
+        png_path: Path to the PNG written by the screenshot step
+        output_format: 'webp', 'jpeg' or 'none' for the alternate encoding
+        quality: Target quality for the alternate encoding (1-100)
+        max_bytes: Optional size budget for the alternate encoding (0 = none)
+        thumbnail_width: Width of the gallery thumbnail in pixels (0 = no thumbnail)
+
+    Returns:
+        Dictionary with image_path, encoded_image_path, thumbnail_path,
+        original_bytes and optimized_bytes / encoded_bytes / thumbnail_bytes
+    """
+    path = Path(png_path)
+    original_bytes = path.stat().st_size
+    result = {
+        'image_path': str(path),
+        'encoded_image_path': None,
+        'thumbnail_path': None,
+        'original_bytes': original_bytes,
+        'optimized_bytes': original_bytes,
+        'encoded_bytes': 0,
+        'thumbnail_bytes': 0,
+    }
+
+    if not PIL_AVAILABLE:
+        logger.warning("Pillow not installed - skipping image encoding (pip install Pillow)")
+        return result
+
+    with Image.open(path) as source:
+        image = _flatten_alpha(source.copy())
+
+    # Optimized lossless PNG - only replace the original when it actually shrinks
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=True)
+    optimized = buffer.getvalue()
+    if len(optimized) < original_bytes:
+        _write_atomic(path, optimized)
+        result['optimized_bytes'] = len(optimized)
+
+    # Optional WebP/JPEG alternate
+    output_format = (output_format or 'none').lower()
+    if output_format in ENCODE_FORMATS:
+        pil_format, extension = ENCODE_FORMATS[output_format]
+        data, used_quality = _encode_to_target(image, pil_format, quality, max_bytes)
+        encoded_path = path.with_suffix(extension)
+        _write_atomic(encoded_path, data)
+        result['encoded_image_path'] = str(encoded_path)
+        result['encoded_bytes'] = len(data)
+        logger.info(f"Encoded {pil_format} at quality {used_quality}: {encoded_path} ({len(data)} bytes)")
+    elif output_format not in ('none', 'png', ''):
+        logger.warning(f"Unknown IMAGE_ENCODE_FORMAT '{output_format}' - skipping alternate encoding")
+
+    # Gallery thumbnail (same directory so the web app can serve it by basename)
+    if thumbnail_width and image.width > thumbnail_width:
+        thumb_height = max(1, round(image.height * thumbnail_width / image.width))
+        thumbnail = image.resize((thumbnail_width, thumb_height), Image.LANCZOS)
+        pil_format, extension = ENCODE_FORMATS.get(output_format, ('JPEG', '.jpg'))
+        data = _encode_lossy(thumbnail, pil_format, 80)
+        thumb_path = path.with_name(f"{path.stem}_thumb{extension}")
+        _write_atomic(thumb_path, data)
+        result['thumbnail_path'] = str(thumb_path)
+        result['thumbnail_bytes'] = len(data)
+
+    saved = original_bytes - result['optimized_bytes']
+    logger.info(
+        f"Image encoded: PNG {original_bytes} -> {result['optimized_bytes']} bytes "
+        f"(saved {saved}), alternate {result['encoded_bytes']} bytes, thumbnail {result['thumbnail_bytes']} bytes"
+    )
+    return result
@@ -3,13 +3,19 @@ Laravel encryption decryption utility for Python.
 
 Laravel uses AES-256-CBC encryption with HMAC-SHA-256 for authentication.
 This module provides decryption functionality compatible with Laravel's encrypt() function.
+The key (and APP_PREVIOUS_KEYS) is resolved once and cached until the .env
+file changes; decrypt_many() handles several values with one key lookup.
 """
 
 import os
+import re
 import base64
 import json
 import hmac
 import hashlib
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from cryptography.hazmat.primitives import padding
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 import logging
@@ -47,9 +53,88 @@ def _get_laravel_env_path() -> str:
     )
 
 
+# Resolved keys, invalidated when LARAVEL_APP_KEY or the .env file (mtime) changes
+_key_cache = {'source': None, 'keys': None}
+_key_lock = threading.Lock()
+
+# PHP serialize() of a string, as produced by Crypt::encrypt() with serialization
+_PHP_SERIALIZED_STRING = re.compile(r'^s:(\d+):"(.*)";$', re.DOTALL)
+
+
+def _decode_key(app_key: str) -> bytes:
+    """Decode an APP_KEY value ('base64:...' or raw)."""
+    app_key = app_key.strip().strip('"\'')
+    if app_key.startswith('base64:'):
+        try:
+            return base64.b64decode(app_key[7:])
+        except Exception as e:
+            raise ValueError(f"Invalid APP_KEY format: {e}")
+    return app_key.encode()
+
+
+def _read_env_keys(laravel_env_path: str) -> Tuple[Optional[str], List[str]]:
+    """Read APP_KEY and APP_PREVIOUS_KEYS from the Laravel .env file."""
+    app_key = None
+    previous_keys = []
+    try:
+        with open(laravel_env_path, 'r') as f:
+            for line in f:
+                if line.startswith('APP_KEY='):
+                    app_key = line.strip().split('=', 1)[1]
+                elif line.startswith('APP_PREVIOUS_KEYS='):
+                    value = line.strip().split('=', 1)[1].strip('"\'')
+                    previous_keys = [key for key in value.split(',') if key.strip()]
+    except Exception as e:
+        logger.warning(f"Failed to read {laravel_env_path}: {e}")
+    return app_key, previous_keys
+
+
+def get_laravel_keys() -> List[bytes]:
+    """
+    Get the Laravel encryption keys: APP_KEY first, then APP_PREVIOUS_KEYS.
+    
+    Keys come from the LARAVEL_APP_KEY environment variable or the Laravel .env
+    file. They are resolved once and cached until the variable or the file's
+    mtime changes (e.g. after `php artisan key:generate`).
+    
+    Returns:
+        list: Decoded keys, current key first
+        
+    Raises:
+        ValueError: If APP_KEY is not found or invalid
+    """
+    env_key = os.getenv('LARAVEL_APP_KEY')
+    if env_key:
+        source = ('env', env_key)
+    else:
+        laravel_env_path = _get_laravel_env_path()
+        try:
+            source = ('file', laravel_env_path, os.stat(laravel_env_path).st_mtime_ns)
+        except OSError:
+            source = ('file', laravel_env_path, None)
+    
+    with _key_lock:
+        if _key_cache['source'] == source:
+            return _key_cache['keys']
+        
+        if env_key:
+            app_key, previous_keys = env_key, []
+        else:
+            app_key, previous_keys = _read_env_keys(source[1])
+        
+        if not app_key:
+            raise ValueError("Laravel APP_KEY not found. Set LARAVEL_APP_KEY environment variable or ensure .env exists.")
+        
+        keys = [_decode_key(app_key)] + [_decode_key(key) for key in previous_keys]
+        _key_cache['source'] = source
+        _key_cache['keys'] = keys
+        logger.debug(f"Laravel key resolved from {source[0]} ({len(keys) - 1} previous key(s))")
+        return keys
+
+
 def get_laravel_key() -> bytes:
     """
-    Get the Laravel APP_KEY from environment or Laravel .env file.
+    Get the Laravel APP_KEY from environment or Laravel .env file (cached).
     
     Returns:
         bytes: The decoded encryption key
@@ -57,54 +142,112 @@ def get_laravel_key() -> bytes:
     Raises:
         ValueError: If APP_KEY is not found or invalid
     """
-    # Try environment variable first
-    app_key = os.getenv('LARAVEL_APP_KEY')
+    return get_laravel_keys()[0]
+
+
+def clear_key_cache():
+    """Forget the cached keys (next call re-reads the environment / .env)."""
+    with _key_lock:
+        _key_cache['source'] = None
+        _key_cache['keys'] = None
+
+
+def _parse_payload(encrypted_value: str) -> Dict[str, str]:
+    """Decode and validate the base64 JSON payload of a Laravel encrypted value."""
+    try:
+        payload = json.loads(base64.b64decode(encrypted_value))
+    except Exception:
+        # If base64 decode fails, maybe it's already decoded JSON
+        payload = json.loads(encrypted_value)
+    
+    if not isinstance(payload, dict) or not all(isinstance(payload.get(k), str) for k in ('iv', 'value', 'mac')):
+        raise ValueError("The payload is invalid.")
+    if payload.get('tag'):
+        # AEAD ciphers (AES-*-GCM) are not used by this application (APP cipher is AES-256-CBC)
+        raise ValueError("Unsupported cipher: payload has an authentication tag.")
+    return payload
+
+
+def _find_key(payload: Dict[str, str], keys: List[bytes]) -> bytes:
+    """
+    Verify the payload MAC and return the key it was made with.
     
-    # If not in env, try reading from Laravel .env file
-    if not app_key:
-        laravel_env_path = _get_laravel_env_path()
-        
-        try:
-            with open(laravel_env_path, 'r') as f:
-                for line in f:
-                    if line.startswith('APP_KEY='):
-                        app_key = line.strip().split('=', 1)[1]
-                        break
-        except Exception as e:
-            logger.warning(f"Failed to read {laravel_env_path}: {e}")
+    Laravel computes mac = hash_hmac('sha256', iv . value, key) over the
+    base64 iv and value strings exactly as they appear in the payload.
+    """
+    message = (payload['iv'] + payload['value']).encode()
+    for key in keys:
+        expected_mac = hmac.new(key, message, hashlib.sha256).hexdigest()
+        if hmac.compare_digest(payload['mac'], expected_mac):
+            return key
+    raise ValueError("The MAC is invalid.")
+
+
+def _decrypt_payload(payload: Dict[str, str], key: bytes) -> str:
+    """AES-256-CBC decrypt a verified payload and undo PHP string serialization."""
+    iv = base64.b64decode(payload['iv'])
+    if len(iv) != 16:
+        raise ValueError("The payload is invalid.")
+    encrypted_data = base64.b64decode(payload['value'])
     
-    if not app_key:
-        raise ValueError("Laravel APP_KEY not found. Set LARAVEL_APP_KEY environment variable or ensure .env exists.")
+    decryptor = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend()).decryptor()
+    decrypted_padded = decryptor.update(encrypted_data) + decryptor.finalize()
     
-    # Remove 'base64:' prefix if present
-    if app_key.startswith('base64:'):
-        app_key = app_key[7:]
+    # Remove PKCS7 padding
+    unpadder = padding.PKCS7(128).unpadder()
+    result = (unpadder.update(decrypted_padded) + unpadder.finalize()).decode('utf-8')
+    
+    # Handle PHP serialized strings (Crypt::encrypt() serializes by default)
+    # Format: s:length:"value"; -> value (length is in bytes)
+    match = _PHP_SERIALIZED_STRING.match(result)
+    if match and int(match.group(1)) == len(match.group(2).encode('utf-8')):
+        result = match.group(2)
+    
+    return result
+
+
+def _decrypt_one(encrypted_value: str, keys: List[bytes]) -> str:
+    payload = _parse_payload(encrypted_value)
+    return _decrypt_payload(payload, _find_key(payload, keys))
+
+
+def _decrypt_or_blank(encrypted_value: str, keys: List[bytes]) -> str:
+    """
+    Decrypt one 'eyJ...' value for the public API.
     
-    # Decode base64 key
+    Values that are not a Laravel payload are returned as-is (they may be
+    plaintext). A genuine payload that fails verification or decryption gives
+    '' so the ciphertext is never used as a password.
+    """
+    try:
+        payload = _parse_payload(encrypted_value)
+    except Exception:
+        logger.debug("Value is not a Laravel payload, returning as-is")
+        return encrypted_value
     try:
-        return base64.b64decode(app_key)
+        return _decrypt_payload(payload, _find_key(payload, keys))
     except Exception as e:
-        raise ValueError(f"Invalid APP_KEY format: {e}")
+        logger.error(f"❌ Failed to decrypt Laravel value: {e} (check APP_KEY / APP_PREVIOUS_KEYS)")
+        return ''
 
 
-def decrypt_laravel_value(encrypted_value: str) -> str:
+def decrypt_laravel_value(encrypted_value: str, keys: Optional[List[bytes]] = None) -> str:
     """
     Decrypt a Laravel encrypted value.
     
     Laravel stores encrypted values as base64-encoded JSON containing:
     - iv: Initialization vector (base64)
     - value: Encrypted data (base64)
-    - mac: HMAC signature (hex)
-    - tag: Additional data (optional, for AEAD)
+    - mac: HMAC-SHA256 of iv . value (hex)
+    - tag: Empty for AES-256-CBC
     
     Args:
         encrypted_value: The encrypted string from Laravel database
+        keys: Keys to try (defaults to get_laravel_keys())
         
     Returns:
-        str: Decrypted plaintext value
-        
-    Raises:
-        ValueError: If decryption fails or value is invalid
+        str: Decrypted plaintext value (the input itself if it is plaintext,
+        '' if it is a Laravel payload that cannot be verified or decrypted)
     """
     if not encrypted_value:
         return ''
@@ -115,75 +258,47 @@ def decrypt_laravel_value(encrypted_value: str) -> str:
         logger.debug("Value appears to be plaintext, returning as-is")
         return encrypted_value
     
-    try:
-        # Decode the base64-encoded JSON payload
+    if keys is None:
         try:
-            payload = json.loads(base64.b64decode(encrypted_value))
-        except:
-            # If base64 decode fails, maybe it's already decoded JSON
-            payload = json.loads(encrypted_value)
-        
-        # Extract components
-        iv = base64.b64decode(payload['iv'])
-        encrypted_data = base64.b64decode(payload['value'])
-        mac = payload['mac']
-        
-        # Get Laravel key
-        key = get_laravel_key()
-        
-        # Verify MAC
-        mac_key = hashlib.sha256(b'base64:' + base64.b64encode(key)).digest()
-        expected_mac = hmac.new(
-            mac_key,
-            base64.b64encode(json.dumps(payload, separators=(',', ':')).encode()),
-            hashlib.sha256
-        ).hexdigest()
-        
-        if not hmac.compare_digest(mac, expected_mac):
-            # Try alternative MAC calculation (Laravel uses different payload for MAC)
-            payload_for_mac = f"base64:{base64.b64encode(iv + encrypted_data).decode()}"
-            expected_mac = hmac.new(
-                key,
-                payload_for_mac.encode(),
-                hashlib.sha256
-            ).hexdigest()
-            
-            if not hmac.compare_digest(mac, expected_mac):
-                logger.warning("MAC verification failed, but continuing with decryption")
-        
-        # Decrypt using AES-256-CBC
-        cipher = Cipher(
-            algorithms.AES(key),
-            modes.CBC(iv),
-            backend=default_backend()
-        )
-        decryptor = cipher.decryptor()
-        decrypted_padded = decryptor.update(encrypted_data) + decryptor.finalize()
-        
-        # Remove PKCS7 padding
-        padding_length = decrypted_padded[-1]
-        decrypted = decrypted_padded[:-padding_length]
-        
-        result = decrypted.decode('utf-8')
-        
-        # Handle PHP serialized strings (Laravel sometimes serializes values)
-        # Format: s:length:"value";
-        if result.startswith('s:') and ':"' in result and result.endswith('";'):
-            # Extract the string value from PHP serialization
-            # Example: s:10:"0In6TAX309"; -> 0In6TAX309
-            try:
-                parts = result.split(':"', 1)
-                if len(parts) == 2:
-                    result = parts[1].rstrip('";')
-            except:
-                pass  # If parsing fails, return the original decrypted value
-        
-        return result
+            keys = get_laravel_keys()
+        except Exception as e:
+            logger.error(f"❌ Failed to decrypt Laravel value: {e}")
+            return ''
+    return _decrypt_or_blank(encrypted_value, keys)
+
+
+def decrypt_many(encrypted_values: Iterable[str], keys: Optional[List[bytes]] = None) -> List[str]:
+    """
+    Verify and decrypt several Laravel encrypted values in one pass.
+    
+    The keys are resolved once for the whole batch. Each value follows the
+    decrypt_laravel_value() rules (plaintext is returned as-is, payloads
+    that cannot be decrypted as '').
+    
+    Args:
+        encrypted_values: Encrypted strings
+        keys: Keys to try (defaults to get_laravel_keys())
         
-    except Exception as e:
-        logger.error(f"Failed to decrypt Laravel value: {e}")
-        # Return original value as fallback (might be plaintext)
-        return encrypted_value
+    Returns:
+        list: Decrypted values in input order
+    """
+    values = list(encrypted_values)
+    if keys is None and any(value and value.startswith('eyJ') for value in values):
+        try:
+            keys = get_laravel_keys()
+        except Exception as e:
+            logger.error(f"❌ Failed to decrypt Laravel values: {e}")
+            keys = []
+    
+    results = []
+    for value in values:
+        if not value:
+            results.append('')
+        elif not value.startswith('eyJ'):
+            results.append(value)
+        else:
+            results.append(_decrypt_or_blank(value, keys))
+    return results
 
 
 def is_encrypted(value: str) -> bool:
@@ -0,0 +1,391 @@
+"""
+Prometheus-compatible metrics for the Python jobs.
+
+Counters, gauges and histograms live in one process-wide registry and are
+rendered in the Prometheus text exposition format:
+
+- Batch jobs (cron) call start_job() / finish_job(); finish_job() writes
+  <METRICS_TEXTFILE_DIR>/<job>.prom atomically for node_exporter's textfile
+  collector (default directory: logs/metrics).
+- Daemon modes call serve() to expose /metrics on METRICS_PORT.
+
+Every sample carries a job="<job>" label so the files of different jobs can
+share one collector directory. Values are per run: counters start at zero
+for each cron run, which Prometheus handles like any counter reset.
+
+Usage:
+    from utils import metrics
+    metrics.start_job('relay_agent')
+    metrics.MESSAGES_NEW.inc(5, profile='abc')
+    metrics.finish_job(success=True)
+"""
+
+import os
+import math
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEXTFILE_DIR = Path('logs/metrics')
+
+# Seconds; covers page renders and posting steps
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in labels]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class: a named metric with a fixed set of label names."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, float] = {}
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple((name, str(labels[name])) for name in self.label_names)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[Tuple[str, LabelKey, float]]:
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value (per run)."""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set_to_current_time(self, **labels):
+        self.set(time.time(), **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative buckets plus sum and count."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._histograms: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            data = self._histograms.get(key)
+            if data is None:
+                # One count per bucket, then sum and count
+                data = self._histograms[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[index] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def time(self, **labels) -> '_HistogramTimer':
+        """Context manager observing the elapsed seconds of a block."""
+        return _HistogramTimer(self, labels)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def samples(self) -> List[Tuple[str, LabelKey, float]]:
+        result = []
+        with self._lock:
+            for key, data in self._histograms.items():
+                for index, bound in enumerate(self.buckets):
+                    result.append((f"{self.name}_bucket", key + (('le', _format_value(bound)),), data[index]))
+                result.append((f"{self.name}_sum", key, data[-2]))
+                result.append((f"{self.name}_count", key, data[-1]))
+        return result
+
+    def get(self, **labels) -> float:
+        """Number of observations."""
+        with self._lock:
+            data = self._histograms.get(self._key(labels))
+            return data[-1] if data else 0.0
+
+
+class _HistogramTimer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._histogram.observe(time.monotonic() - self._start, **self._labels)
+        return False
+
+
+class MetricsRegistry:
+    """All metrics of the process plus the job label."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self.job: Optional[str] = None
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.label_names != metric.label_names:
+                    raise ValueError(f"Metric {metric.name} already registered with a different definition")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def reset(self):
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        job_label = (('job', self.job),) if self.job else ()
+        lines = []
+        for metric in sorted(self._metrics.values(), key=lambda m: m.name):
+            samples = metric.samples()
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample_name, key, value in samples:
+                lines.append(f"{sample_name}{_format_labels(job_label + key)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help_text, labels))
+
+
+def gauge(name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, help_text, labels))
+
+
+def histogram(name: str, help_text: str, labels: Tuple[str, ...] = (),
+              buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, help_text, labels, buckets))
+
+
+# Scraper
+MESSAGES_SCRAPED = counter('scraper_messages_scraped_total', 'Messages read from profile pages', ('profile',))
+MESSAGES_NEW = counter('scraper_messages_new_total', 'New messages stored', ('profile',))
+MESSAGES_DUPLICATE = counter('scraper_messages_duplicate_total', 'Messages skipped as duplicates', ('profile',))
+PROFILES_SCRAPED = counter('scraper_profiles_total', 'Profiles processed by outcome', ('status',))
+SCROLL_WAIT_SECONDS = counter('scraper_scroll_wait_seconds_total', 'Seconds spent waiting for lazy-loaded content',
+                              ('kind',))
+
+# Posting
+POSTS_PUBLISHED = counter('posts_published_total', 'Post attempts by platform and outcome', ('platform', 'status'))
+POST_SECONDS = histogram('post_duration_seconds', 'Time to publish one post', ('platform',))
+
+# Image generation
+IMAGES_RENDERED = counter('images_rendered_total', 'Message images rendered by outcome', ('status',))
+RENDER_SECONDS = histogram('image_render_seconds', 'Time to render one message image')
+
+# Browser
+BROWSER_LAUNCHES = counter('browser_launches_total', 'Browser launches', ('browser',))
+BROWSER_CRASHES = counter('browser_crashes_total', 'Page crashes and unexpected browser closures')
+PROXY_BYTES = counter('proxy_bytes_total', 'HTTP bytes through the browser (proxy) by direction', ('direction',))
+
+# Job
+JOB_RUNS = counter('job_runs_total', 'Job runs by outcome', ('status',))
+JOB_DURATION_SECONDS = gauge('job_duration_seconds', 'Duration of the last run')
+JOB_LAST_RUN = gauge('job_last_run_timestamp_seconds', 'Unix time the last run finished')
+JOB_LAST_SUCCESS = gauge('job_last_success_timestamp_seconds', 'Unix time of the last successful run')
+
+_job_started: Optional[float] = None
+
+
+def _textfile_dir() -> Path:
+    return Path(os.getenv('METRICS_TEXTFILE_DIR') or DEFAULT_TEXTFILE_DIR)
+
+
+def start_job(job: str):
+    """Start a run: set the job label and zero all metrics."""
+    global _job_started
+    REGISTRY.job = job
+    REGISTRY.reset()
+    _job_started = time.monotonic()
+
+
+def write_textfile(directory: Optional[Path] = None) -> Optional[Path]:
+    """
+    Atomically write <directory>/<job>.prom for node_exporter's textfile collector.
+
+    Returns:
+        Path written (None if it could not be written)
+    """
+    directory = Path(directory or _textfile_dir())
+    path = directory / f"{REGISTRY.job or 'scraper'}.prom"
+    # node_exporter ignores files not ending in .prom, so the temp file is never half-read
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(REGISTRY.render())
+        os.replace(tmp_path, path)
+        return path
+    except OSError as e:
+        logger.warning(f"Could not write metrics textfile {path}: {e}")
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        return None
+
+
+def finish_job(success: bool) -> Optional[Path]:
+    """Record the run outcome and write the textfile."""
+    now = time.time()
+    JOB_RUNS.inc(status='success' if success else 'failure')
+    if _job_started is not None:
+        JOB_DURATION_SECONDS.set(time.monotonic() - _job_started)
+    JOB_LAST_RUN.set(now)
+    if success:
+        JOB_LAST_SUCCESS.set(now)
+    path = write_textfile()
+    if path:
+        logger.debug(f"Metrics written to {path}")
+    return path
+
+
+def track_network_bytes(context):
+    """
+    Count HTTP bytes of a Playwright browser context (all traffic goes through the proxy).
+
+    Uses Content-Length and request bodies only, so no extra round trips to the
+    browser are made; chunked responses without Content-Length are not counted.
+    """
+    def on_request(request):
+        try:
+            body = request.post_data_buffer
+            if body:
+                PROXY_BYTES.inc(len(body), direction='sent')
+        except Exception:
+            pass
+
+    def on_response(response):
+        try:
+            length = response.headers.get('content-length')
+            if length:
+                PROXY_BYTES.inc(int(length), direction='received')
+        except Exception:
+            pass
+
+    context.on('request', on_request)
+    context.on('response', on_response)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def serve(port: Optional[int] = None, host: str = '127.0.0.1') -> Optional[ThreadingHTTPServer]:
+    """
+    Serve /metrics on a local port from a daemon thread (daemon/watch modes).
+
+    Args:
+        port: Port to listen on (defaults to METRICS_PORT; not started if unset)
+        host: Interface to bind (local only by default)
+
+    Returns:
+        The server, or None if no port is configured or it could not bind
+    """
+    global _server
+    if _server is not None:
+        return _server
+    port = port or int(os.getenv('METRICS_PORT') or 0)
+    if not port:
+        return None
+    try:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.warning(f"Could not serve metrics on {host}:{port}: {e}")
+        return None
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
+    logger.info(f"📈 Serving metrics on http://{host}:{port}/metrics")
+    return _server
@@ -0,0 +1,198 @@
+"""
+Append-only JSONL post log.
+
+Replaces the read-modify-write twitter_posts.json array: every post result is
+appended as one JSON line and fsync'ed, so a post costs O(1) I/O and a crash
+can at worst leave a truncated last line (skipped by the reader).
+
+When the active log grows past ROTATE_BYTES it is gzip-compressed into a
+timestamped segment next to it. iter_posts() streams the rotated segments
+(oldest first) and then the active log without loading everything into memory.
+
+Usage:
+    python3 -m utils.post_log migrate    # Convert twitter_posts.json to JSONL
+"""
+
+import os
+import sys
+import gzip
+import json
+import shutil
+import logging
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+POST_LOG_FILE = Path('twitter_posts.jsonl')
+LEGACY_JSON_FILE = Path('twitter_posts.json')
+
+# Rotate the active log into a .gz segment past this size (0 = never rotate)
+ROTATE_BYTES = 10 * 1024 * 1024
+
+
+def _fsync_dir(directory: Path):
+    """Persist directory entries (renames/creates) where the platform allows it."""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _rotated_segments(log_path: Path) -> List[Path]:
+    """Rotated segments for log_path, oldest first (timestamped names sort chronologically)."""
+    return sorted(log_path.parent.glob(f"{log_path.stem}.*{log_path.suffix}.gz"))
+
+
+def _rotate(log_path: Path):
+    """Compress the active log into a timestamped .gz segment and start a new one."""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    segment = log_path.with_name(f"{log_path.stem}.{timestamp}{log_path.suffix}.gz")
+    tmp_segment = segment.with_name(segment.name + '.tmp')
+
+    with open(log_path, 'rb') as src, gzip.open(tmp_segment, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    with open(tmp_segment, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_segment, segment)
+    os.unlink(log_path)
+    _fsync_dir(log_path.parent)
+    logger.info(f"Rotated post log into {segment}")
+
+
+def append_post(record: Dict[str, Any], log_path: Path = POST_LOG_FILE,
+                rotate_bytes: int = ROTATE_BYTES):
+    """
+    Append one post result to the log (one JSON line, flushed and fsync'ed).
+
+    Args:
+        record: Post result dictionary
+        log_path: Active JSONL log
+        rotate_bytes: Rotate the active log past this size (0 = never)
+    """
+    log_path = Path(log_path)
+    line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+
+    while True:
+        with open(log_path, 'a+', encoding='utf-8') as f:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                # Another writer may have rotated the file between open and lock
+                if not _is_current(log_path, f):
+                    continue
+                size = os.fstat(f.fileno()).st_size
+                if rotate_bytes and size >= rotate_bytes:
+                    _rotate(log_path)
+                    continue
+                # Terminate a partial line left by a crash so this record stays readable
+                if size and os.pread(f.fileno(), 1, size - 1) != b'\n':
+                    line = '\n' + line
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+                return
+            finally:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _is_current(log_path: Path, handle) -> bool:
+    """True if the open handle still refers to the file at log_path."""
+    try:
+        return os.path.samestat(os.fstat(handle.fileno()), os.stat(log_path))
+    except FileNotFoundError:
+        return False
+
+
+def _iter_lines(handle, source: Path) -> Iterator[Dict[str, Any]]:
+    for line_number, line in enumerate(handle, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            # Only a crash mid-append can produce this (a partial last line)
+            logger.warning(f"Skipping unreadable line {line_number} in {source}")
+
+
+def iter_posts(log_path: Path = POST_LOG_FILE, include_rotated: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Stream post results in the order they were written.
+
+    Args:
+        log_path: Active JSONL log
+        include_rotated: Also read the rotated .gz segments (before the active log)
+
+    Yields:
+        Post result dictionaries
+    """
+    log_path = Path(log_path)
+    if include_rotated:
+        for segment in _rotated_segments(log_path):
+            with gzip.open(segment, 'rt', encoding='utf-8') as f:
+                yield from _iter_lines(f, segment)
+
+    if log_path.exists():
+        with open(log_path, 'r', encoding='utf-8') as f:
+            yield from _iter_lines(f, log_path)
+
+
+def migrate_legacy_json(json_path: Path = LEGACY_JSON_FILE, log_path: Path = POST_LOG_FILE) -> int:
+    """
+    One-time conversion of the twitter_posts.json array into the JSONL log.
+
+    Legacy entries are older than anything already in the JSONL log, so they
+    are written first. The JSON file is renamed to *.migrated afterwards, which
+    makes the migration idempotent.
+
+    Returns:
+        Number of posts migrated (0 if there was nothing to migrate)
+    """
+    json_path, log_path = Path(json_path), Path(log_path)
+    if not json_path.exists():
+        return 0
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        posts = json.load(f)
+    if not isinstance(posts, list):
+        raise ValueError(f"{json_path} does not contain a JSON array")
+
+    tmp_path = log_path.with_name(log_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        for post in posts:
+            out.write(json.dumps(post, ensure_ascii=False, default=str) + '\n')
+        if log_path.exists():
+            with open(log_path, 'r', encoding='utf-8') as existing:
+                shutil.copyfileobj(existing, out)
+        out.flush()
+        os.fsync(out.fileno())
+
+    os.replace(tmp_path, log_path)
+    os.replace(json_path, json_path.with_name(json_path.name + '.migrated'))
+    _fsync_dir(log_path.parent)
+    logger.info(f"Migrated {len(posts)} posts from {json_path} to {log_path}")
+    return len(posts)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if sys.argv[1:] != ['migrate']:
+        print("Usage: python3 -m utils.post_log migrate")
+        sys.exit(1)
+    count = migrate_legacy_json()
+    print(f"Migrated {count} posts to {POST_LOG_FILE}")
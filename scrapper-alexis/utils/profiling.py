@@ -0,0 +1,292 @@
+"""
+Opt-in profiling for the entry points.
+
+Enabled per run with the PROFILE environment variable or a --profile
+argument (which is removed from sys.argv before main() parses it):
+
+    PROFILE=cpu  python3 relay_agent.py
+    python3 generate_message_images.py --profile=wall
+
+Modes:
+- cpu:  cProfile around main(). Writes <name>.pstats (snakeviz, flameprof,
+        gprof2dot) and <name>_cpu.txt (top functions by cumulative time).
+- wall: Sampling wall-clock profiler. A daemon thread records the stack of
+        every thread each PROFILE_INTERVAL_MS (default 10) and writes
+        <name>.folded, collapsed stacks for flamegraph.pl / speedscope.
+        Unlike cProfile it shows time spent waiting on Playwright and sleeps.
+- mem:  tracemalloc snapshots at start and end (plus every
+        PROFILE_MEM_SNAPSHOT_S seconds, default 60). Writes the raw
+        .tracemalloc snapshots and <name>_mem.txt (top allocations and
+        growth since start). Snapshots are dumped to a temporary folder
+        while main() runs and moved to the output folder at the end.
+
+Output goes to a profile/ folder inside the run's debug folder when a debug
+session is active, otherwise to debug_output/profile_<timestamp>_<name>/.
+
+When profiling is off, run() only reads the environment and calls main().
+"""
+
+import os
+import sys
+import time
+import shutil
+import pstats
+import tempfile
+import cProfile
+import logging
+import threading
+import tracemalloc
+from pathlib import Path
+from datetime import datetime
+from collections import Counter
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('cpu', 'wall', 'mem')
+
+# Wall-clock sampling interval (ms)
+SAMPLE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '10'))
+# Seconds between intermediate tracemalloc snapshots (0 = start/end only)
+MEM_SNAPSHOT_INTERVAL_S = float(os.getenv('PROFILE_MEM_SNAPSHOT_S', '60'))
+# Frames kept per allocation traceback
+MEM_TRACEBACK_FRAMES = 25
+# Lines written to the text reports
+REPORT_TOP = 50
+
+
+def _pop_profile_argument() -> Optional[str]:
+    """Remove --profile=<mode> / --profile <mode> from sys.argv and return the mode."""
+    argv = sys.argv
+    for i, arg in enumerate(argv[1:], 1):
+        if arg.startswith('--profile='):
+            del argv[i]
+            return arg.split('=', 1)[1]
+        if arg == '--profile' and i + 1 < len(argv):
+            mode = argv[i + 1]
+            del argv[i:i + 2]
+            return mode
+    return None
+
+
+def get_profile_mode() -> Optional[str]:
+    """Requested profiling mode (--profile wins over PROFILE), or None when off."""
+    mode = _pop_profile_argument() or os.getenv('PROFILE', '')
+    mode = mode.strip().lower()
+    if not mode or mode in ('0', 'off', 'false', 'none'):
+        return None
+    if mode not in PROFILE_MODES:
+        logger.warning(f"Unknown PROFILE mode '{mode}' (expected one of {', '.join(PROFILE_MODES)}); profiling disabled")
+        return None
+    return mode
+
+
+def _output_dir(name: str) -> Path:
+    """profile/ inside the current debug session folder, or a standalone folder."""
+    try:
+        from core.debug_helper import get_current_session_dir, BASE_DEBUG_DIR
+        session_dir = get_current_session_dir()
+    except Exception:
+        session_dir, BASE_DEBUG_DIR = None, Path('debug_output')
+
+    if session_dir is not None:
+        directory = Path(session_dir) / 'profile'
+    else:
+        directory = BASE_DEBUG_DIR / f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{name}"
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+class WallClockSampler:
+    """
+    Sampling profiler: records the stacks of all threads at a fixed interval.
+
+    Samples are aggregated as collapsed stacks ("thread;outer;...;inner count"),
+    the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval_ms: float = SAMPLE_INTERVAL_MS):
+        self.interval = max(interval_ms, 1) / 1000
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='wall-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write(self, path: Path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class MemorySnapshots:
+    """tracemalloc snapshots taken at start, end and at a fixed interval."""
+
+    def __init__(self, directory: Path, name: str, interval_s: float = MEM_SNAPSHOT_INTERVAL_S):
+        self.directory = directory
+        self.name = name
+        self.interval = interval_s
+        # Only the first and latest snapshots stay in memory; all are dumped to disk
+        self.labels: List[str] = []
+        self.first: Any = None
+        self.last: Any = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        tracemalloc.start(MEM_TRACEBACK_FRAMES)
+        self.take('start')
+        if self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name='mem-profiler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        index = 1
+        while not self._stop.wait(self.interval):
+            self.take(f"t{index:03d}")
+            index += 1
+
+    def take(self, label: str):
+        snapshot = tracemalloc.take_snapshot()
+        path = self.directory / f"{self.name}_{label}.tracemalloc"
+        snapshot.dump(str(path))
+        self.labels.append(label)
+        if self.first is None:
+            self.first = snapshot
+        self.last = snapshot
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.take('end')
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return current, peak
+
+    def write_report(self, path: Path, current: int, peak: int):
+        filters = [
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, __file__),
+        ]
+        first, last = self.first.filter_traces(filters), self.last.filter_traces(filters)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"Traced memory at end: {current / 1024 / 1024:.1f} MB, peak: {peak / 1024 / 1024:.1f} MB\n")
+            f.write(f"Snapshots: {', '.join(self.labels)}\n\n")
+            f.write(f"Top {REPORT_TOP} allocation sites at end:\n")
+            for stat in last.statistics('lineno')[:REPORT_TOP]:
+                f.write(f"  {stat}\n")
+            f.write(f"\nTop {REPORT_TOP} growth since start:\n")
+            for stat in last.compare_to(first, 'lineno')[:REPORT_TOP]:
+                f.write(f"  {stat}\n")
+            f.write("\nLargest growth by traceback:\n")
+            for stat in last.compare_to(first, 'traceback')[:5]:
+                f.write(f"  {stat}\n")
+                for line in stat.traceback.format(limit=MEM_TRACEBACK_FRAMES):
+                    f.write(f"    {line}\n")
+
+
+def run(main: Callable[[], Any], name: str) -> Any:
+    """
+    Call main(), profiled when PROFILE / --profile requests it.
+
+    Args:
+        main: Entry point function
+        name: Script name used for the output files
+
+    Returns:
+        Whatever main() returns (exceptions and SystemExit propagate after
+        the profile has been written)
+    """
+    mode = get_profile_mode()
+    if mode is None:
+        return main()
+
+    logger.info(f"🔬 Profiling {name} ({mode})")
+    start = time.perf_counter()
+
+    if mode == 'cpu':
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(main)
+        finally:
+            _write_cpu_profile(profiler, name, time.perf_counter() - start)
+
+    if mode == 'wall':
+        sampler = WallClockSampler()
+        sampler.start()
+        try:
+            return main()
+        finally:
+            sampler.stop()
+            _write_wall_profile(sampler, name, time.perf_counter() - start)
+
+    # mem: snapshots are dumped as they are taken, before main() has opened its debug
+    # session, so they go to a temporary folder that is moved into place at the end
+    snapshots = MemorySnapshots(Path(tempfile.mkdtemp(prefix=f"profile_{name}_")), name)
+    snapshots.start()
+    try:
+        return main()
+    finally:
+        _write_mem_profile(snapshots, name, time.perf_counter() - start)
+
+
+def _write_cpu_profile(profiler, name: str, elapsed: float):
+    try:
+        directory = _output_dir(name)
+        stats_path = directory / f"{name}.pstats"
+        profiler.dump_stats(str(stats_path))
+        with open(directory / f"{name}_cpu.txt", 'w', encoding='utf-8') as f:
+            stats = pstats.Stats(profiler, stream=f)
+            stats.sort_stats('cumulative').print_stats(REPORT_TOP)
+            stats.sort_stats('tottime').print_stats(REPORT_TOP)
+        logger.info(f"🔬 CPU profile ({elapsed:.1f}s) written to {stats_path}")
+    except Exception as e:
+        logger.warning(f"Could not write CPU profile: {e}")
+
+
+def _write_wall_profile(sampler: WallClockSampler, name: str, elapsed: float):
+    try:
+        path = _output_dir(name) / f"{name}.folded"
+        sampler.write(path)
+        logger.info(f"🔬 Wall-clock profile ({elapsed:.1f}s, {sampler.samples} samples) written to {path}")
+    except Exception as e:
+        logger.warning(f"Could not write wall-clock profile: {e}")
+
+
+def _write_mem_profile(snapshots: MemorySnapshots, name: str, elapsed: float):
+    try:
+        current, peak = snapshots.stop()
+        directory = _output_dir(name)
+        for snapshot_path in snapshots.directory.iterdir():
+            shutil.move(str(snapshot_path), str(directory / snapshot_path.name))
+        shutil.rmtree(snapshots.directory, ignore_errors=True)
+        path = directory / f"{name}_mem.txt"
+        snapshots.write_report(path, current, peak)
+        logger.info(f"🔬 Memory profile ({elapsed:.1f}s, peak {peak / 1024 / 1024:.1f} MB) written to {path}")
+    except Exception as e:
+        logger.warning(f"Could not write memory profile (snapshots in {snapshots.directory}): {e}")
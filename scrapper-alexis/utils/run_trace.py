@@ -0,0 +1,273 @@
+"""
+Lightweight per-run timing spans.
+
+A run (e.g. one relay_agent execution) is a tree of named spans:
+
+    run_trace.start_run('relay_agent')
+    with run_trace.span('profile', username='abc'):
+        with run_trace.span('navigate'):
+            ...
+    trace = run_trace.finish_run()
+
+Spans nest per thread. Durations are aggregated by span name as spans close
+(calls, total, self time, max), so the summary stays complete even when the
+stored tree is capped at MAX_TRACE_SPANS. Self time is the time spent in a
+span minus its children, so the self times of all spans add up to the run.
+
+When no run is active, span() and @traced cost one global lookup, so library
+code can be instrumented unconditionally.
+
+At the end of a run the trace is written to logs/run_trace_<run_id>.json,
+the summary table is logged and the aggregates are stored in run_metrics.
+"""
+
+import json
+import time
+import logging
+import threading
+import functools
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Spans kept in the JSON tree (aggregates always cover every span)
+MAX_TRACE_SPANS = 20000
+
+TRACE_DIR = Path('logs')
+
+
+class Span:
+    """One timed operation in the run tree."""
+
+    __slots__ = ('name', 'attrs', 'start', 'duration', 'children', 'error', 'child_time')
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.children: List['Span'] = []
+        self.error: Optional[str] = None
+        self.child_time = 0.0
+
+    def to_dict(self, run_start: float) -> Dict[str, Any]:
+        data = {
+            'name': self.name,
+            'start_ms': round((self.start - run_start) * 1000, 3),
+            'duration_ms': round((self.duration or 0) * 1000, 3),
+        }
+        if self.attrs:
+            data['attrs'] = self.attrs
+        if self.error:
+            data['error'] = self.error
+        if self.children:
+            data['children'] = [child.to_dict(run_start) for child in self.children]
+        return data
+
+
+class RunTrace:
+    """Span tree and per-name aggregates for one run."""
+
+    def __init__(self, script: str):
+        self.script = script
+        self.started_at = datetime.now()
+        self.run_id = f"{script}_{self.started_at.strftime('%Y%m%d_%H%M%S')}"
+        self.root = Span(script, {})
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.spans_recorded = 0
+        self.spans_dropped = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = [self.root]
+        return stack
+
+    @contextmanager
+    def span(self, name: str, **attrs) -> Iterator[Span]:
+        stack = self._stack()
+        parent = stack[-1]
+        current = Span(name, attrs)
+        stack.append(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.error = f"{type(e).__name__}: {str(e)[:200]}"
+            raise
+        finally:
+            current.duration = time.perf_counter() - current.start
+            stack.pop()
+            self._record(parent, current)
+
+    def _record(self, parent: Span, current: Span):
+        with self._lock:
+            parent.child_time += current.duration
+            stat = self.stats.get(current.name)
+            if stat is None:
+                stat = self.stats[current.name] = {'calls': 0, 'total': 0.0, 'self': 0.0, 'max': 0.0, 'errors': 0}
+            stat['calls'] += 1
+            stat['total'] += current.duration
+            stat['self'] += current.duration - current.child_time
+            stat['max'] = max(stat['max'], current.duration)
+            stat['errors'] += current.error is not None
+
+            if self.spans_recorded < MAX_TRACE_SPANS:
+                parent.children.append(current)
+                self.spans_recorded += 1
+            else:
+                # Aggregated above; the span itself is not kept in the tree
+                self.spans_dropped += 1
+                current.children = []
+
+    def finish(self):
+        if self.root.duration is None:
+            self.root.duration = time.perf_counter() - self.root.start
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration if self.root.duration is not None else time.perf_counter() - self.root.start
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per-name aggregates sorted by self time, plus the unattributed run time."""
+        with self._lock:
+            rows = [
+                {
+                    'span': name,
+                    'calls': stat['calls'],
+                    'total_ms': round(stat['total'] * 1000, 3),
+                    'self_ms': round(stat['self'] * 1000, 3),
+                    'max_ms': round(stat['max'] * 1000, 3),
+                    'errors': stat['errors'],
+                }
+                for name, stat in self.stats.items()
+            ]
+            unattributed = self.duration - self.root.child_time
+        rows.sort(key=lambda row: row['self_ms'], reverse=True)
+        rows.append({
+            'span': self.script, 'calls': 1,
+            'total_ms': round(self.duration * 1000, 3), 'self_ms': round(unattributed * 1000, 3),
+            'max_ms': round(self.duration * 1000, 3), 'errors': 0,
+        })
+        return rows
+
+    def summary_table(self) -> str:
+        """Human-readable summary (one line per span name)."""
+        total_ms = self.duration * 1000 or 1
+        lines = [
+            f"{'span':<28} {'calls':>7} {'total s':>10} {'self s':>10} {'self %':>7} {'avg ms':>10} {'max ms':>10}",
+        ]
+        lines.append('-' * len(lines[0]))
+        for row in self.summary():
+            name = row['span'] if row['span'] != self.script else '(unattributed)'
+            lines.append(
+                f"{name:<28} {row['calls']:>7} {row['total_ms'] / 1000:>10.2f} {row['self_ms'] / 1000:>10.2f} "
+                f"{row['self_ms'] / total_ms * 100:>6.1f}% {row['total_ms'] / row['calls']:>10.1f} {row['max_ms']:>10.1f}"
+            )
+        return '\n'.join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'run_id': self.run_id,
+            'script': self.script,
+            'started_at': self.started_at.isoformat(),
+            'duration_ms': round(self.duration * 1000, 3),
+            'spans_recorded': self.spans_recorded,
+            'spans_dropped': self.spans_dropped,
+            'summary': self.summary(),
+            'trace': self.root.to_dict(self.root.start),
+        }
+
+    def write_json(self, directory: Optional[Path] = None) -> Path:
+        """Write the trace as logs/run_trace_<run_id>.json."""
+        directory = Path(directory or TRACE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"run_trace_{self.run_id}.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=1, default=str)
+        return path
+
+
+# Active run (one per process)
+_current_run: Optional[RunTrace] = None
+
+
+def start_run(script: str) -> RunTrace:
+    """Start a new run trace and make it the active one."""
+    global _current_run
+    _current_run = RunTrace(script)
+    return _current_run
+
+
+def get_current_run() -> Optional[RunTrace]:
+    """Active run trace (None when tracing is not active)."""
+    return _current_run
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Optional[Span]]:
+    """Time a block as a span of the active run (no-op without one)."""
+    run = _current_run
+    if run is None:
+        yield None
+        return
+    with run.span(name, **attrs) as current:
+        yield current
+
+
+def traced(name: str) -> Callable:
+    """Decorator: time every call of a function as a span."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            run = _current_run
+            if run is None:
+                return func(*args, **kwargs)
+            with run.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def finish_run(write_json: bool = True, save_to_db: bool = True, db=None) -> Optional[RunTrace]:
+    """
+    Close the active run: log the summary table, write the JSON trace and store the aggregates.
+
+    Args:
+        write_json: Write logs/run_trace_<run_id>.json
+        save_to_db: Store the summary in the run_metrics table
+        db: DatabaseManager to store into (defaults to the global instance)
+
+    Returns:
+        The finished trace (None if no run was active)
+    """
+    global _current_run
+    run = _current_run
+    if run is None:
+        return None
+    _current_run = None
+    run.finish()
+
+    logger.info(f"⏱️ Run timing summary ({run.run_id}, {run.duration:.1f}s):\n{run.summary_table()}")
+
+    if write_json:
+        try:
+            path = run.write_json()
+            logger.info(f"⏱️ Run trace written to {path}")
+        except Exception as e:
+            logger.warning(f"Could not write run trace: {e}")
+
+    if save_to_db:
+        try:
+            if db is None:
+                from core.database import get_database
+                db = get_database()
+            db.save_run_metrics(run.run_id, run.script, run.started_at, run.summary())
+        except Exception as e:
+            logger.warning(f"Could not store run metrics: {e}")
+
+    return run
@@ -0,0 +1,258 @@
+"""
+Selector-driven wait toolkit.
+
+Replaces fixed page.wait_for_timeout() sleeps with waits that return as soon
+as the page is actually ready. The previous sleep durations are kept as the
+upper-bound timeouts, so the worst case is never slower than before.
+
+Every wait is recorded per step (budget vs. actual time) so the time saved
+can be reported at the end of a run via log_wait_summary().
+"""
+
+import re
+import time
+import logging
+from typing import Dict, List, Union
+
+from playwright.sync_api import Page, Locator, expect, TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# JS predicate: true when none of the given CSS selectors has a visible element
+_NONE_VISIBLE_JS = """
+(selectors) => !selectors.some(sel =>
+    Array.from(document.querySelectorAll(sel)).some(el => el.getClientRects().length > 0)
+)
+"""
+
+
+class WaitRecorder:
+    """Collects budget vs. actual wait times per step."""
+
+    def __init__(self):
+        self._steps: Dict[str, Dict[str, float]] = {}
+
+    def record(self, step: str, budget_ms: int, elapsed_ms: float, satisfied: bool):
+        """Record a single wait for a step."""
+        stats = self._steps.setdefault(step, {'calls': 0, 'budget_ms': 0, 'elapsed_ms': 0.0, 'timeouts': 0})
+        stats['calls'] += 1
+        stats['budget_ms'] += budget_ms
+        stats['elapsed_ms'] += elapsed_ms
+        if not satisfied:
+            stats['timeouts'] += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-step stats including saved_ms (budget minus actual)."""
+        return {
+            step: {**stats, 'saved_ms': max(0.0, stats['budget_ms'] - stats['elapsed_ms'])}
+            for step, stats in self._steps.items()
+        }
+
+    def total_saved_ms(self) -> float:
+        """Total time saved compared with the fixed sleeps."""
+        return sum(stats['saved_ms'] for stats in self.get_stats().values())
+
+    def reset(self):
+        """Clear recorded waits."""
+        self._steps.clear()
+
+
+# Global recorder instance
+_wait_recorder = WaitRecorder()
+
+
+def get_wait_recorder() -> WaitRecorder:
+    """Get global wait recorder instance."""
+    return _wait_recorder
+
+
+def _finish(step: str, budget_ms: int, started: float, satisfied: bool) -> bool:
+    elapsed_ms = (time.monotonic() - started) * 1000
+    _wait_recorder.record(step, budget_ms, elapsed_ms, satisfied)
+    if satisfied:
+        logger.debug(f"Wait '{step}' satisfied in {elapsed_ms:.0f}ms (budget {budget_ms}ms)")
+    else:
+        logger.debug(f"Wait '{step}' hit its {budget_ms}ms upper bound")
+    return satisfied
+
+
+def _as_locator(page: Page, target: Union[str, Locator]) -> Locator:
+    return page.locator(target) if isinstance(target, str) else target
+
+
+def wait_for_any_visible(page: Page, targets: List[Union[str, Locator]], timeout_ms: int, step: str) -> bool:
+    """
+    Wait until any of the given selectors/locators is visible.
+
+    Args:
+        page: Playwright Page instance
+        targets: CSS/text selectors or Locators (e.g. page.get_by_role(...))
+        timeout_ms: Upper bound (the sleep this wait replaces)
+        step: Step name used for time-saved reporting
+
+    Returns:
+        True if a target became visible before the timeout
+    """
+    started = time.monotonic()
+    combined = _as_locator(page, targets[0])
+    for target in targets[1:]:
+        combined = combined.or_(_as_locator(page, target))
+
+    try:
+        combined.first.wait_for(state='visible', timeout=timeout_ms)
+        return _finish(step, timeout_ms, started, True)
+    except PlaywrightTimeoutError:
+        return _finish(step, timeout_ms, started, False)
+
+
+def wait_until_gone(page: Page, css_selectors: List[str], timeout_ms: int, step: str) -> bool:
+    """
+    Wait until no element matching any of the CSS selectors is visible (e.g. a dialog closed).
+
+    Returns:
+        True if all matches disappeared before the timeout
+    """
+    started = time.monotonic()
+    try:
+        page.wait_for_function(_NONE_VISIBLE_JS, arg=css_selectors, timeout=timeout_ms)
+        return _finish(step, timeout_ms, started, True)
+    except PlaywrightTimeoutError:
+        return _finish(step, timeout_ms, started, False)
+
+
+def wait_for_condition(page: Page, expression: str, timeout_ms: int, step: str, arg=None) -> bool:
+    """
+    Wait until a JS predicate returns a truthy value (page.wait_for_function).
+
+    Returns:
+        True if the predicate was satisfied before the timeout
+    """
+    started = time.monotonic()
+    try:
+        page.wait_for_function(expression, arg=arg, timeout=timeout_ms)
+        return _finish(step, timeout_ms, started, True)
+    except PlaywrightTimeoutError:
+        return _finish(step, timeout_ms, started, False)
+
+
+def expect_visible(locator: Locator, timeout_ms: int, step: str) -> bool:
+    """
+    Playwright expect()-based visibility wait that returns a bool instead of raising.
+
+    Returns:
+        True if the locator became visible before the timeout
+    """
+    started = time.monotonic()
+    try:
+        expect(locator).to_be_visible(timeout=timeout_ms)
+        return _finish(step, timeout_ms, started, True)
+    except AssertionError:
+        return _finish(step, timeout_ms, started, False)
+
+
+class RequestTracker:
+    """
+    Tracks in-flight requests whose URL matches a pattern.
+
+    Start it before the action that triggers the traffic (e.g. before a file
+    upload), then call wait_until_quiet(). Unlike wait_for_load_state('networkidle'),
+    only the requests that matter are tracked, so Facebook's constant background
+    polling does not keep the wait open.
+    """
+
+    def __init__(self, page: Page, url_pattern: str):
+        self.page = page
+        self.pattern = re.compile(url_pattern)
+        self.in_flight = set()
+        self.last_activity = time.monotonic()
+        self._listening = False
+
+    def _on_request(self, request):
+        if self.pattern.search(request.url):
+            self.in_flight.add(request)
+            self.last_activity = time.monotonic()
+
+    def _on_done(self, request):
+        if request in self.in_flight:
+            self.in_flight.discard(request)
+            self.last_activity = time.monotonic()
+
+    def start(self) -> 'RequestTracker':
+        """Attach request listeners."""
+        if not self._listening:
+            self.page.on('request', self._on_request)
+            self.page.on('requestfinished', self._on_done)
+            self.page.on('requestfailed', self._on_done)
+            self._listening = True
+        return self
+
+    def stop(self):
+        """Detach request listeners (safe to call more than once)."""
+        if self._listening:
+            for event, handler in (('request', self._on_request),
+                                   ('requestfinished', self._on_done),
+                                   ('requestfailed', self._on_done)):
+                try:
+                    self.page.remove_listener(event, handler)
+                except Exception:
+                    pass
+            self._listening = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def wait_until_quiet(self, timeout_ms: int, step: str, quiet_ms: int = 500) -> bool:
+        """
+        Wait until no tracked request has been in flight for quiet_ms.
+
+        Args:
+            timeout_ms: Upper bound (the sleep this wait replaces)
+            step: Step name used for time-saved reporting
+            quiet_ms: How long the tracked traffic must stay idle
+
+        Returns:
+            True if the tracked traffic settled before the timeout
+        """
+        started = time.monotonic()
+        deadline = started + timeout_ms / 1000
+        while time.monotonic() < deadline:
+            # wait_for_timeout pumps Playwright events so the listeners run
+            self.page.wait_for_timeout(100)
+            if not self.in_flight and (time.monotonic() - self.last_activity) * 1000 >= quiet_ms:
+                return _finish(step, timeout_ms, started, True)
+        return _finish(step, timeout_ms, started, False)
+
+
+def wait_for_network_quiet(page: Page, url_pattern: str, timeout_ms: int, step: str,
+                           quiet_ms: int = 500) -> bool:
+    """
+    Wait until requests matching url_pattern have settled (tracking starts now).
+
+    Use RequestTracker directly when the traffic starts before the wait.
+
+    Returns:
+        True if the matching traffic settled before the timeout
+    """
+    with RequestTracker(page, url_pattern) as tracker:
+        return tracker.wait_until_quiet(timeout_ms, step, quiet_ms)
+
+
+def log_wait_summary(title: str = "WAIT SUMMARY"):
+    """Log time saved per step compared with the previous fixed sleeps."""
+    stats = _wait_recorder.get_stats()
+    if not stats:
+        return
+
+    logger.info("="*70)
+    logger.info(title)
+    logger.info("="*70)
+    for step, step_stats in sorted(stats.items(), key=lambda item: -item[1]['saved_ms']):
+        logger.info(
+            f"  {step}: {step_stats['calls']}x, waited {step_stats['elapsed_ms'] / 1000:.1f}s "
+            f"of {step_stats['budget_ms'] / 1000:.1f}s budget (saved {step_stats['saved_ms'] / 1000:.1f}s, "
+            f"{step_stats['timeouts']} hit upper bound)"
+        )
+    logger.info(f"⏱️  Total time saved vs fixed sleeps: {_wait_recorder.total_saved_ms() / 1000:.1f}s")